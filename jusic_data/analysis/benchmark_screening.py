@@ -0,0 +1,152 @@
+"""
+추천 순위 2단계 스크리닝 벤치마크
+
+실제 30종목 피처의 마지막 행에 잡음을 더해 여러 규모(기본 30/300/3000/10000종목)의 가상 유니버스를 만들고,
+전체 평가 후 정렬(rank 방식)과 2단계 스크리닝의 시간과 결과를 비교한다.
+타임프레임마다 두 방식을 1번씩 먼저 돌려 (모델 로드, 첫 호출 비용 제외) 워밍업한 뒤
+REPEATS번 측정한 중앙값을 기록한다. 두 방식의 top-k가 다르면 종료 코드 1을 반환한다.
+
+min_winning_universe는 그 규모 이상 모든 규모/타임프레임에서 스크리닝이 더 빠른 가장 작은 규모
+(없으면 null)이며, 챗봇의 JUSIC_SCREENING_MIN_STOCKS 기준값을 정하는 근거다.
+
+저장 파일:
+    reports/screening_benchmark.json
+    reports/perf_history/screening_benchmark_<시각>.json
+
+사용법:
+    python analysis/benchmark_screening.py              # 30/300/3000/10000종목, top 5
+    python analysis/benchmark_screening.py 5000 10      # 종목 수, k 지정
+"""
+
+import json
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings('ignore')
+
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.multi_timeframe_chatbot import (
+    MultiTimeframeChatbot, TIMEFRAMES, DIRECTION_FEATURES, VOLATILITY_FEATURES, RISK_FEATURES
+)
+from utils.stock_name_mapping import STOCK_NAME_MAPPING
+
+REPORT_JSON = ROOT_DIR / 'reports' / 'screening_benchmark.json'
+HISTORY_DIR = ROOT_DIR / 'reports' / 'perf_history'
+
+# 방식별 측정 횟수 (워밍업 1회 제외, 중앙값 기록)
+REPEATS = 5
+
+# 기본 유니버스 규모
+UNIVERSES = [30, 300, 3000, 10000]
+
+FEATURES = sorted(set(DIRECTION_FEATURES + VOLATILITY_FEATURES + RISK_FEATURES)) + ['Close']
+
+
+def synthetic_universe(frames, n, seed=42):
+    """실제 종목 마지막 행 + 종목 간 표준편차 0.3배 잡음으로 n개 가상 종목 생성"""
+    rng = np.random.default_rng(seed)
+    base = pd.DataFrame([df[FEATURES].iloc[-1] for df in frames.values()])
+    std = base.std().fillna(0).values
+
+    rows = base.values[rng.integers(0, len(base), n)] + rng.normal(0, 0.3, (n, len(FEATURES))) * std
+    index = next(iter(frames.values())).index[-1:]
+    return {
+        f'SYN{i:05d}': pd.DataFrame([rows[i]], index=index, columns=FEATURES)
+        for i in range(n)
+    }
+
+
+def main():
+    universes = [int(sys.argv[1])] if len(sys.argv) > 1 else UNIVERSES
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("="*80)
+    print(f"🏁 2단계 스크리닝 벤치마크 ({'/'.join(map(str, universes))}종목, top {k})")
+    print("="*80)
+
+    chatbot = MultiTimeframeChatbot(silent=True, snapshot_max_age=-1)
+    frames = chatbot.build_features_many(list(STOCK_NAME_MAPPING.keys()))
+
+    def timed(func, tf):
+        """워밍업 1회 후 REPEATS번 측정 (반환: (결과, 중앙값 ms))"""
+        result = func(tf)
+        times = []
+        for _ in range(REPEATS):
+            t0 = time.perf_counter()
+            result = func(tf)
+            times.append((time.perf_counter() - t0) * 1000)
+        return result, statistics.median(times)
+
+    results = {}
+    wins = {}
+    all_match = True
+    for n in universes:
+        universe = synthetic_universe(frames, n)
+
+        def exhaustive(tf):
+            full = chatbot.evaluate_features_batch(universe, tf)
+            full.sort(key=lambda x: x['score'], reverse=True)
+            return full
+
+        print(f"\n   [{n}종목]")
+        results[n] = {}
+        for tf in TIMEFRAMES:
+            full, exhaustive_ms = timed(exhaustive, tf)
+            (top, _, _), screening_ms = timed(lambda tf: chatbot.screen_features_batch(universe, tf, k), tf)
+
+            match = [p['ticker'] for p in top] == [p['ticker'] for p in full[:k]]
+            all_match &= match
+            stats = chatbot.last_screening
+            results[n][tf] = {
+                'exhaustive_ms': round(exhaustive_ms, 1),
+                'screening_ms': round(screening_ms, 1),
+                'direction_evaluated': stats['direction_evaluated'],
+                'pruned_ratio': round(1 - stats['direction_evaluated'] / n, 4),
+                'match': match,
+            }
+            print(f"   {tf:6s} 전체 {exhaustive_ms:8.1f}ms | 스크리닝 {screening_ms:8.1f}ms "
+                  f"| direction 평가 {stats['direction_evaluated']}/{n} | {'일치' if match else '불일치'}")
+        wins[n] = all(r['screening_ms'] < r['exhaustive_ms'] for r in results[n].values())
+
+    # 이 규모 이상에서 항상 스크리닝이 빠른 가장 작은 규모
+    min_winning = None
+    for n in sorted(universes, reverse=True):
+        if not wins[n]:
+            break
+        min_winning = n
+    print(f"\n   스크리닝이 일관되게 빠른 최소 규모: {min_winning or '없음'}")
+
+    ts = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    report = {
+        'timestamp': ts.replace('_', ' '),
+        'universes': universes,
+        'top_n': k,
+        'repeats': REPEATS,
+        'all_match': all_match,
+        'min_winning_universe': min_winning,
+        'results': {str(n): results[n] for n in universes},
+    }
+
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    REPORT_JSON.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    (HISTORY_DIR / f'screening_benchmark_{ts}.json').write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print(f"\n✅ 저장: {REPORT_JSON.name} (+ perf_history/*)")
+
+    if not all_match:
+        print("❌ 스크리닝 결과가 전체 순위와 다름")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
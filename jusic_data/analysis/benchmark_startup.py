@@ -0,0 +1,171 @@
+"""
+챗봇 시작 시간 벤치마크
+
+core/chatbot_cli.py 진입점의 import 시간(python -X importtime)과 챗봇 초기화 시간을
+새 프로세스에서 여러 번 측정하고, 중앙값을 예산과 비교해 reports/에 저장한다.
+
+저장 파일:
+    reports/startup_benchmark.json                  # 최신 결과
+    reports/startup_importtime.txt                  # 중앙값 실행의 importtime 원본
+    reports/perf_history/startup_benchmark_<시각>.json
+
+사용법:
+    python analysis/benchmark_startup.py            # 기본 5회
+    python analysis/benchmark_startup.py 10         # 측정 횟수 지정
+
+예산을 넘으면 종료 코드 1을 반환한다.
+초기화 예산은 모델 분할 파일이 있는 상태 기준이다. 분할 파일은 챗봇이 처음 로드할 때 생성하므로
+측정 전에 1번 실행해 두고 (체크아웃 직후 첫 실행의 분할 시간은 측정에서 제외), 그 시간은 warmup_ms로 따로 기록한다.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from datetime import datetime
+
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+REPORT_JSON = ROOT_DIR / 'reports' / 'startup_benchmark.json'
+REPORT_IMPORTTIME = ROOT_DIR / 'reports' / 'startup_importtime.txt'
+HISTORY_DIR = ROOT_DIR / 'reports' / 'perf_history'
+
+# 목표 예산 (ms, 측정 중앙값 기준)
+IMPORT_BUDGET_MS = 150
+INIT_BUDGET_MS = 150
+
+# 스냅샷 응답 경로에서 로드되면 안 되는 무거운 모듈
+HEAVY_MODULES = ['numpy', 'pandas', 'yfinance', 'pykrx', 'sklearn', 'matplotlib']
+
+# 측정용 자식 프로세스 코드 (import → 초기화 시간, 로드된 무거운 모듈 출력)
+CHILD_CODE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import core.chatbot_cli
+t1 = time.perf_counter()
+from core.multi_timeframe_chatbot import MultiTimeframeChatbot
+chatbot = MultiTimeframeChatbot(silent=True)
+t2 = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+sys.__stdout__.write('BENCH ' + json.dumps({{
+    'import_ms': (t1 - t0) * 1000, 'init_ms': (t2 - t1) * 1000,
+    'heavy': heavy, 'lazy_models': chatbot.model_store.lazy,
+}}) + '\\n')
+"""
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime 출력 파싱
+
+    Returns:
+        list: [{'module', 'self_us', 'cumulative_us', 'depth'}]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append({
+            'module': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': depth,
+        })
+    return rows
+
+
+def run_once():
+    """새 프로세스 1회 측정"""
+    code = CHILD_CODE.format(root=str(ROOT_DIR), heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, encoding='utf-8'
+    )
+
+    bench = None
+    for line in proc.stdout.splitlines():
+        if line.startswith('BENCH '):
+            bench = json.loads(line[len('BENCH '):])
+    if bench is None:
+        raise RuntimeError(f"benchmark child failed:\n{proc.stderr[-2000:]}")
+
+    bench['importtime'] = proc.stderr
+    return bench
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("="*80)
+    print(f"⏱️ 챗봇 시작 시간 벤치마크 ({runs}회)")
+    print("="*80)
+
+    # 첫 실행: 모델 분할 파일이 없거나 번들이 바뀌었으면 여기서 생성
+    warmup = run_once()
+    print(f"   warm-up: import {warmup['import_ms']:.1f}ms, init {warmup['init_ms']:.1f}ms")
+
+    results = []
+    for i in range(runs):
+        bench = run_once()
+        results.append(bench)
+        print(f"   {i+1}/{runs}: import {bench['import_ms']:.1f}ms, init {bench['init_ms']:.1f}ms")
+
+    import_ms = statistics.median(r['import_ms'] for r in results)
+    init_ms = statistics.median(r['init_ms'] for r in results)
+
+    # 중앙값에 가장 가까운 실행의 importtime을 대표로 저장
+    median_run = min(results, key=lambda r: abs(r['import_ms'] - import_ms))
+    rows = parse_importtime(median_run['importtime'])
+    top_level = sorted(
+        (r for r in rows if r['depth'] == 0),
+        key=lambda r: r['cumulative_us'], reverse=True
+    )[:15]
+
+    ts = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    report = {
+        'timestamp': ts.replace('_', ' '),
+        'python': sys.version.split()[0],
+        'runs': runs,
+        'import_ms': round(import_ms, 1),
+        'init_ms': round(init_ms, 1),
+        'warmup_ms': round(warmup['import_ms'] + warmup['init_ms'], 1),
+        'budget': {'import_ms': IMPORT_BUDGET_MS, 'init_ms': INIT_BUDGET_MS},
+        'within_budget': import_ms <= IMPORT_BUDGET_MS and init_ms <= INIT_BUDGET_MS,
+        'lazy_models': median_run['lazy_models'],
+        'heavy_modules_loaded': median_run['heavy'],
+        'top_imports': [
+            {'module': r['module'], 'cumulative_ms': round(r['cumulative_us'] / 1000, 1)}
+            for r in top_level
+        ],
+    }
+
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    REPORT_JSON.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    REPORT_IMPORTTIME.write_text(median_run['importtime'], encoding='utf-8')
+    (HISTORY_DIR / f'startup_benchmark_{ts}.json').write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print(f"\n📊 중앙값: import {import_ms:.1f}ms (예산 {IMPORT_BUDGET_MS}ms), init {init_ms:.1f}ms (예산 {INIT_BUDGET_MS}ms)")
+    print(f"   로드된 무거운 모듈: {', '.join(median_run['heavy']) or '없음'}")
+    if not median_run['lazy_models']:
+        print("   ⚠️ 모델 분할 파일을 만들 수 없음 (번들 전체 로드)")
+    print(f"\n   상위 import (누적):")
+    for r in report['top_imports'][:8]:
+        print(f"   - {r['module']:40s} {r['cumulative_ms']:8.1f}ms")
+
+    print(f"\n✅ 저장: {REPORT_JSON.name}, {REPORT_IMPORTTIME.name} (+ perf_history/*)")
+
+    if not report['within_budget']:
+        print("❌ 예산 초과")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
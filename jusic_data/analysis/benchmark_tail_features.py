@@ -0,0 +1,122 @@
+"""
+추론용 마지막 행 피처 벤치마크
+
+종목별 일봉으로 전체 피처 계산(build_features(tail=False))과 마지막 행 계산(tail=True)의
+시간을 비교하고, 모델 입력 피처의 마지막 행이 같은지 확인한다.
+하나라도 다르면 종료 코드 1을 반환한다.
+
+저장 파일:
+    reports/tail_features_benchmark.json
+    reports/perf_history/tail_features_benchmark_<시각>.json
+
+사용법:
+    python analysis/benchmark_tail_features.py          # 종목별 20회 반복
+    python analysis/benchmark_tail_features.py 50       # 반복 횟수 지정
+"""
+
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+warnings.filterwarnings('ignore')
+
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.multi_timeframe_chatbot import (
+    MultiTimeframeChatbot, DIRECTION_FEATURES, VOLATILITY_FEATURES, RISK_FEATURES
+)
+from utils.features import calculate_technical_indicators, last_row_indicators
+from utils.stock_name_mapping import STOCK_NAME_MAPPING
+
+REPORT_JSON = ROOT_DIR / 'reports' / 'tail_features_benchmark.json'
+HISTORY_DIR = ROOT_DIR / 'reports' / 'perf_history'
+
+FEATURES = sorted(set(DIRECTION_FEATURES + VOLATILITY_FEATURES + RISK_FEATURES)) + ['Close']
+
+
+def time_ms(func, repeat):
+    """평균 실행 시간 (ms)"""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print("="*80)
+    print(f"🏁 마지막 행 피처 벤치마크 ({len(STOCK_NAME_MAPPING)}종목, {repeat}회 반복)")
+    print("="*80)
+
+    chatbot = MultiTimeframeChatbot(silent=True, snapshot_max_age=-1)
+    # 거시경제/pykrx 로드는 측정에서 제외
+    chatbot.macro_data, chatbot.pykrx_data
+
+    full_ms, tail_ms, full_indicator_ms, indicator_ms = [], [], [], []
+    fallback = []
+    all_match = True
+    for ticker in STOCK_NAME_MAPPING:
+        data = chatbot.fetch_bars(ticker)
+        if data is None:
+            continue
+
+        full = chatbot.build_features(ticker, data, tail=False)
+        tail = chatbot.build_features(ticker, data)
+        if chatbot._tail_features(ticker, data) is None:
+            fallback.append(ticker)
+
+        a = tail[FEATURES].iloc[-1].to_numpy(dtype=float)
+        e = full[FEATURES].iloc[-1].to_numpy(dtype=float)
+        match = len(tail) == 1 and tail.index[-1] == full.index[-1] and np.allclose(a, e, rtol=1e-10, atol=1e-10)
+        if not match:
+            print(f"   ❌ {ticker} 마지막 행 불일치")
+        all_match &= match
+
+        full_ms.append(time_ms(lambda: chatbot.build_features(ticker, data, tail=False), repeat))
+        tail_ms.append(time_ms(lambda: chatbot.build_features(ticker, data), repeat))
+        full_indicator_ms.append(time_ms(lambda: calculate_technical_indicators(data), repeat))
+        close, volume = data['Close'].to_numpy(dtype=float), data['Volume'].to_numpy(dtype=float)
+        indicator_ms.append(time_ms(lambda: last_row_indicators(close, volume), repeat))
+
+    full_avg, tail_avg = float(np.mean(full_ms)), float(np.mean(tail_ms))
+    print(f"   전체 계산      {full_avg:7.2f}ms/종목")
+    print(f"   마지막 행 계산 {tail_avg:7.2f}ms/종목 ({full_avg / tail_avg:.1f}배)")
+    print(f"   기술 지표만    {np.mean(full_indicator_ms):7.3f}ms → {np.mean(indicator_ms):7.3f}ms/종목 "
+          f"({np.mean(full_indicator_ms) / np.mean(indicator_ms):.1f}배)")
+    print(f"   전체 계산 대체 {len(fallback)}종목 | {'일치' if all_match else '불일치'}")
+
+    ts = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    report = {
+        'timestamp': ts.replace('_', ' '),
+        'tickers': len(full_ms),
+        'repeat': repeat,
+        'full_ms': round(full_avg, 3),
+        'tail_ms': round(tail_avg, 3),
+        'full_indicators_ms': round(float(np.mean(full_indicator_ms)), 4),
+        'last_row_indicators_ms': round(float(np.mean(indicator_ms)), 4),
+        'speedup': round(full_avg / tail_avg, 2),
+        'fallback': fallback,
+        'all_match': all_match,
+    }
+
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    REPORT_JSON.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    (HISTORY_DIR / f'tail_features_benchmark_{ts}.json').write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print(f"\n✅ 저장: {REPORT_JSON.name} (+ perf_history/*)")
+
+    if not all_match:
+        print("❌ 마지막 행 피처가 전체 계산과 다름")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
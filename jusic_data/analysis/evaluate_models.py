@@ -9,7 +9,6 @@ from datetime import datetime
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
 
 # 루트 디렉토리를 sys.path에 추가
@@ -17,7 +16,10 @@ ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from utils.stock_name_mapping import STOCK_NAME_MAPPING
-from utils.data_utils import load_or_download_macro_data, merge_macro_features
+from utils.data_utils import load_or_download_macro_data, merge_macro_features, load_investor_data
+from utils.bar_store import get_bars
+from utils.features import add_interactions
+from utils.feature_store import get_feature_store
 
 try:
     from utils.data_utils import merge_pykrx_features as _merge_pykrx
@@ -26,7 +28,6 @@ except Exception:
 
 # ----------------------------- 설정 -----------------------------
 PKL_PATH = ROOT_DIR / 'core' / 'final_multi_timeframe_models.pkl'
-PYKRX_CACHE = ROOT_DIR / 'data' / 'pykrx_data_30stocks_cache.pkl'
 REPORT_JSON = ROOT_DIR / 'reports' / 'model_performance_report.json'
 REPORT_CSV = ROOT_DIR / 'reports' / 'model_performance_report.csv'
 HISTORY_DIR = ROOT_DIR / 'reports' / 'perf_history'
@@ -46,11 +47,12 @@ PERIODS = {
 # ---------------------- 보조 함수 ----------------------
 
 def yf_download_retry(ticker: str, period: str, tries: int = 3):
+    """로컬 일봉 저장소 조회 (새 거래일만 다운로드, 실패 시 재시도)"""
     last_exc = None
     for _ in range(tries):
         try:
-            df = yf.download(ticker, period=period, progress=False)
-            if not df.empty:
+            df = get_bars(ticker, period)
+            if df is not None and not df.empty:
                 return df
         except Exception as e:
             last_exc = e
@@ -60,49 +62,6 @@ def yf_download_retry(ticker: str, period: str, tries: int = 3):
 
 # ---------------------- 피처/타깃 생성 함수 ----------------------
 
-def calc_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df['MA_5'] = df['Close'].rolling(5).mean()
-    df['MA_20'] = df['Close'].rolling(20).mean()
-    df['MA_Ratio'] = df['MA_5'] / df['MA_20']
-
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-
-    df['Price_Change'] = df['Close'].pct_change()
-    df['Volume_Ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
-    df['Volatility'] = df['Close'].pct_change().rolling(10).std()
-
-    exp1 = df['Close'].ewm(span=12).mean()
-    exp2 = df['Close'].ewm(span=26).mean()
-    df['MACD'] = exp1 - exp2
-
-    bb_middle = df['Close'].rolling(20).mean()
-    bb_std = df['Close'].rolling(20).std()
-    df['BB_Upper'] = bb_middle + (bb_std * 2)
-    df['BB_Lower'] = bb_middle - (bb_std * 2)
-    df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-
-    df['Momentum_5'] = df['Close'].pct_change(5)
-    return df
-
-
-def add_interactions(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df['RSI_x_Volume'] = df['RSI'] * df['Volume_Ratio']
-    df['Trend_Strength'] = df['MA_Ratio'] * df['Momentum_5']
-    df['BB_Momentum'] = df['BB_Position'] * df['Momentum_5']
-    df['Volatility_x_RSI'] = df['Volatility'] * df['RSI']
-    df['MACD_x_Volume'] = df['MACD'] * df['Volume_Ratio']
-    df['Price_Momentum'] = df['Price_Change'] * df['Momentum_5']
-    df['RSI_MACD'] = df['RSI'] * df['MACD']
-    df['BB_Volatility'] = df['BB_Position'] * df['Volatility']
-    return df
-
-
 def create_targets(df: pd.DataFrame, task: str, horizon_n: int, dir_median: float | None) -> pd.Series:
     df = df.copy()
     if task == 'direction':
@@ -129,14 +88,24 @@ def build_dataset(tickers, task, horizon, macro_df, medians, pykrx_cache) -> pd.
     if task == 'direction' and isinstance(medians, dict):
         dir_median = medians.get(f'direction_{horizon}')
 
+    # 일봉 수집 후 기술 지표는 피처 저장소에서 읽음 (새 봉만 추가, 과제/기간별로 다시 계산하지 않음)
+    bars = {}
     for ticker in tickers:
+        data = yf_download_retry(ticker, period)
+        if data.empty:
+            continue
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.droplevel(1)
+        bars[ticker] = data
+    store = get_feature_store()
+
+    for ticker, data in bars.items():
         try:
-            data = yf_download_retry(ticker, period)
-            if data.empty:
-                continue
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.droplevel(1)
-            df = calc_technical_indicators(data)
+            # 종목별로 저장소 갱신/읽기 (저장소 파일 오류도 그 종목만 건너뜀)
+            store.append(ticker, data)
+            df = store.read(ticker, data.index.min(), data.index.max())
+            if df is None:
+                raise RuntimeError('feature store read failed')
             df = merge_macro_features(df, macro_df)
 
             # pykrx 병합
@@ -264,15 +233,8 @@ def main():
 
     macro_df = load_or_download_macro_data()
 
-    # pykrx 캐시 로드
-    pykrx_cache = None
-    if PYKRX_CACHE.exists():
-        try:
-            with PYKRX_CACHE.open('rb') as f:
-                pykrx_cache = pickle.load(f).get('data', {})
-        except Exception as e:
-            print(f"[WARN] pykrx 캐시 로드 실패: {e}")
-            pykrx_cache = None
+    # pykrx 캐시 로드 (종목별 열 단위 데이터, 없으면 예전 pickle)
+    pykrx_cache = load_investor_data()
 
     tickers = list(STOCK_NAME_MAPPING.keys())
 
@@ -1,16 +1,22 @@
 """
 Spring Boot에서 호출 가능한 CLI 챗봇
+
+사용법:
+    python core/chatbot_cli.py "내일 삼성전자 어때?"   # 1회 실행
+    python core/chatbot_cli.py --serve                  # 상주 모드 (stdin/stdout JSON-lines)
 """
 
 import sys
 import json
 import io
+import os
 from pathlib import Path
 
 # UTF-8 출력 설정 (Windows 환경 대응)
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+    sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
 
 # 루트 디렉토리를 sys.path에 추가
 ROOT_DIR = Path(__file__).parent.parent
@@ -26,10 +32,8 @@ def extract_structured_data(chatbot, user_message, timeframe):
     if any(word in message_lower for word in ['추천', '순위', '좋은', '어떤', '뭐']):
         ticker = chatbot.extract_stock(user_message)
         if not ticker:  # 특정 종목이 아닌 전체 순위 요청
-            results = chatbot.rank_all_stocks(timeframe)
-            
             # 상위 5개
-            top_5 = results[:5]
+            top_5 = chatbot.top_stocks(timeframe, 5)
             
             # 차트 데이터 생성
             recommendations = []
@@ -102,12 +106,92 @@ def extract_structured_data(chatbot, user_message, timeframe):
     
     return None
 
+def handle_message(chatbot, user_message):
+    """메시지 1건 처리 → main()이 출력하는 것과 같은 JSON dict 반환"""
+    try:
+        # 같은 요청 안에서는 예측 결과를 한 번만 계산 (응답 텍스트와 차트 데이터가 공유)
+        with chatbot.request_scope():
+            # 챗봇 응답
+            response = chatbot.chat(user_message)
+            
+            # 타임프레임 정보
+            timeframe = chatbot.detect_timeframe(user_message)
+            
+            # 구조화된 데이터 추출
+            structured_data = extract_structured_data(chatbot, user_message, timeframe)
+        
+        # JSON 응답
+        result = {
+            "success": True,
+            "message": response,
+            "timeframe": timeframe
+        }
+        
+        # 구조화된 데이터가 있으면 추가
+        if structured_data:
+            result.update(structured_data)
+        
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+def serve(chatbot, out):
+    """
+    상주(serve) 모드: stdin으로 JSON-lines 요청을 받아 stdout으로 한 줄씩 응답
+    
+    요청: {"id": 1, "message": "내일 삼성전자 어때?"} 또는 메시지 평문 한 줄
+    응답: main()과 같은 JSON + dataAge (데이터 소스별 나이, 요청에 id가 있으면 그대로 돌려줌)
+    
+    일봉/거시경제/투자자별 데이터는 백그라운드에서 KRX 장 시간에 맞춰 갱신한다
+    (JUSIC_BACKGROUND_REFRESH=0이면 끔).
+    """
+    def reply(result):
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+    
+    if os.environ.get('JUSIC_BACKGROUND_REFRESH', '1') != '0':
+        chatbot.start_refresher()
+    
+    reply({"success": True, "ready": True})
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        request_id = None
+        if line.startswith('{'):
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                reply({"success": False, "error": f"잘못된 요청 형식: {e}"})
+                continue
+            request_id = request.get('id')
+            user_message = request.get('message')
+        else:
+            user_message = line
+        
+        if not user_message:
+            result = {"success": False, "error": "메시지를 입력하세요"}
+        else:
+            result = handle_message(chatbot, user_message)
+        
+        result["dataAge"] = chatbot.data_age()
+        if request_id is not None:
+            result["id"] = request_id
+        reply(result)
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({"error": "메시지를 입력하세요"}))
         sys.exit(1)
     
-    user_message = sys.argv[1]
+    serve_mode = sys.argv[1] == '--serve'
+    out = sys.stdout
     
     try:
         # 챗봇 초기화 (모든 출력 억제)
@@ -115,42 +199,33 @@ def main():
         warnings.filterwarnings('ignore')
         
         # stderr 출력 완전히 억제 (Spring Boot용)
-        import os
         if os.environ.get('SPRING_BOOT_MODE') != 'false':
             sys.stderr = open(os.devnull, 'w')
         
-        chatbot = MultiTimeframeChatbot(silent=True)
-        
-        # 챗봇 응답 (stdout으로 JSON만 출력)
-        response = chatbot.chat(user_message)
-        
-        # 타임프레임 정보
-        timeframe = chatbot.detect_timeframe(user_message)
-        
-        # 구조화된 데이터 추출
-        structured_data = extract_structured_data(chatbot, user_message, timeframe)
-        
-        # JSON 응답
-        result = {
-            "success": True,
-            "message": response,
-            "timeframe": timeframe
-        }
-        
-        # 구조화된 데이터가 있으면 추가
-        if structured_data:
-            result.update(structured_data)
+        # 응답 채널은 원래 stdout만 사용 (내부 print 출력은 stderr로)
+        # 데이터 로드가 첫 질문 처리 시점으로 미뤄졌으므로 1회 실행 모드도 동일
+        sys.stdout = sys.stderr
         
-        print(json.dumps(result, ensure_ascii=False))
+        chatbot = MultiTimeframeChatbot(silent=True)
         
     except Exception as e:
         error_result = {
             "success": False,
             "error": str(e)
         }
-        print(json.dumps(error_result, ensure_ascii=False))
+        out.write(json.dumps(error_result, ensure_ascii=False) + "\n")
+        sys.exit(1)
+    
+    if serve_mode:
+        serve(chatbot, out)
+        return
+    
+    # 챗봇 응답 (stdout으로 JSON만 출력)
+    result = handle_message(chatbot, sys.argv[1])
+    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    
+    if not result["success"]:
         sys.exit(1)
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,210 @@
+"""
+상주 챗봇용 백그라운드 데이터 갱신
+
+KRX 장 시간에 맞춰 일봉/거시경제/투자자별 데이터를 백그라운드 스레드에서 다시 받는다.
+갱신 중에도 요청은 마지막으로 성공한 데이터로 바로 처리하고 (stale-while-revalidate),
+갱신이 성공하면 챗봇의 데이터를 새 객체로 통째로 교체한다. 실패하면 기존 데이터를 유지한다.
+
+일봉을 갱신하면 증분 지표 상태(utils/indicator_state.py)도 새 봉만 반영해 체크포인트로 저장한다.
+추론 피처(마지막 행)의 기술 지표는 이 상태가 일봉과 맞으면 그 값을 쓴다.
+
+갱신 일정 (KST, KRX 거래일):
+    bars     : 장중 10분마다 + 마감 후 15:40
+    macro    : 08:30 (미국장 마감 후), 15:40
+    investor : 18:10 (투자자별 거래실적 확정 후)
+
+서버 시작 시 모든 소스를 1번 갱신한다. 실패한 소스는 RETRY_INTERVAL 후 다시 시도한다.
+"""
+
+import threading
+from datetime import datetime, timedelta, time as dtime
+
+from utils.market_calendar import now_kst, is_session_open, is_trading_day
+from utils.data_utils import last_date
+from utils.market_data import fetch_concurrently
+from utils.stock_name_mapping import STOCK_NAME_MAPPING
+
+# 소스별 거래일 갱신 시각
+SCHEDULE = {
+    'bars': [dtime(15, 40)],
+    'macro': [dtime(8, 30), dtime(15, 40)],
+    'investor': [dtime(18, 10)],
+}
+
+# 장중 일봉 갱신 간격 (일봉 저장소 INTRADAY_TTL과 동일)
+INTRADAY_INTERVAL = timedelta(minutes=10)
+
+# 실패 후 재시도 간격
+RETRY_INTERVAL = timedelta(minutes=15)
+
+# 일정 확인 간격 (초)
+POLL_SECONDS = 30
+
+# 투자자별 데이터가 없는 종목의 다운로드 구간 (피처는 최근 1개월만 사용, 있는 종목은 마지막 저장일 이후만)
+INVESTOR_LOOKBACK_DAYS = 45
+
+
+def latest_slot(times, now):
+    """now 이전의 가장 최근 KRX 거래일 갱신 시각 (없으면 None)"""
+    for days_back in range(8):
+        day = (now - timedelta(days=days_back)).date()
+        if not is_trading_day(day):
+            continue
+        slots = [datetime.combine(day, t) for t in times if datetime.combine(day, t) <= now]
+        if slots:
+            return max(slots)
+    return None
+
+
+class DataRefresher:
+    def __init__(self, chatbot, poll_seconds=POLL_SECONDS):
+        """
+        Args:
+            chatbot: MultiTimeframeChatbot
+            poll_seconds: 일정 확인 간격 (초)
+        """
+        self.chatbot = chatbot
+        self.poll_seconds = poll_seconds
+
+        # 소스별 마지막 시도 (KST) / 성공 여부
+        self.last_attempt = {source: None for source in SCHEDULE}
+        self.last_ok = {source: False for source in SCHEDULE}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='data-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_due(self, source, now=None):
+        """갱신 시점 여부"""
+        now = now or now_kst()
+        last = self.last_attempt[source]
+        if last is None:
+            return True
+
+        if not self.last_ok[source] and now - last >= RETRY_INTERVAL:
+            return True
+
+        if source == 'bars' and is_session_open(now) and now - last >= INTRADAY_INTERVAL:
+            return True
+
+        slot = latest_slot(SCHEDULE[source], now)
+        return slot is not None and last < slot
+
+    def _run(self):
+        jobs = {
+            'bars': self.refresh_bars,
+            'macro': self.refresh_macro,
+            'investor': self.refresh_investor,
+        }
+        while not self._stop.is_set():
+            for source, job in jobs.items():
+                if self._stop.is_set() or not self.is_due(source):
+                    continue
+                self.last_attempt[source] = now_kst()
+                try:
+                    as_of = job()
+                except Exception as e:
+                    print(f"  WARNING: {source} refresh failed: {e}")
+                    as_of = None
+                self.last_ok[source] = as_of is not None
+                if as_of is not None:
+                    self.chatbot.mark_data_updated(source, as_of=as_of)
+            self._stop.wait(self.poll_seconds)
+
+    def refresh_bars(self):
+        """
+        전체 종목 최근 1개월 일봉 동기화 + 증분 지표 상태 갱신
+        
+        Returns:
+            str: 마지막 일봉 날짜 (실패 시 None)
+        """
+        store = self.chatbot.bar_store
+        tickers = list(STOCK_NAME_MAPPING.keys())
+        entries = fetch_concurrently(
+            tickers, lambda t: store.sync(t, '1mo', timeout=self.chatbot.fetch_timeout),
+            max_workers=self.chatbot.max_workers, timeout=self.chatbot.fetch_timeout
+        )
+        
+        # 새 봉만 O(1)씩 반영 (장중 임시 봉은 같은 날짜로 교체)
+        indicators = self.chatbot.indicators
+        for ticker, entry in entries.items():
+            if entry is not None:
+                indicators.sync(ticker, entry['bars'])
+        try:
+            indicators.save()
+        except OSError as e:
+            print(f"  WARNING: indicator state save failed: {e}")
+        
+        dates = [entry['bars'].index[-1] for entry in entries.values() if entry is not None]
+        return max(dates).date().isoformat() if dates else None
+
+    def refresh_macro(self):
+        """거시경제 데이터 오늘까지 갱신 (새 거래일이 마감된 지표만 다시 받음, 4개 지표가 모두 있을 때만 교체, 반환: 마지막 날짜)"""
+        from utils.data_utils import load_or_download_macro_data, macro_feature_table
+
+        end_date = (now_kst() + timedelta(days=1)).strftime('%Y%m%d')
+        macro = load_or_download_macro_data(end_date=end_date)
+        if not all(key in macro for key in ('kospi', 'usd_krw', 'vix', 'sp500')):
+            return None
+
+        # 피처 표는 교체 전에 미리 계산 (요청 처리 중 계산하지 않도록)
+        macro_feature_table(macro)
+        self.chatbot._macro_data = macro
+        return last_date(macro)
+
+    def refresh_investor(self):
+        """
+        투자자별 순매수 마지막 저장일 이후만 받아 기존 데이터에 합치기
+        
+        Returns:
+            str: 마지막 날짜 (새 데이터가 없어도 확인에 성공하면 기존 마지막 날짜,
+                 잠금을 못 얻었거나 중단했으면 None)
+        """
+        from utils.cache_io import cache_lock
+        from utils.data_utils import (
+            investor_ratio_table, update_investor_data, load_investor_data, save_investor_data,
+        )
+
+        today = now_kst().date()
+        # 데이터가 없는 종목만 최근 구간 전체를 받음
+        start = (today - timedelta(days=INVESTOR_LOOKBACK_DAYS)).strftime('%Y%m%d')
+        end = today.strftime('%Y%m%d')
+
+        # 같은 데이터를 쓰는 다른 프로세스와 동시에 받지 않음 (잠금을 못 얻으면 다음 재시도까지 기존 데이터 유지)
+        lock = cache_lock('investor_data')
+        if not lock.acquire():
+            print("  WARNING: investor data is being refreshed by another process")
+            return None
+        try:
+            # 다른 프로세스가 먼저 받아 저장한 종목은 디스크 데이터를 쓰고, 목표일까지 있는 종목은 요청하지 않음
+            current = self.chatbot.pykrx_data
+            data = dict(current)
+            data.update(load_investor_data() or {})
+            updated = update_investor_data(data, list(STOCK_NAME_MAPPING), start, end, coverage={},
+                                           on_update=lambda *_: lock.touch(), stop=self._stop)
+            if self._stop.is_set():
+                return None
+            data.update(updated)
+
+            # 받은 종목만 열 단위 데이터 교체
+            if updated:
+                save_investor_data(data, updated)
+        finally:
+            lock.release()
+
+        if not updated and last_date(data) == last_date(current):
+            # 새 데이터 없음 (주말/휴일/확정 전): 확인은 성공, 기존 데이터 유지
+            return last_date(current)
+
+        # 순매수 비율 패널은 교체 전에 미리 계산
+        investor_ratio_table(data)
+        self.chatbot._pykrx_data = data
+        return last_date(data)
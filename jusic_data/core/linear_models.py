@@ -0,0 +1,198 @@
+"""
+선형 모델 경량 추론
+
+RobustScaler → (PCA) → LogisticRegression 체인을 하나의 아핀 변환 (w, b)으로 합쳐
+NumPy 배열로 저장하고, sklearn 없이 평가한다.
+
+    z = X @ w + b
+    P(클래스 1) = 1 / (1 + exp(-z))
+
+파일: core/models/<작업>_<기간>.npz (모델 번들을 분할할 때 생성, scripts/compile_linear_models.py로 다시 생성 가능)
+Direction 모델(StackingClassifier)은 선형이 아니므로 대상이 아니다.
+컴파일한 체인은 sklearn 결과와 비교해 TOLERANCE 안일 때만 저장한다.
+
+자체 테스트 (번들의 선형 모델 전체를 sklearn과 비교):
+    python -m core.linear_models
+"""
+
+from pathlib import Path
+import numpy as np
+
+from utils.cache_io import atomic_write
+
+# 허용 오차 (확률)
+TOLERANCE = 1e-9
+
+
+def is_linear_chain(model):
+    """이진 로지스틱 회귀 등 (coef_, intercept_) 선형 분류기인지"""
+    coef = getattr(model, 'coef_', None)
+    return coef is not None and coef.shape[0] == 1 and len(model.classes_) == 2
+
+
+def _scaler_affine(scaler, n_features):
+    """scaler.transform(X) = X @ diag(m) + c 의 (m, c)"""
+    m = np.ones(n_features)
+    c = np.zeros(n_features)
+
+    # RobustScaler: center_/scale_, StandardScaler: mean_/scale_
+    center = getattr(scaler, 'center_', None)
+    if center is None:
+        center = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+
+    if center is not None:
+        c = -np.asarray(center, dtype=np.float64)
+    if scale is not None:
+        m = 1.0 / np.asarray(scale, dtype=np.float64)
+        c = c * m
+
+    return m, c
+
+
+def compile_chain(scaler, pca, model):
+    """
+    scaler → (PCA) → 선형 분류기를 하나의 아핀 변환으로 합침
+
+    Returns:
+        LinearChain
+    """
+    if not is_linear_chain(model):
+        raise ValueError(f"binary linear classifier required: {type(model).__name__}")
+
+    n_features = model.coef_.shape[1] if pca is None else pca.n_features_in_
+
+    # X → X @ M + c
+    M = np.eye(n_features)
+    c = np.zeros(n_features)
+
+    if scaler is not None:
+        m, c = _scaler_affine(scaler, n_features)
+        M = np.diag(m)
+
+    if pca is not None:
+        components = pca.components_.T
+        if pca.whiten:
+            components = components / np.sqrt(pca.explained_variance_)
+        c = (c - pca.mean_) @ components
+        M = M @ components
+
+    coef = model.coef_[0].astype(np.float64)
+    w = M @ coef
+    b = float(c @ coef + model.intercept_[0])
+
+    return LinearChain(w, b, model.classes_)
+
+
+class LinearChain:
+    """컴파일된 선형 체인 (sklearn 분류기와 같은 predict / predict_proba)"""
+
+    def __init__(self, w, b, classes, version=None):
+        self.w = np.asarray(w, dtype=np.float64)
+        self.b = float(b)
+        self.classes_ = np.asarray(classes)
+        self.version = version
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.w + self.b
+
+    def predict_proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    def save(self, path, version=None):
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                w=self.w,
+                b=np.array(self.b),
+                classes=self.classes_,
+                version=np.array(version or self.version or ''),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(Path(path)) as f:
+            return cls(f['w'], f['b'], f['classes'], str(f['version']) or None)
+
+
+def check_equivalence(chain, scaler, pca, model, X):
+    """
+    컴파일된 체인과 sklearn 객체의 결과 비교
+
+    Returns:
+        dict: {'max_prob_diff', 'pred_mismatch'}
+    """
+    Xt = scaler.transform(X) if scaler is not None else X
+    if pca is not None:
+        Xt = pca.transform(Xt)
+
+    expected_prob = model.predict_proba(Xt)[:, 1]
+    expected_pred = model.predict(Xt)
+
+    prob = chain.predict_proba(X)[:, 1]
+    pred = chain.predict(X)
+
+    return {
+        'max_prob_diff': float(np.max(np.abs(prob - expected_prob))),
+        'pred_mismatch': int(np.sum(pred != expected_pred)),
+    }
+
+
+def sample_inputs(scaler, n_features, n=2000, seed=42):
+    """학습 데이터 분포 근처의 임의 입력 (스케일러 중심 ± 3 × 스케일)"""
+    rng = np.random.default_rng(seed)
+    center = getattr(scaler, 'center_', None)
+    if center is None:
+        center = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    center = np.zeros(n_features) if center is None else center
+    scale = np.ones(n_features) if scale is None else scale
+    return center + rng.normal(size=(n, n_features)) * scale * 3
+
+
+def compile_verified(scaler, pca, model):
+    """
+    컴파일 후 sklearn 객체와 결과 비교
+    
+    Returns:
+        tuple: (LinearChain 또는 None (허용 오차 초과), check_equivalence 결과)
+    """
+    chain = compile_chain(scaler, pca, model)
+    check = check_equivalence(chain, scaler, pca, model, sample_inputs(scaler, len(chain.w)))
+    if check['max_prob_diff'] > TOLERANCE or check['pred_mismatch'] > 0:
+        return None, check
+    return chain, check
+
+
+if __name__ == '__main__':
+    # 테스트: 번들의 선형 모델을 컴파일해 sklearn과 비교 + 저장된 .npz가 같은 결과인지
+    import sys
+    import warnings
+    from core.model_store import ModelStore
+
+    warnings.filterwarnings('ignore')
+    store = ModelStore()
+    failed = []
+    for key in store.keys():
+        artifact = store.get(key)
+        scaler, pca, model = artifact['scaler'], artifact['pca'], artifact['model']
+        if not is_linear_chain(model):
+            continue
+
+        chain, check = compile_verified(scaler, pca, model)
+        stored = store.compiled(key)
+        X = sample_inputs(scaler, model.coef_.shape[1] if pca is None else pca.n_features_in_, seed=7)
+        stored_check = check_equivalence(stored, scaler, pca, model, X) if stored is not None else None
+        ok = chain is not None and stored_check is not None and \
+            stored_check['max_prob_diff'] <= TOLERANCE and stored_check['pred_mismatch'] == 0
+        if not ok:
+            failed.append(key)
+        print(f"   {key:20s} {'OK' if ok else 'FAIL'} (확률 차 {check['max_prob_diff']:.2e}"
+              + (f", 저장된 .npz {stored_check['max_prob_diff']:.2e})" if stored_check else ", 저장된 .npz 없음)"))
+
+    print('[OK] compiled linear chains match sklearn' if not failed else f'[FAIL] {failed}')
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,296 @@
+"""
+멀티 타임프레임 모델 저장소 (지연 로딩)
+
+final_multi_timeframe_models.pkl 번들을 (작업, 기간)별 파일로 나눠 저장하고
+manifest.json으로 관리한다. 챗봇은 처음 사용하는 모델만 로드해서 캐시하므로
+단일 종목/단일 기간 질문은 번들 전체가 아닌 필요한 3개 파일만 읽는다.
+
+폴더 구조:
+    core/models/manifest.json        # 버전, 성능 지표, 중앙값, 파일 목록
+    core/models/direction_5day.pkl   # {'model', 'scaler', 'pca'}
+    core/models/risk_5day.npz        # 컴파일된 선형 체인 (core/linear_models.py)
+    ...
+
+분할 파일이 없거나 번들 내용이 바뀌었으면 (manifest 버전 = 번들 SHA-256 해시) 처음 로드할 때
+다시 분할한다 (scripts/split_model_bundle.py로 미리 만들 수도 있음). 시작할 때마다 번들 전체를 읽어
+해시하지 않도록 manifest에 분할 때의 번들 (크기, 수정 시각 ns)을 기록해 두고, 둘 다 같으면 해시 없이 쓴다.
+크기는 같은데 수정 시각만 바뀌었으면 (체크아웃/복사) 1번 해시로 확인한 뒤 manifest의 수정 시각을 갱신한다.
+폴더에 쓸 수 없으면 기존처럼 번들 전체를 로드한다.
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+
+from utils.cache_io import FileLock, atomic_pickle, atomic_write_text
+
+ROOT_DIR = Path(__file__).parent.parent
+BUNDLE_PATH = ROOT_DIR / 'core' / 'final_multi_timeframe_models.pkl'
+MODEL_DIR = ROOT_DIR / 'core' / 'models'
+MANIFEST_NAME = 'manifest.json'
+
+# 분할 형식 버전 (분할 파일 구성이 바뀌면 올림, 다른 버전 manifest는 다시 분할)
+SPLIT_FORMAT = 2
+
+
+def _to_builtin(value):
+    """numpy 스칼라 등을 JSON 저장 가능한 값으로 변환"""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def bundle_version(raw):
+    """번들 버전 (내용 SHA-256 앞 16자리)"""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def split_bundle(bundle_path=BUNDLE_PATH, model_dir=MODEL_DIR):
+    """
+    모델 번들을 (작업, 기간)별 파일로 분할 (선형 체인은 .npz로 컴파일, sklearn과 결과가 같을 때만)
+
+    Returns:
+        dict: 생성된 manifest
+    """
+    bundle_path = Path(bundle_path)
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    from core.linear_models import compile_verified, is_linear_chain
+
+    stat = bundle_path.stat()
+    raw = bundle_path.read_bytes()
+    bundle = pickle.loads(raw)
+    version = bundle_version(raw)
+
+    models = bundle['models']
+    scalers = bundle.get('scalers', {})
+    pcas = bundle.get('pcas', {})
+
+    artifacts = {}
+    for key in models:
+        artifact = {
+            'model': models[key],
+            'scaler': scalers.get(key),
+            'pca': pcas.get(key),
+        }
+        filename = f'{key}.pkl'
+        atomic_pickle(model_dir / filename, artifact)
+
+        artifacts[key] = {
+            'file': filename,
+            'bytes': (model_dir / filename).stat().st_size,
+            'has_scaler': artifact['scaler'] is not None,
+            'has_pca': artifact['pca'] is not None,
+        }
+
+        if is_linear_chain(artifact['model']):
+            chain, check = compile_verified(artifact['scaler'], artifact['pca'], artifact['model'])
+            if chain is not None:
+                chain.save(model_dir / f'{key}.npz', version=version)
+                artifacts[key]['compiled'] = f'{key}.npz'
+            else:
+                print(f"  WARNING: {key} compiled chain differs from sklearn ({check['max_prob_diff']:.2e}), not saved")
+
+    manifest = {
+        'format': SPLIT_FORMAT,
+        'version': version,
+        'source': bundle_path.name,
+        'source_size': len(raw),
+        'source_mtime_ns': stat.st_mtime_ns,
+        'created': datetime.now().isoformat(),
+        'performance': _to_builtin(bundle.get('performance', {})),
+        'medians': _to_builtin(bundle.get('medians', {})),
+        'artifacts': artifacts,
+    }
+
+    # manifest는 마지막에 교체 (분할 파일이 모두 써진 뒤에만 유효)
+    atomic_write_text(model_dir / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    return manifest
+
+
+class ModelStore:
+    def __init__(self, model_dir=MODEL_DIR, bundle_path=BUNDLE_PATH):
+        """manifest가 유효하면 지연 로딩 (없거나 번들이 바뀌었으면 다시 분할), 분할할 수 없으면 번들 전체 로드"""
+        self.model_dir = Path(model_dir)
+        self.bundle_path = Path(bundle_path)
+
+        self._artifacts = {}
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+        manifest = self._load_manifest()
+        if manifest is None:
+            manifest = self._split()
+        if manifest is not None:
+            self.lazy = True
+            self.version = manifest['version']
+            self.performance = manifest['performance']
+            self.medians = manifest['medians']
+            self._manifest = manifest['artifacts']
+        else:
+            self.lazy = False
+            self._load_bundle()
+
+    def _load_manifest(self):
+        """분할 파일 manifest 로드 (없거나, 분할 파일이 빠졌거나, 번들 내용이 바뀌었으면 None)"""
+        path = self.model_dir / MANIFEST_NAME
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  WARNING: model manifest load failed: {e}")
+            return None
+
+        if manifest.get('format') != SPLIT_FORMAT:
+            return None
+        files = [name for info in manifest['artifacts'].values() for name in (info['file'], info.get('compiled')) if name]
+        if any(not (self.model_dir / name).exists() for name in files):
+            return None
+
+        # 분할 이후 번들이 다시 저장됐으면 분할 파일을 쓰지 않음
+        try:
+            stat = self.bundle_path.stat()
+        except OSError:
+            return manifest
+        if stat.st_size != manifest.get('source_size'):
+            return None
+        if stat.st_mtime_ns != manifest.get('source_mtime_ns'):
+            # 크기는 같고 수정 시각만 다름 (체크아웃/복사 또는 같은 크기로 다시 저장): 해시로 확인 (unpickle 없음)
+            if bundle_version(self.bundle_path.read_bytes()) != manifest['version']:
+                return None
+            manifest['source_mtime_ns'] = stat.st_mtime_ns
+            try:
+                atomic_write_text(path, json.dumps(manifest, ensure_ascii=False, indent=2))
+            except OSError:
+                pass
+
+        return manifest
+
+    def _split(self):
+        """번들을 분할해 manifest 반환 (번들이 없거나 폴더에 쓸 수 없으면 None)"""
+        if not self.bundle_path.exists():
+            return None
+
+        try:
+            self.model_dir.mkdir(parents=True, exist_ok=True)
+            # 여러 프로세스가 처음 로드할 때 한 프로세스만 분할하고 나머지는 그 결과를 사용
+            lock = FileLock(self.model_dir / '.split.lock')
+            if not lock.acquire():
+                return None
+            try:
+                manifest = self._load_manifest()
+                if manifest is None:
+                    print(f"[Models] Splitting model bundle into {self.model_dir.name}/ (no split files or bundle changed)")
+                    manifest = split_bundle(self.bundle_path, self.model_dir)
+            finally:
+                lock.release()
+        except OSError as e:
+            print(f"  WARNING: model bundle split failed, loading full bundle: {e}")
+            return None
+
+        return manifest
+
+    def _load_bundle(self):
+        """번들 전체 로드 (분할 파일이 없을 때)"""
+        raw = self.bundle_path.read_bytes()
+        data = pickle.loads(raw)
+
+        self.version = bundle_version(raw)
+        self.performance = data['performance']
+        self.medians = data['medians']
+
+        scalers = data['scalers']
+        pcas = data.get('pcas', {})
+        self._manifest = {}
+        for key, model in data['models'].items():
+            self._artifacts[key] = {
+                'model': model,
+                'scaler': scalers.get(key),
+                'pca': pcas.get(key),
+            }
+            self._manifest[key] = {
+                'has_scaler': key in scalers and scalers[key] is not None,
+                'has_pca': key in pcas and pcas[key] is not None,
+            }
+
+    def keys(self):
+        return list(self._manifest.keys())
+
+    def get(self, key):
+        """모델 1세트 {'model', 'scaler', 'pca'} (처음 요청 시 로드 후 캐시)"""
+        artifact = self._artifacts.get(key)
+        if artifact is not None:
+            return artifact
+
+        if key not in self._manifest:
+            raise KeyError(key)
+
+        with self._lock:
+            if key not in self._artifacts:
+                with open(self.model_dir / self._manifest[key]['file'], 'rb') as f:
+                    self._artifacts[key] = pickle.load(f)
+            return self._artifacts[key]
+
+    def compiled(self, key):
+        """컴파일된 선형 체인 (core/models/<키>.npz, 분할할 때 생성, 없거나 번들 버전이 다르면 None)"""
+        if key not in self._compiled:
+            chain = None
+            path = self.model_dir / f'{key}.npz'
+            if path.exists():
+                from core.linear_models import LinearChain
+                chain = LinearChain.load(path)
+                if chain.version != self.version:
+                    chain = None
+            self._compiled[key] = chain
+        return self._compiled[key]
+
+    def loaded_keys(self):
+        """현재 메모리에 로드된 모델 키"""
+        return list(self._artifacts.keys())
+
+    def view(self, field):
+        """dict처럼 쓸 수 있는 읽기 전용 뷰 (field: 'model' / 'scaler' / 'pca')"""
+        return _ArtifactView(self, field)
+
+
+class _ArtifactView(Mapping):
+    """ModelStore의 한 필드를 {키: 객체} dict처럼 노출 (접근 시 로드)"""
+
+    _FLAGS = {'model': None, 'scaler': 'has_scaler', 'pca': 'has_pca'}
+
+    def __init__(self, store, field):
+        self._store = store
+        self._field = field
+
+    def _keys(self):
+        flag = self._FLAGS[self._field]
+        return [
+            key for key in self._store.keys()
+            if flag is None or self._store._manifest[key].get(flag)
+        ]
+
+    def __getitem__(self, key):
+        value = self._store.get(key)[self._field]
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __contains__(self, key):
+        return key in self._keys()
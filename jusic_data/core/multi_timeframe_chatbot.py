@@ -5,12 +5,11 @@
 - 타임프레임 자동 감지
 """
 
-import numpy as np
-import pandas as pd
-import yfinance as yf
-import pickle
+import os
 import re
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
@@ -18,34 +17,73 @@ from datetime import datetime
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
-from utils.data_utils import load_or_download_macro_data, merge_macro_features
+# numpy/pandas/yfinance/pykrx/sklearn은 실시간 계산 경로에서만 로드
+# (스냅샷으로 답할 수 있는 질문은 무거운 모듈 없이 처리)
+from core.model_store import ModelStore
+from utils.market_data import fetch_concurrently
+from utils.prediction_snapshot import SnapshotReader
+from utils.prediction_cache import PredictionCache
 from utils.stock_name_mapping import STOCK_NAME_MAPPING
+from utils.stock_matcher import build_stock_matcher
+
+# 지원 타임프레임
+TIMEFRAMES = ['1day', '3day', '5day', '10day']
+
+# Direction (13개: 기술 8 + 거시경제 5)
+DIRECTION_FEATURES = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility', 
+                      'MACD', 'BB_Position', 'Momentum_5',
+                      'KOSPI_Change', 'USD_KRW_Change', 'VIX', 'VIX_Change', 'SP500_Change']
+
+# Volatility (8개: 기술 5 + pykrx 3)
+VOLATILITY_FEATURES = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility',
+                       'Institution_Ratio', 'Foreign_Ratio', 'Individual_Ratio']
+
+# Risk (16개: 기술 8 + 상호작용 8)
+RISK_FEATURES = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility', 
+                 'MACD', 'BB_Position', 'Momentum_5',
+                 'RSI_x_Volume', 'Trend_Strength', 'BB_Momentum', 'Volatility_x_RSI',
+                 'MACD_x_Volume', 'Price_Momentum', 'RSI_MACD', 'BB_Volatility']
+
+# 나이(dataAge)를 보고하는 데이터 소스
+DATA_SOURCES = ['bars', 'macro', 'investor']
+
+# 상위 종목 계산에 2단계 스크리닝을 쓰는 최소 계산 종목 수 (0이면 항상 전체 배치 평가)
+# analysis/benchmark_screening.py 기준 30~10000종목에서 스크리닝이 전체 평가보다 일관되게 빠른 규모가 없어 기본은 끔
+SCREENING_MIN_STOCKS = int(os.environ.get('JUSIC_SCREENING_MIN_STOCKS', '0'))
+
 
 class MultiTimeframeChatbot:
-    def __init__(self, silent=False):
-        """12개 모델 로드"""
+    def __init__(self, silent=False, max_workers=None, fetch_timeout=None, snapshot_max_age=None):
+        """
+        12개 모델 로드
+        
+        Args:
+            silent: 초기화 메시지 출력 안 함
+            max_workers: 여러 종목 조회 시 동시 다운로드 수 (기본 JUSIC_FETCH_WORKERS)
+            fetch_timeout: 종목별 다운로드 타임아웃 초 (기본 JUSIC_FETCH_TIMEOUT)
+            snapshot_max_age: 일일 예측 스냅샷 최대 허용 거래일 수 (기본 JUSIC_SNAPSHOT_MAX_AGE, 음수면 항상 실시간 계산)
+        """
         if not silent:
             print("🤖 멀티 타임프레임 챗봇 초기화 중...")
         
-        model_path = ROOT_DIR / 'core' / 'final_multi_timeframe_models.pkl'
-        with open(model_path, 'rb') as f:
-            data = pickle.load(f)
+        # 모델은 처음 사용할 때 (작업, 기간)별로 로드 (core/models/ 분할 파일은 처음 로드할 때 생성)
+        self.model_store = ModelStore()
+        self.models = self.model_store.view('model')
+        self.scalers = self.model_store.view('scaler')
+        self.pcas = self.model_store.view('pca')
+        self.performance = self.model_store.performance
+        self.medians = self.model_store.medians
         
-        self.models = data['models']
-        self.scalers = data['scalers']
-        self.pcas = data.get('pcas', {})
-        self.performance = data['performance']
-        self.medians = data['medians']
-        self.macro_data = load_or_download_macro_data()
+        # 거시경제/pykrx 데이터는 처음 실시간 계산할 때 로드
+        self._macro_data = None
+        self._pykrx_data = None
         
-        # pykrx 데이터 로드
-        try:
-            pykrx_path = ROOT_DIR / 'data' / 'pykrx_data_30stocks_cache.pkl'
-            with open(pykrx_path, 'rb') as f:
-                cache = pickle.load(f)
-            self.pykrx_data = cache['data']
-        except:
-            self.pykrx_data = {}
+        # 데이터 소스별 마지막 갱신 시각 (epoch) / 데이터 기준일
+        self.data_updated = {source: None for source in DATA_SOURCES}
+        self.data_as_of = {source: None for source in DATA_SOURCES}
+        
+        # 백그라운드 데이터 갱신 (상주 모드에서 start_refresher()로 시작)
+        self.refresher = None
         
         # 역매핑 (한글 이름 → 티커)
         self.name_to_ticker = {name: ticker for ticker, name in STOCK_NAME_MAPPING.items()}
@@ -60,10 +98,133 @@ class MultiTimeframeChatbot:
             '현차': '005380.KS',
         }
         
+        # 종목명/별칭/코드 매칭 오토마톤 (메시지 1회 스캔, 긴 이름 우선)
+        self.stock_matcher = build_stock_matcher(STOCK_NAME_MAPPING, self.aliases)
+        
+        # 로컬 일봉 저장소 (처음 사용할 때 로드) + 동시 다운로드 설정
+        self._bar_store = None
+        self._indicators = None
+        self.max_workers = max_workers
+        self.fetch_timeout = fetch_timeout
+        
+        # 일일 예측 스냅샷 (있으면 실시간 계산 대신 사용)
+        self.snapshots = SnapshotReader(max_age=snapshot_max_age)
+        
+        # 프로세스 간 공유 예측 캐시 (티커, 타임프레임, 마지막 일봉 날짜, 번들 버전)
+        self.prediction_cache = PredictionCache(self.model_store.version)
+        
+        # 요청 단위 예측 캐시 (request_scope() 안에서만 사용)
+        self._request_cache = None
+        
+        # 마지막 스크리닝 통계 (후보 수, direction 평가 수)
+        self.last_screening = None
+        
         if not silent:
             print(f"✅ 로드 완료: {len(self.models)}개 모델")
             print(f"✅ 지원 종목: {len(STOCK_NAME_MAPPING)}개")
     
+    @property
+    def macro_data(self):
+        """거시경제 데이터 (처음 접근 시 로드)"""
+        if self._macro_data is None:
+            from utils.data_utils import load_or_download_macro_data, macro_cache_files
+            # 백그라운드 갱신 중이면 오래된 캐시라도 바로 사용
+            macro = load_or_download_macro_data(allow_stale=self.refresher is not None)
+            # 로드하는 동안 백그라운드 갱신이 먼저 끝났으면 새 데이터 유지
+            if self._macro_data is None:
+                self._macro_data = macro
+                self._mark_loaded('macro', macro_cache_files(), macro)
+        return self._macro_data
+    
+    @property
+    def investor_ratios(self):
+        """투자자별 순매수 비율 패널 (pykrx 데이터가 바뀔 때만 다시 계산, utils/data_utils.InvestorRatios)"""
+        from utils.data_utils import investor_ratio_table
+        return investor_ratio_table(self.pykrx_data)
+    
+    @property
+    def macro_features(self):
+        """거시경제 피처 표 (거시경제 데이터가 바뀔 때만 다시 계산, utils/data_utils.MacroFeatures)"""
+        from utils.data_utils import macro_feature_table
+        return macro_feature_table(self.macro_data)
+    
+    @property
+    def pykrx_data(self):
+        """pykrx 데이터 (처음 접근 시 로드)"""
+        if self._pykrx_data is None:
+            try:
+                # 종목별 열 단위 데이터 (메모리 매핑, 없으면 예전 pickle)
+                from utils.data_utils import load_investor_data, investor_data_files, investor_ratio_table
+                data = load_investor_data()
+                # 순매수 비율 패널은 로드할 때 1번 계산
+                investor_ratio_table(data)
+                if self._pykrx_data is None:
+                    self._pykrx_data = data
+                    self._mark_loaded('investor', investor_data_files(), data)
+            except:
+                if self._pykrx_data is None:
+                    self._pykrx_data = {}
+        return self._pykrx_data
+    
+    @property
+    def bar_store(self):
+        """로컬 일봉 저장소 (처음 접근 시 로드)"""
+        if self._bar_store is None:
+            from utils.bar_store import get_bar_store
+            self._bar_store = get_bar_store()
+        return self._bar_store
+    
+    @property
+    def indicators(self):
+        """증분 기술 지표 상태 (처음 접근 시 체크포인트에서 복원)"""
+        if self._indicators is None:
+            from utils.indicator_state import IndicatorEngine
+            self._indicators = IndicatorEngine.load()
+        return self._indicators
+    
+    def _mark_loaded(self, source, path, frames):
+        """캐시 파일(여러 개면 가장 최근 파일)에서 로드한 데이터의 갱신 시각(파일 수정 시각)과 기준일 기록"""
+        from utils.data_utils import last_date
+        paths = path if isinstance(path, (list, tuple)) else [path]
+        try:
+            updated_at = max(Path(p).stat().st_mtime for p in paths)
+            self.mark_data_updated(source, updated_at, last_date(frames))
+        except Exception:
+            pass
+    
+    def mark_data_updated(self, source, updated_at=None, as_of=None):
+        """데이터 소스 갱신 기록 (updated_at: epoch, 기본 현재 시각)"""
+        self.data_updated[source] = time.time() if updated_at is None else updated_at
+        self.data_as_of[source] = as_of
+    
+    def data_age(self):
+        """
+        데이터 소스별 나이
+        
+        Returns:
+            dict: {소스: {'ageSeconds': 마지막 갱신 후 경과 초, 'asOf': 데이터 기준일}} (모르면 None)
+        """
+        now = time.time()
+        return {
+            source: {
+                'ageSeconds': None if self.data_updated[source] is None else int(now - self.data_updated[source]),
+                'asOf': self.data_as_of[source],
+            }
+            for source in DATA_SOURCES
+        }
+    
+    def start_refresher(self):
+        """
+        백그라운드 데이터 갱신 시작 (상주 프로세스용)
+        
+        이후 요청은 다운로드를 기다리지 않고 마지막으로 받은 데이터로 처리한다.
+        """
+        if self.refresher is None:
+            from core.data_refresher import DataRefresher
+            self.refresher = DataRefresher(self)
+            self.refresher.start()
+        return self.refresher
+    
     def detect_timeframe(self, message):
         """타임프레임 자동 감지"""
         message = message.lower()
@@ -82,157 +243,522 @@ class MultiTimeframeChatbot:
         return '5day'
     
     def extract_stock(self, message):
-        """종목명 추출"""
-        # 티커 직접 입력
-        ticker_match = re.search(r'(\d{6}\.KS)', message)
+        """종목명 추출 (가장 앞에 나오는 종목, 겹치면 긴 이름 우선)"""
+        ticker = self.stock_matcher.find_first(message)
+        if ticker:
+            return ticker
+        
+        # 매핑에 없는 티커 직접 입력
+        ticker_match = re.search(r'(\d{6}\.K[SQ])', message)
         if ticker_match:
             return ticker_match.group(1)
         
-        # 한글 종목명 검색
-        for name, ticker in self.name_to_ticker.items():
-            if name in message:
-                return ticker
-        
-        # 별칭 검색
-        for alias, ticker in self.aliases.items():
-            if alias in message:
-                return ticker
-        
         return None
     
     def extract_multiple_stocks(self, message):
-        """여러 종목 추출 (비교용)"""
-        stocks = []
+        """여러 종목 추출 (비교용, 메시지를 한 번 훑어 모든 언급을 찾고 중복 제거)"""
+        # vs, 대, vs. 등으로 구분한 비교 요청만
+        if not (' vs ' in message.lower() or ' 대 ' in message or ' vs. ' in message):
+            return None
         
-        # vs, 대, vs. 등으로 구분
-        if ' vs ' in message.lower() or ' 대 ' in message or ' vs. ' in message:
-            parts = re.split(r' vs\.?| 대 ', message, flags=re.IGNORECASE)
-            for part in parts:
-                ticker = self.extract_stock(part)
-                if ticker:
-                    stocks.append(ticker)
+        mentions = [(start, ticker) for start, _, ticker in self.stock_matcher.find_all(message)]
+        # 매핑에 없는 티커 직접 입력
+        mentions += [(match.start(), match.group(1)) for match in re.finditer(r'(\d{6}\.K[SQ])', message)]
+        stocks = list(dict.fromkeys(ticker for _, ticker in sorted(mentions)))
         
         return stocks if len(stocks) >= 2 else None
     
     def calculate_technical_indicators(self, df):
-        """기술적 지표 계산"""
-        df = df.copy()
-        df['MA_5'] = df['Close'].rolling(5).mean()
-        df['MA_20'] = df['Close'].rolling(20).mean()
-        df['MA_Ratio'] = df['MA_5'] / df['MA_20']
-        
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        df['Price_Change'] = df['Close'].pct_change()
-        df['Volume_Ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
-        df['Volatility'] = df['Close'].pct_change().rolling(10).std()
-        
-        exp1 = df['Close'].ewm(span=12).mean()
-        exp2 = df['Close'].ewm(span=26).mean()
-        df['MACD'] = exp1 - exp2
-        
-        bb_middle = df['Close'].rolling(20).mean()
-        bb_std = df['Close'].rolling(20).std()
-        df['BB_Upper'] = bb_middle + (bb_std * 2)
-        df['BB_Lower'] = bb_middle - (bb_std * 2)
-        df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-        
-        df['Momentum_5'] = df['Close'].pct_change(5)
+        """기술적 지표 계산 (utils/features.py)"""
+        from utils.features import calculate_technical_indicators
+        return calculate_technical_indicators(df)
+    
+    @contextmanager
+    def request_scope(self):
+        """
+        요청 단위 예측 캐시
         
-        return df
+        with 블록 안에서는 predict_stock/rank_all_stocks 결과를 (티커, 타임프레임)별로
+        재사용하므로, chat()과 구조화 데이터 추출이 같은 계산 결과를 공유한다.
+        """
+        if self._request_cache is not None:
+            # 이미 요청 범위 안 (중첩 호출)
+            yield
+            return
+        
+        self._request_cache = {}
+        try:
+            yield
+        finally:
+            self._request_cache = None
     
     def predict_stock(self, ticker, timeframe):
-        """종목 예측"""
+        """종목 예측 (요청 범위 안에서는 캐시 사용)"""
+        if self._request_cache is None:
+            return self._predict_stock(ticker, timeframe)
+        
+        key = ('predict', ticker, timeframe)
+        if key not in self._request_cache:
+            self._request_cache[key] = self._predict_stock(ticker, timeframe)
+        return self._request_cache[key]
+    
+    def _predict_stock(self, ticker, timeframe):
+        """종목 예측 (스냅샷 → 예측 캐시 → 실시간 계산 순서)"""
+        pred = self.snapshots.get(timeframe).get(ticker)
+        if pred is not None:
+            return pred
+        
+        pred = self.prediction_cache.get(ticker, timeframe)
+        if pred is not None:
+            return pred
+        
         try:
-            data = yf.download(ticker, period='1mo', progress=False)
-            if data.empty:
+            df = self.build_features(ticker)
+            if df is None:
                 return None
+            pred = self.evaluate_features(df, ticker, timeframe)
+        
+        except Exception as e:
+            print(f"예측 실패: {e}")
+            return None
+        
+        self.prediction_cache.put_many([pred], {ticker: df.index[-1]})
+        return pred
+    
+    def predict_stock_all_horizons(self, ticker, timeframes=TIMEFRAMES):
+        """
+        전체 타임프레임 예측 (데이터 다운로드/피처 계산은 1번만)
+        
+        Returns:
+            dict: {타임프레임: predict_stock()과 같은 결과} (실패 시 None)
+        """
+        results = {tf: self.prediction_cache.get(ticker, tf) for tf in timeframes}
+        
+        if any(pred is None for pred in results.values()):
+            try:
+                df = self.build_features(ticker)
+                if df is None:
+                    return None
+                
+                results = {tf: self.evaluate_features(df, ticker, tf) for tf in timeframes}
             
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.droplevel(1)
-            
-            df = self.calculate_technical_indicators(data)
-            df = merge_macro_features(df, self.macro_data)
-            
-            # pykrx 병합
-            if ticker in self.pykrx_data:
-                from utils.data_utils import merge_pykrx_features
-                df = merge_pykrx_features(df, self.pykrx_data, ticker)
-            else:
-                # pykrx 없으면 기본값
-                df['Institution_Ratio'] = 0.33
-                df['Foreign_Ratio'] = 0.33
-                df['Individual_Ratio'] = 0.34
-            
-            # 상호작용 features
-            df['RSI_x_Volume'] = df['RSI'] * df['Volume_Ratio']
-            df['Trend_Strength'] = df['MA_Ratio'] * df['Momentum_5']
-            df['BB_Momentum'] = df['BB_Position'] * df['Momentum_5']
-            df['Volatility_x_RSI'] = df['Volatility'] * df['RSI']
-            df['MACD_x_Volume'] = df['MACD'] * df['Volume_Ratio']
-            df['Price_Momentum'] = df['Price_Change'] * df['Momentum_5']
-            df['RSI_MACD'] = df['RSI'] * df['MACD']
-            df['BB_Volatility'] = df['BB_Position'] * df['Volatility']
-            
-            df = df.fillna(method='ffill').fillna(method='bfill').fillna(0)
-            df = df.replace([np.inf, -np.inf], 0)
-            
-            # Direction (13개)
-            dir_features = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility', 
-                           'MACD', 'BB_Position', 'Momentum_5',
-                           'KOSPI_Change', 'USD_KRW_Change', 'VIX', 'VIX_Change', 'SP500_Change']
-            
-            X_dir = df[dir_features].iloc[-1:].values
-            X_dir_scaled = self.scalers[f'direction_{timeframe}'].transform(X_dir)
-            X_dir_pca = self.pcas[f'direction_{timeframe}'].transform(X_dir_scaled)
-            
-            dir_pred = self.models[f'direction_{timeframe}'].predict(X_dir_pca)[0]
-            dir_proba = self.models[f'direction_{timeframe}'].predict_proba(X_dir_pca)[0][1]
-            
-            # Volatility (8개: 기술 5 + pykrx 3)
-            vol_features = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility',
-                           'Institution_Ratio', 'Foreign_Ratio', 'Individual_Ratio']
-            X_vol = df[vol_features].iloc[-1:].values
-            X_vol_scaled = self.scalers[f'volatility_{timeframe}'].transform(X_vol)
-            
-            vol_pred = self.models[f'volatility_{timeframe}'].predict(X_vol_scaled)[0]
-            vol_proba = self.models[f'volatility_{timeframe}'].predict_proba(X_vol_scaled)[0][1]
-            
-            # Risk (16개: 기술 8 + 상호작용 8)
-            risk_features = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility', 
-                            'MACD', 'BB_Position', 'Momentum_5',
-                            'RSI_x_Volume', 'Trend_Strength', 'BB_Momentum', 'Volatility_x_RSI',
-                            'MACD_x_Volume', 'Price_Momentum', 'RSI_MACD', 'BB_Volatility']
-            X_risk = df[risk_features].iloc[-1:].values
-            X_risk_scaled = self.scalers[f'risk_{timeframe}'].transform(X_risk)
-            
-            risk_pred = self.models[f'risk_{timeframe}'].predict(X_risk_scaled)[0]
-            risk_proba = self.models[f'risk_{timeframe}'].predict_proba(X_risk_scaled)[0][1]
-            
-            # 종합 점수 계산
-            score = self.calculate_score(dir_pred, dir_proba, vol_pred, vol_proba, risk_pred, risk_proba)
-            
-            current_price = float(df['Close'].iloc[-1])
+            except Exception as e:
+                print(f"예측 실패: {e}")
+                return None
             
-            return {
-                'ticker': ticker,
-                'name': STOCK_NAME_MAPPING.get(ticker, ticker),
-                'timeframe': timeframe,
-                'direction': {'pred': dir_pred, 'prob': dir_proba},
-                'volatility': {'pred': vol_pred, 'prob': vol_proba},
-                'risk': {'pred': risk_pred, 'prob': risk_proba},
-                'score': score,
-                'price': current_price,
-                'accuracy': self.performance[f'direction_{timeframe}']['test_acc']
-            }
+            self.prediction_cache.put_many(results.values(), {ticker: df.index[-1]})
+        
+        # 요청 범위 안이면 타임프레임별 결과도 캐시에 넣어 재사용
+        if self._request_cache is not None:
+            for tf, pred in results.items():
+                self._request_cache[('predict', ticker, tf)] = pred
         
+        return results
+    
+    def predict_stocks_all_horizons(self, tickers, timeframes=TIMEFRAMES):
+        """
+        여러 종목 × 전체 타임프레임 예측 (동시 다운로드 + 타임프레임별 배치 평가)
+        
+        Returns:
+            dict: {티커: {타임프레임: 예측 결과}} (실패 종목 제외)
+        """
+        tickers = list(tickers)
+        results = {ticker: {} for ticker in tickers}
+        
+        # 예측 캐시에 전체 타임프레임이 있는 종목은 계산 생략
+        for tf in timeframes:
+            for ticker, pred in self.prediction_cache.get_many(tickers, tf).items():
+                results[ticker][tf] = pred
+        missing = [t for t in tickers if len(results[t]) < len(timeframes)]
+        
+        frames = self.build_features_many(missing) if missing else {}
+        for tf in timeframes:
+            try:
+                preds = self.evaluate_features_batch(frames, tf)
+            except Exception as e:
+                print(f"예측 실패: {e}")
+                continue
+            for pred in preds:
+                results[pred['ticker']][tf] = pred
+            self.prediction_cache.put_many(preds, {t: df.index[-1] for t, df in frames.items()})
+        
+        return {ticker: preds for ticker, preds in results.items() if preds}
+    
+    def fetch_bars(self, ticker):
+        """
+        최근 1개월 주가 데이터 (로컬 일봉 저장소, 새 거래일만 다운로드)
+        
+        백그라운드 갱신 중이면 저장된 데이터를 바로 사용 (없는 종목만 다운로드)
+        """
+        return self.bar_store.get_bars(
+            ticker, '1mo', timeout=self.fetch_timeout, refresh=self.refresher is None
+        )
+    
+    def build_features_many(self, tickers, tail=True):
+        """
+        여러 종목 피처 생성 (다운로드는 동시 실행, 종목별 오류 격리)
+        
+        Args:
+            tickers: 티커 목록
+            tail: True면 마지막 행만 계산 (build_features 참고)
+        
+        Returns:
+            dict: {티커: 피처 DataFrame} (실패 종목 제외, tickers 순서 유지)
+        """
+        # 다운로드 스레드에서 동시에 초기화하지 않도록 미리 로드
+        self.bar_store
+        
+        bars = fetch_concurrently(
+            list(tickers), self.fetch_bars,
+            max_workers=self.max_workers, timeout=self.fetch_timeout
+        )
+        bars = {t: data for t, data in bars.items() if data is not None}
+        
+        frames = {}
+        if tail:
+            for ticker, data in bars.items():
+                try:
+                    df = self._tail_features(ticker, data)
+                except Exception as e:
+                    print(f"예측 실패: {e}")
+                    continue
+                if df is not None:
+                    frames[ticker] = df
+        
+        from utils.features import calculate_technical_indicators_many
+        
+        # 나머지 종목 기술 지표는 패널로 1번 계산
+        rest = {t: data for t, data in bars.items() if t not in frames}
+        try:
+            indicators = calculate_technical_indicators_many(rest) if rest else {}
         except Exception as e:
             print(f"예측 실패: {e}")
+            indicators = {}
+        
+        for ticker, df in indicators.items():
+            try:
+                frames[ticker] = self._merge_features(ticker, df)
+            except Exception as e:
+                print(f"예측 실패: {e}")
+        
+        return {t: frames[t] for t in bars if t in frames}
+    
+    def build_features(self, ticker, data=None, tail=True):
+        """
+        예측용 피처 DataFrame 생성 (기술 지표 + 거시경제 + pykrx + 상호작용)
+        
+        예측에는 마지막 행만 쓰이므로 tail=True면 마지막 행만 계산한 1행 DataFrame을 반환한다.
+        마지막 행에 결측이 있으면 (앞쪽 값으로 채워야 하므로) 전체 계산으로 대신한다.
+        """
+        if data is None:
+            data = self.fetch_bars(ticker)
+        if data is None:
             return None
+        
+        if tail:
+            df = self._tail_features(ticker, data)
+            if df is not None:
+                return df
+        
+        return self._merge_features(ticker, self.calculate_technical_indicators(data))
+    
+    def _tail_features(self, ticker, data):
+        """
+        마지막 행 피처 (1행 DataFrame)
+        
+        기술 지표는 증분 지표 상태(백그라운드 갱신이 일봉 저장소와 맞춰 둠)가 이 일봉과 같은 창이면 그 값을 쓰고,
+        없거나 오래됐으면 최소 구간으로 마지막 값만 계산한다. 거시경제/pykrx는 마지막 몇 행에만 붙여
+        (휴장일 결측을 앞쪽 값으로 채운 뒤) 마지막 행을 쓴다. 채우기 전 마지막 행에 NaN이 없으면
+        전체 계산 후 마지막 행과 같고, NaN이 있으면 None (전체 계산 필요).
+        """
+        import numpy as np
+        import pandas as pd
+        from utils.data_utils import INVESTOR_COLUMNS
+        from utils.features import TAIL_ROWS, TECHNICAL_COLUMNS, last_row_indicators, interaction_features_panel
+        
+        tail = data.index[-TAIL_ROWS:]
+        close = data['Close'].to_numpy(dtype=float)
+        volume = data['Volume'].to_numpy(dtype=float)
+        indicators = self.indicators.latest(ticker, data.index[-1].date().isoformat(), close, volume)
+        if indicators is None:
+            indicators = last_row_indicators(close, volume)
+        row = data.iloc[-1].to_dict()
+        row.update((name, indicators[name]) for name in TECHNICAL_COLUMNS)
+        
+        macro = self.macro_features
+        row.update(zip(macro.columns, macro.lookup(tail)[-1]))
+        
+        if ticker in self.investor_ratios:
+            row.update(zip(INVESTOR_COLUMNS, self.investor_ratios.lookup(ticker, tail)[-1]))
+        elif ticker in self.pykrx_data:
+            # 비율을 만들 수 없는 pykrx 데이터 (전체 계산 경로에서 경고)
+            return None
+        else:
+            # pykrx 없으면 기본값
+            row.update({'Institution_Ratio': 0.33, 'Foreign_Ratio': 0.33, 'Individual_Ratio': 0.34})
+        
+        row.update(interaction_features_panel(row))
+        
+        values = np.array(list(row.values()), dtype=float)
+        if np.isnan(values).any():
+            return None
+        values[np.isinf(values)] = 0
+        return pd.DataFrame([values], index=data.index[-1:], columns=list(row))
+    
+    def _join_pykrx(self, ticker, df):
+        """pykrx 피처 병합 (날짜 기준, 휴장일은 앞쪽 값으로 채움)"""
+        from utils.data_utils import merge_pykrx_features
+        
+        if ticker in self.pykrx_data:
+            df = merge_pykrx_features(df, self.pykrx_data, ticker)
+        else:
+            # pykrx 없으면 기본값
+            df['Institution_Ratio'] = 0.33
+            df['Foreign_Ratio'] = 0.33
+            df['Individual_Ratio'] = 0.34
+        
+        return df
+    
+    def _merge_features(self, ticker, df):
+        """기술 지표 DataFrame + 거시경제 + pykrx + 상호작용 → 예측용 피처 (전체 행)"""
+        import numpy as np
+        from utils.data_utils import merge_macro_features
+        from utils.features import add_interactions
+        
+        df = merge_macro_features(df, self.macro_data)
+        df = self._join_pykrx(ticker, df)
+        
+        # 상호작용 features
+        df = add_interactions(df)
+        
+        df = df.fillna(method='ffill').fillna(method='bfill').fillna(0)
+        df = df.replace([np.inf, -np.inf], 0)
+        
+        return df
+    
+    def evaluate_features(self, df, ticker, timeframe):
+        """피처 DataFrame의 마지막 행으로 타임프레임별 3개 모델 평가"""
+        return self.evaluate_features_batch({ticker: df}, timeframe)[0]
+    
+    def evaluate_features_batch(self, frames, timeframe):
+        """
+        여러 종목 배치 평가
+        
+        각 종목 피처의 마지막 행을 하나의 행렬로 쌓아 scaler/PCA/모델을 모델당 1번만 호출한다.
+        
+        Args:
+            frames: {티커: build_features() 결과 DataFrame}
+            timeframe: 타임프레임
+        
+        Returns:
+            list: 종목별 예측 결과 (frames 순서)
+        """
+        tickers = list(frames.keys())
+        if not tickers:
+            return []
+        
+        stack = self._last_row_stacker(frames, tickers)
+        
+        # Direction (13개)
+        dir_preds, dir_probas = self._run_model(f'direction_{timeframe}', stack(DIRECTION_FEATURES))
+        
+        # Volatility (8개: 기술 5 + pykrx 3)
+        vol_preds, vol_probas = self._run_model(f'volatility_{timeframe}', stack(VOLATILITY_FEATURES))
+        
+        # Risk (16개: 기술 8 + 상호작용 8)
+        risk_preds, risk_probas = self._run_model(f'risk_{timeframe}', stack(RISK_FEATURES))
+        
+        # 종합 점수 계산 (배열 연산)
+        scores = self.calculate_score(dir_preds, dir_probas, vol_preds, vol_probas, risk_preds, risk_probas)
+        
+        return self._build_predictions(
+            tickers, [frames[t]['Close'].iloc[-1] for t in tickers], timeframe,
+            dir_preds, dir_probas, vol_preds, vol_probas, risk_preds, risk_probas, scores
+        )
+    
+    def _last_row_stacker(self, frames, tickers):
+        """
+        종목별 피처 마지막 행 → 피처 목록별 행렬 함수
+        
+        종목마다 열 이름으로 인덱싱하면 종목 수가 많을 때 pandas 오버헤드가 대부분이므로,
+        열 구성이 모두 같으면 마지막 행을 한 번만 쌓고 열 위치로 잘라낸다.
+        """
+        import numpy as np
+        
+        columns = frames[tickers[0]].columns
+        if not all(frames[t].columns.equals(columns) for t in tickers):
+            return lambda features: np.vstack([frames[t][features].values[-1] for t in tickers])
+        
+        last_rows = np.vstack([frames[t].values[-1] for t in tickers])
+        return lambda features: last_rows[:, columns.get_indexer(features)].astype(float)
+    
+    def _build_predictions(self, tickers, prices, timeframe,
+                           dir_preds, dir_probas, vol_preds, vol_probas, risk_preds, risk_probas, scores):
+        """모델 출력 배열 → 종목별 예측 결과 리스트 (tickers 순서, prices는 종목별 현재가)"""
+        accuracy = self.performance[f'direction_{timeframe}']['test_acc']
+        
+        results = []
+        for i, ticker in enumerate(tickers):
+            results.append({
+                'ticker': ticker,
+                'name': STOCK_NAME_MAPPING.get(ticker, ticker),
+                'timeframe': timeframe,
+                'direction': {'pred': dir_preds[i], 'prob': dir_probas[i]},
+                'volatility': {'pred': vol_preds[i], 'prob': vol_probas[i]},
+                'risk': {'pred': risk_preds[i], 'prob': risk_probas[i]},
+                'score': scores[i],
+                'price': float(prices[i]),
+                'accuracy': accuracy
+            })
+        
+        return results
+    
+    def screen_features_batch(self, frames, timeframe, top_n, known=(), verify=False):
+        """
+        2단계 스크리닝으로 상위 종목만 정확히 평가
+        
+        1단계: 전체 종목에 volatility/risk 모델 (선형, 가벼움) + direction 신호 상한 → 점수 상한
+        2단계: 상한이 높은 종목부터 direction 모델 평가, 남은 상한이 k번째 점수보다 낮으면 중단
+        
+        Args:
+            frames: {티커: build_features() 결과 DataFrame}
+            timeframe: 타임프레임
+            top_n: 선택 개수
+            known: 이미 점수를 아는 예측 결과 (스냅샷/캐시, 동점이면 frames보다 앞 순위)
+            verify: 전체 평가 후 정렬한 순위와 같은지 확인 (다르면 RuntimeError)
+        
+        Returns:
+            tuple: (상위 top_n 예측 결과, direction까지 평가한 frames 종목 예측 결과,
+                    탈락 종목 부분 예측 (complete_predictions로 완성))
+        """
+        import numpy as np
+        from core.screening import select_top_k, direction_signal_upper, BOUND_EPS
+        
+        known = list(known)
+        tickers = list(frames.keys())
+        offset = len(known)
+        stack = self._last_row_stacker(frames, tickers)
+        
+        # 1단계: 전체 종목 volatility/risk + 점수 상한
+        vol_preds, vol_probas = self._run_model(f'volatility_{timeframe}', stack(VOLATILITY_FEATURES))
+        risk_preds, risk_probas = self._run_model(f'risk_{timeframe}', stack(RISK_FEATURES))
+        
+        dir_key = f'direction_{timeframe}'
+        X_dir = stack(DIRECTION_FEATURES)
+        X_model = self.scalers[dir_key].transform(X_dir)
+        if dir_key in self.pcas:
+            X_model = self.pcas[dir_key].transform(X_model)
+        dir_upper = direction_signal_upper(self.models[dir_key], X_model)
+        
+        ones = np.ones(len(tickers))
+        bounds = self.calculate_score(ones, dir_upper, vol_preds, vol_probas, risk_preds, risk_probas) + BOUND_EPS
+        
+        # 2단계: 후보만 direction 평가
+        direction = {}
+        
+        def evaluate(indices):
+            rows = np.array(indices) - offset
+            dir_preds, dir_probas = self._run_model(dir_key, X_dir[rows])
+            scores = self.calculate_score(
+                dir_preds, dir_probas, vol_preds[rows], vol_probas[rows], risk_preds[rows], risk_probas[rows]
+            )
+            for j, row in enumerate(rows):
+                direction[row] = (dir_preds[j], dir_probas[j], scores[j])
+            return scores
+        
+        top, _ = select_top_k(
+            {offset + i: bounds[i] for i in range(len(tickers))}, top_n, evaluate,
+            known={i: pred['score'] for i, pred in enumerate(known)}
+        )
+        
+        rows = sorted(direction)
+        preds = self._build_predictions(
+            [tickers[i] for i in rows], [frames[tickers[i]]['Close'].iloc[-1] for i in rows], timeframe,
+            [direction[i][0] for i in rows], [direction[i][1] for i in rows],
+            vol_preds[rows], vol_probas[rows], risk_preds[rows], risk_probas[rows],
+            [direction[i][2] for i in rows]
+        )
+        by_row = dict(zip(rows, preds))
+        top_preds = [known[i] if i < offset else by_row[i - offset] for i in top]
+        
+        # 탈락 종목: volatility/risk 결과 + direction 입력 피처 (나중에 direction 모델만 평가하면 완성)
+        partials = [{
+            'ticker': tickers[i],
+            'name': STOCK_NAME_MAPPING.get(tickers[i], tickers[i]),
+            'timeframe': timeframe,
+            'partial': True,
+            'volatility': {'pred': vol_preds[i], 'prob': vol_probas[i]},
+            'risk': {'pred': risk_preds[i], 'prob': risk_probas[i]},
+            'price': float(frames[tickers[i]]['Close'].iloc[-1]),
+            'bar_date': frames[tickers[i]].index[-1].date().isoformat(),
+            'direction_features': X_dir[i].tolist(),
+        } for i in range(len(tickers)) if i not in direction]
+        
+        self.last_screening = {
+            'candidates': len(tickers), 'known': offset, 'direction_evaluated': len(rows),
+        }
+        
+        if verify:
+            full = known + self.evaluate_features_batch(frames, timeframe)
+            full.sort(key=lambda x: x['score'], reverse=True)
+            expected = full[:top_n]
+            if ([p['ticker'] for p in expected] != [p['ticker'] for p in top_preds]
+                    or any(abs(a['score'] - b['score']) > 1e-12 for a, b in zip(expected, top_preds))):
+                raise RuntimeError(
+                    f"screening mismatch: {[p['ticker'] for p in top_preds]} != {[p['ticker'] for p in expected]}"
+                )
+        
+        return top_preds, preds, partials
+    
+    def complete_predictions(self, partials, timeframe):
+        """
+        스크리닝 탈락 종목의 부분 예측 → 예측 결과
+        
+        부분 예측에 저장한 direction 입력 피처로 direction 모델만 평가한다 (일봉/피처 계산 없음).
+        
+        Returns:
+            list: 예측 결과 (partials 순서)
+        """
+        import numpy as np
+        
+        if not partials:
+            return []
+        
+        X_dir = np.array([p['direction_features'] for p in partials], dtype=float)
+        dir_preds, dir_probas = self._run_model(f'direction_{timeframe}', X_dir)
+        vol_preds = np.array([p['volatility']['pred'] for p in partials])
+        vol_probas = np.array([p['volatility']['prob'] for p in partials])
+        risk_preds = np.array([p['risk']['pred'] for p in partials])
+        risk_probas = np.array([p['risk']['prob'] for p in partials])
+        scores = self.calculate_score(dir_preds, dir_probas, vol_preds, vol_probas, risk_preds, risk_probas)
+        
+        return self._build_predictions(
+            [p['ticker'] for p in partials], [p['price'] for p in partials], timeframe,
+            dir_preds, dir_probas, vol_preds, vol_probas, risk_preds, risk_probas, scores
+        )
+    
+    def _run_model(self, key, X):
+        """
+        scaler → (PCA) → 모델 평가
+        
+        컴파일된 선형 체인이 있으면 sklearn 없이 행렬 곱 1번으로 평가한다.
+        
+        Returns:
+            tuple: (예측 클래스 배열, 클래스 1 확률 배열)
+        """
+        chain = self.model_store.compiled(key)
+        if chain is not None:
+            return chain.predict(X), chain.predict_proba(X)[:, 1]
+        
+        X = self.scalers[key].transform(X)
+        if key in self.pcas:
+            X = self.pcas[key].transform(X)
+        
+        # 예측 클래스는 확률에서 (predict를 따로 부르면 스태킹 기반 모델을 한 번 더 평가함)
+        import numpy as np
+        model = self.models[key]
+        proba = model.predict_proba(X)
+        return model.classes_[np.argmax(proba, axis=1)], proba[:, 1]
     
     def calculate_score(self, dir_pred, dir_prob, vol_pred, vol_prob, risk_pred, risk_prob):
         """종합 점수 계산"""
@@ -264,16 +790,130 @@ class MultiTimeframeChatbot:
             return {'grade': '강력 매도', 'emoji': '🔻', 'action': 'STRONG_SELL'}
     
     def rank_all_stocks(self, timeframe):
-        """전체 종목 순위"""
-        results = []
-        for ticker in STOCK_NAME_MAPPING.keys():
-            pred = self.predict_stock(ticker, timeframe)
-            if pred:
-                results.append(pred)
+        """전체 종목 순위 (요청 범위 안에서는 캐시 사용)"""
+        if self._request_cache is None:
+            return self._rank_all_stocks(timeframe)
+        
+        key = ('rank', timeframe)
+        if key not in self._request_cache:
+            self._request_cache[key] = self._rank_all_stocks(timeframe)
+        # 호출부에서 리스트를 수정해도 캐시가 바뀌지 않도록 복사본 반환
+        return list(self._request_cache[key])
+    
+    def _known_predictions(self, timeframe):
+        """
+        스냅샷 → 예측 캐시 → 스크리닝 부분 예측에서 찾은 전체 종목 예측
+        
+        Returns:
+            tuple: (찾은 예측 결과 리스트, 계산이 필요한 티커 리스트)
+        """
+        from datetime import date
+        
+        snapshot = self.snapshots.get(timeframe)
+        results = [snapshot[t] for t in STOCK_NAME_MAPPING if t in snapshot]
+        missing = [t for t in STOCK_NAME_MAPPING if t not in snapshot]
+        
+        # 스냅샷에 없는 종목은 예측 캐시 확인
+        if missing:
+            cached = self.prediction_cache.get_many(missing, timeframe)
+            results += [cached[t] for t in missing if t in cached]
+            missing = [t for t in missing if t not in cached]
+        
+        # 스크리닝에서 탈락한 종목은 direction 모델만 평가해 완성 (다운로드 없음)
+        partials = self.prediction_cache.get_many(missing, timeframe, partial=True) if missing else {}
+        if partials:
+            try:
+                completed = self.complete_predictions([partials[t] for t in missing if t in partials], timeframe)
+            except Exception as e:
+                print(f"예측 실패: {e}")
+            else:
+                self.prediction_cache.put_many(
+                    completed, {t: date.fromisoformat(p['bar_date']) for t, p in partials.items()}
+                )
+                results += completed
+                missing = [t for t in missing if t not in partials]
+        
+        return results, missing
+    
+    def _rank_all_stocks(self, timeframe, known=None):
+        """
+        전체 종목 순위
+        
+        최신 스냅샷 → 예측 캐시에 있는 종목은 그대로 사용하고, 나머지 종목만
+        동시 다운로드 → 피처 생성 → 배치 평가로 계산한다.
+        
+        Args:
+            known: 이미 조회한 _known_predictions(timeframe) 결과
+        """
+        results, missing = known or self._known_predictions(timeframe)
+        
+        if missing:
+            frames = self.build_features_many(missing)
+            try:
+                preds = self.evaluate_features_batch(frames, timeframe)
+            except Exception as e:
+                print(f"예측 실패: {e}")
+                if not results:
+                    return []
+            else:
+                self.prediction_cache.put_many(preds, {t: df.index[-1] for t, df in frames.items()})
+                results += preds
+        
+        # 요청 범위 안이면 종목별 결과도 캐시에 넣어 재사용
+        if self._request_cache is not None:
+            for pred in results:
+                self._request_cache[('predict', pred['ticker'], timeframe)] = pred
         
         results.sort(key=lambda x: x['score'], reverse=True)
         return results
     
+    def top_stocks(self, timeframe, top_n=5, verify=False):
+        """상위 종목 (요청 범위 안에서는 캐시 사용)"""
+        if self._request_cache is None:
+            return self._top_stocks(timeframe, top_n, verify)
+        
+        # 같은 요청에서 전체 순위를 이미 계산했으면 그대로 사용
+        if ('rank', timeframe) in self._request_cache:
+            return self._request_cache[('rank', timeframe)][:top_n]
+        
+        key = ('top', timeframe, top_n)
+        if key not in self._request_cache:
+            self._request_cache[key] = self._top_stocks(timeframe, top_n, verify)
+        return list(self._request_cache[key])
+    
+    def _top_stocks(self, timeframe, top_n, verify=False):
+        """
+        상위 종목 (rank_all_stocks(timeframe)[:top_n]과 같은 결과)
+        
+        스냅샷/캐시에 없는 종목이 SCREENING_MIN_STOCKS 이상이면 (또는 verify) 2단계 스크리닝으로
+        상위 후보만 direction 모델까지 평가하고, 탈락 종목은 부분 예측으로 캐시에 넣는다.
+        그보다 적으면 전체 순위와 같은 배치 평가를 쓴다 (요청 범위 안이면 전체 순위도 캐시).
+        """
+        results, missing = self._known_predictions(timeframe)
+        
+        if missing and (verify or 0 < SCREENING_MIN_STOCKS <= len(missing)):
+            frames = self.build_features_many(missing)
+            try:
+                top, preds, partials = self.screen_features_batch(frames, timeframe, top_n, known=results, verify=verify)
+            except Exception as e:
+                if verify:
+                    raise
+                print(f"예측 실패: {e}")
+            else:
+                self.prediction_cache.put_many(preds + partials, {t: frames[t].index[-1] for t in frames})
+                if self._request_cache is not None:
+                    for pred in preds:
+                        self._request_cache[('predict', pred['ticker'], timeframe)] = pred
+                return top
+            
+            results.sort(key=lambda x: x['score'], reverse=True)
+            return results[:top_n]
+        
+        ranked = self._rank_all_stocks(timeframe, known=(results, missing))
+        if self._request_cache is not None:
+            self._request_cache[('rank', timeframe)] = ranked
+        return ranked[:top_n]
+    
     def response_single_stock(self, ticker, timeframe):
         """단일 종목 분석 응답"""
         pred = self.predict_stock(ticker, timeframe)
@@ -305,9 +945,9 @@ class MultiTimeframeChatbot:
         
         response = f"🏆 **{tf_korean[timeframe]} 투자 추천 TOP {top_n}**\n\n"
         
-        results = self.rank_all_stocks(timeframe)
+        results = self.top_stocks(timeframe, top_n)
         
-        for i, pred in enumerate(results[:top_n], 1):
+        for i, pred in enumerate(results, 1):
             rec = self.get_recommendation(pred['score'])
             response += f"{i}. **{pred['name']}** {rec['emoji']}\n"
             response += f"   점수: {pred['score']:+.3f} | 현재가: {pred['price']:,.0f}원\n"
@@ -0,0 +1,144 @@
+"""
+추천 순위 2단계 스크리닝 (branch-and-bound top-k)
+
+종합 점수 = 0.35 × direction + 0.40 × volatility + 0.25 × risk 이고 direction 신호는 [-1, 1]이므로,
+가벼운 volatility/risk 선형 모델만 먼저 돌리면 종목별 점수 상한(direction 신호 = +1)을 구할 수 있다.
+상한이 높은 종목부터 무거운 direction 모델(스태킹)을 평가하고, 다음 후보의 상한이 현재 k번째
+점수보다 낮아지면 멈춘다. 남은 종목은 어떤 direction 결과가 나와도 top-k에 들 수 없으므로
+결과는 전체 평가 후 정렬한 순위와 정확히 같다 (동점은 원래 순서 우선, 안정 정렬과 동일).
+
+direction 모델이 스태킹(로지스틱 회귀 + 랜덤 포레스트 → 로지스틱 회귀)이면 상한을 더 좁힌다:
+로지스틱 회귀 기반 모델은 1단계에서 정확히 계산하고, 트리 모델은 리프 확률의 최소/최대로
+구간을 잡은 뒤 최종 로지스틱 회귀를 구간 연산으로 통과시킨다.
+
+챗봇 상위 종목 계산은 계산할 종목이 JUSIC_SCREENING_MIN_STOCKS 이상일 때만 이 방식을 쓴다 (기본 끔,
+analysis/benchmark_screening.py에서 전체 배치 평가보다 일관되게 빠른 규모가 측정되지 않음).
+"""
+
+import heapq
+
+import numpy as np
+
+# direction 모델 첫 배치 크기
+# (이후 배치는 상한이 현재 k번째 점수 이상인 남은 후보 전체 → 모델 호출은 보통 2번)
+BATCH_SIZE = 64
+
+# 부동소수점 오차 여유 (상한이 실제 점수보다 작아지지 않도록)
+BOUND_EPS = 1e-9
+
+
+def _tree_proba_range(tree):
+    """결정 트리 리프의 클래스 1 확률 최소/최대"""
+    value = tree.tree_.value[:, 0, :]
+    leaves = tree.tree_.children_left == -1
+    proba = value[leaves, 1] / value[leaves].sum(axis=1)
+    return proba.min(), proba.max()
+
+
+def proba_range(model, X):
+    """
+    이진 분류 모델의 클래스 1 확률 구간
+
+    Args:
+        model: 학습된 sklearn 분류 모델
+        X: 모델 입력 (scaler/PCA 적용 후)
+
+    Returns:
+        tuple: (하한 배열, 상한 배열)
+    """
+    n = len(X)
+    name = type(model).__name__
+
+    # 선형 모델: 1단계에서 정확히 계산 (가벼움)
+    if name == 'LogisticRegression':
+        proba = model.predict_proba(X)[:, 1]
+        return proba, proba
+
+    # 트리 / 트리 앙상블 (평균 확률): 트리별 리프 최소/최대의 평균
+    if name == 'DecisionTreeClassifier':
+        low, high = _tree_proba_range(model)
+        return np.full(n, low), np.full(n, high)
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        ranges = np.array([_tree_proba_range(tree) for tree in model.estimators_])
+        low, high = ranges.mean(axis=0)
+        return np.full(n, low), np.full(n, high)
+
+    # 스태킹 (클래스 1 확률 → 최종 로지스틱 회귀): 기반 모델 구간을 최종 모델에 구간 연산으로 전달
+    if (name == 'StackingClassifier' and not model.passthrough
+            and all(method == 'predict_proba' for method in model.stack_method_)
+            and type(model.final_estimator_).__name__ == 'LogisticRegression'
+            and len(model.classes_) == 2):
+        coef = model.final_estimator_.coef_[0]
+        logit_low = np.full(n, model.final_estimator_.intercept_[0])
+        logit_high = logit_low.copy()
+        for weight, estimator in zip(coef, model.estimators_):
+            low, high = proba_range(estimator, X)
+            logit_low += np.minimum(weight * low, weight * high)
+            logit_high += np.maximum(weight * low, weight * high)
+        return 1 / (1 + np.exp(-logit_low)), 1 / (1 + np.exp(-logit_high))
+
+    # 알 수 없는 모델: 확률 전체 구간
+    return np.zeros(n), np.ones(n)
+
+
+def direction_signal_upper(model, X):
+    """
+    direction 신호 (pred*2-1)*prob 의 상한
+
+    pred=1이면 신호는 prob (≥ 0.5), pred=0이면 -prob (> -0.5) 이므로
+    확률 상한이 0.5 이상이면 상한 그대로, 아니면 -(확률 하한).
+    """
+    low, high = proba_range(model, X)
+    return np.where(high >= 0.5, high, -low) + BOUND_EPS
+
+
+def select_top_k(bounds, k, evaluate, known=None, batch_size=BATCH_SIZE):
+    """
+    상한 기반 top-k 선택
+
+    Args:
+        bounds: {후보 인덱스: 점수 상한} (정확한 점수 이상이어야 함)
+        k: 선택 개수
+        evaluate: 인덱스 리스트 → 정확한 점수 리스트
+        known: {후보 인덱스: 정확한 점수} (캐시 등으로 이미 아는 점수)
+        batch_size: 첫 evaluate 호출의 후보 수
+
+    Returns:
+        tuple: (top-k 인덱스 리스트 (점수 내림차순, 동점은 인덱스 오름차순),
+                {평가한 인덱스: 점수})
+    """
+    # 최소 힙 (점수, -인덱스): 힙의 첫 원소가 현재 k번째 후보
+    heap = []
+
+    def push(idx, score):
+        item = (score, -idx)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    for idx, score in (known or {}).items():
+        push(idx, score)
+
+    order = sorted(bounds, key=lambda idx: (-bounds[idx], idx))
+    evaluated = {}
+    pos = 0
+    while pos < len(order) and k > 0:
+        if len(heap) < k:
+            batch = order[pos:pos + max(batch_size, k - len(heap))]
+        else:
+            # 상한이 k번째 점수보다 낮은 후보는 모두 탈락 (동점은 인덱스로 이길 수 있어 포함)
+            end = pos
+            while end < len(order) and bounds[order[end]] >= heap[0][0]:
+                end += 1
+            if end == pos:
+                break
+            batch = order[pos:end]
+
+        pos += len(batch)
+        for idx, score in zip(batch, evaluate(batch)):
+            evaluated[idx] = score
+            push(idx, score)
+
+    top = [-neg_idx for _, neg_idx in sorted(heap, key=lambda item: (-item[0], -item[1]))]
+    return top, evaluated
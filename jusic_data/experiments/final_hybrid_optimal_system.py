@@ -9,7 +9,6 @@
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.preprocessing import RobustScaler
 from sklearn.decomposition import PCA
@@ -19,16 +18,30 @@ from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
 from sklearn.utils.class_weight import compute_class_weight
 import time
 import pickle
+import sys
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# 로컬 일봉 저장소 (새 거래일만 다운로드)
+from utils.bar_store import get_bars
+
 # 거시경제 및 pykrx 데이터 유틸리티 import
-from data_utils import (
+from utils.data_utils import (
     load_or_download_macro_data, 
     load_or_download_pykrx_data,
     merge_macro_features,
     merge_pykrx_features
 )
+from utils.features import (
+    calculate_technical_indicators,
+    add_interactions
+)
+from utils.feature_store import get_feature_store
 
 print("=" * 80)
 print("Final Hybrid Optimal System")
@@ -111,10 +124,8 @@ class FinalHybridOptimalSystem:
         direction_stocks = []
         for ticker in tickers:
             try:
-                data = yf.download(ticker, period='6y', progress=False)
-                if not data.empty and len(data) > 500:
-                    if isinstance(data.columns, pd.MultiIndex):
-                        data.columns = data.columns.droplevel(1)
+                data = get_bars(ticker, '6y')
+                if data is not None and len(data) > 500:
                     self.direction_data[ticker] = data
                     direction_stocks.append(ticker)
                     print(f"      {ticker}: {len(data)}개 데이터")
@@ -126,10 +137,8 @@ class FinalHybridOptimalSystem:
         volatility_stocks = []
         for ticker in tickers:
             try:
-                data = yf.download(ticker, period='2y', progress=False)
-                if not data.empty and len(data) > 200:
-                    if isinstance(data.columns, pd.MultiIndex):
-                        data.columns = data.columns.droplevel(1)
+                data = get_bars(ticker, '2y')
+                if data is not None and len(data) > 200:
                     self.volatility_data[ticker] = data
                     volatility_stocks.append(ticker)
                     print(f"      {ticker}: {len(data)}개 데이터")
@@ -141,10 +150,8 @@ class FinalHybridOptimalSystem:
         risk_stocks = []
         for ticker in tickers:
             try:
-                data = yf.download(ticker, period='2y', progress=False)
-                if not data.empty and len(data) > 200:
-                    if isinstance(data.columns, pd.MultiIndex):
-                        data.columns = data.columns.droplevel(1)
+                data = get_bars(ticker, '2y')
+                if data is not None and len(data) > 200:
                     self.risk_data[ticker] = data
                     risk_stocks.append(ticker)
                     print(f"      {ticker}: {len(data)}개 데이터")
@@ -164,10 +171,8 @@ class FinalHybridOptimalSystem:
         print("2. 현재 주가 수집...")
         for ticker in all_tickers:
             try:
-                data = yf.download(ticker, period='1d', progress=False)
-                if not data.empty:
-                    if isinstance(data.columns, pd.MultiIndex):
-                        data.columns = data.columns.droplevel(1)
+                data = get_bars(ticker, '1d')
+                if data is not None:
                     self.current_prices[ticker] = float(data['Close'].iloc[-1])
                     print(f"    {ticker}: {self.current_prices[ticker]:,}원")
             except Exception as e:
@@ -190,45 +195,7 @@ class FinalHybridOptimalSystem:
     
     def calculate_technical_indicators(self, df):
         """기술적 지표 계산"""
-        df = df.copy()
-        
-        # 1. 이동평균
-        df['MA_5'] = df['Close'].rolling(5).mean()
-        df['MA_20'] = df['Close'].rolling(20).mean()
-        df['MA_Ratio'] = df['MA_5'] / df['MA_20']
-        
-        # 2. RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # 3. 가격 변화율
-        df['Price_Change'] = df['Close'].pct_change()
-        
-        # 4. 거래량 비율
-        df['Volume_Ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
-        
-        # 5. 변동성
-        df['Volatility'] = df['Close'].pct_change().rolling(10).std()
-        
-        # 6. MACD
-        exp1 = df['Close'].ewm(span=12).mean()
-        exp2 = df['Close'].ewm(span=26).mean()
-        df['MACD'] = exp1 - exp2
-        
-        # 7. 볼린저밴드 위치
-        bb_middle = df['Close'].rolling(20).mean()
-        bb_std = df['Close'].rolling(20).std()
-        df['BB_Upper'] = bb_middle + (bb_std * 2)
-        df['BB_Lower'] = bb_middle - (bb_std * 2)
-        df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-        
-        # 8. 모멘텀
-        df['Momentum_5'] = df['Close'].pct_change(5)
-        
-        return df
+        return calculate_technical_indicators(df)
     
     def create_targets(self, df):
         """타겟 변수 생성 (검증된 설정 - 5일 예측)"""
@@ -257,13 +224,14 @@ class FinalHybridOptimalSystem:
         
         all_data = []
         
+        # 기술적 지표 (피처 저장소: 새 봉만 추가, 저장된 값은 다시 계산하지 않음)
+        indicators = get_feature_store().features_many({
+            t: self.direction_data[t].sort_index() for t in affordable_stocks if t in self.direction_data
+        })
+        
         for ticker in affordable_stocks:
-            if ticker in self.direction_data:
-                df = self.direction_data[ticker].copy()
-                df = df.sort_index()
-                
-                # 기술적 지표 계산
-                df = self.calculate_technical_indicators(df)
+            if ticker in indicators:
+                df = indicators[ticker]
                 
                 # 거시경제 피처 추가
                 if self.macro_data:
@@ -308,13 +276,14 @@ class FinalHybridOptimalSystem:
         
         all_data = []
         
+        # 기술적 지표 (피처 저장소: 새 봉만 추가, 저장된 값은 다시 계산하지 않음)
+        indicators = get_feature_store().features_many({
+            t: self.volatility_data[t].sort_index() for t in affordable_stocks if t in self.volatility_data
+        })
+        
         for ticker in affordable_stocks:
-            if ticker in self.volatility_data:
-                df = self.volatility_data[ticker].copy()
-                df = df.sort_index()
-                
-                # 기술적 지표 계산
-                df = self.calculate_technical_indicators(df)
+            if ticker in indicators:
+                df = indicators[ticker]
                 
                 # pykrx 피처 추가
                 if self.pykrx_data:
@@ -358,13 +327,14 @@ class FinalHybridOptimalSystem:
         
         all_data = []
         
+        # 기술적 지표 (피처 저장소: 새 봉만 추가, 저장된 값은 다시 계산하지 않음)
+        indicators = get_feature_store().features_many({
+            t: self.risk_data[t].sort_index() for t in affordable_stocks if t in self.risk_data
+        })
+        
         for ticker in affordable_stocks:
-            if ticker in self.risk_data:
-                df = self.risk_data[ticker].copy()
-                df = df.sort_index()
-                
-                # 기술적 지표 계산
-                df = self.calculate_technical_indicators(df)
+            if ticker in indicators:
+                df = indicators[ticker]
                 
                 # 타겟 변수 생성
                 df = self.create_targets(df)
@@ -373,14 +343,7 @@ class FinalHybridOptimalSystem:
                 risk_features = ['MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility', 'MACD', 'BB_Position', 'Momentum_5']
                 
                 # 고급 특성 추가
-                df['RSI_x_Volume'] = df['RSI'] * df['Volume_Ratio']
-                df['Trend_Strength'] = df['MA_Ratio'] * df['Momentum_5']
-                df['BB_Momentum'] = df['BB_Position'] * df['Momentum_5']
-                df['Volatility_x_RSI'] = df['Volatility'] * df['RSI']
-                df['MACD_x_Volume'] = df['MACD'] * df['Volume_Ratio']
-                df['Price_Momentum'] = df['Price_Change'] * df['Momentum_5']
-                df['RSI_MACD'] = df['RSI'] * df['MACD']
-                df['BB_Volatility'] = df['BB_Position'] * df['Volatility']
+                df = add_interactions(df)
                 
                 risk_features.extend(['RSI_x_Volume', 'Trend_Strength', 'BB_Momentum', 'Volatility_x_RSI', 'MACD_x_Volume', 'Price_Momentum', 'RSI_MACD', 'BB_Volatility'])
                 
@@ -872,14 +835,7 @@ class FinalHybridOptimalSystem:
                 df['News_Volume'] = sent['news_count']
             
             # Risk용 고급 특성 계산
-            df['RSI_x_Volume'] = df['RSI'] * df['Volume_Ratio']
-            df['Trend_Strength'] = df['MA_Ratio'] * df['Momentum_5']
-            df['BB_Momentum'] = df['BB_Position'] * df['Momentum_5']
-            df['Volatility_x_RSI'] = df['Volatility'] * df['RSI']
-            df['MACD_x_Volume'] = df['MACD'] * df['Volume_Ratio']
-            df['Price_Momentum'] = df['Price_Change'] * df['Momentum_5']
-            df['RSI_MACD'] = df['RSI'] * df['MACD']
-            df['BB_Volatility'] = df['BB_Position'] * df['Volatility']
+            df = add_interactions(df)
             
             # NaN 값 처리
             df = df.fillna(method='ffill').fillna(method='bfill').fillna(0)
@@ -1021,11 +977,8 @@ def example_usage():
         print("\n 예제: 삼성전자(005930.KS) 분석...")
         try:
             # 최근 30일 데이터 수집
-            data = yf.download('005930.KS', period='1mo', progress=False)
-            if not data.empty:
-                if isinstance(data.columns, pd.MultiIndex):
-                    data.columns = data.columns.droplevel(1)
-                
+            data = get_bars('005930.KS', '1mo')
+            if data is not None:
                 # 주식 분석 예측
                 result = system.predict_stock_analysis('005930.KS', data)
                 
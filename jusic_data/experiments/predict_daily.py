@@ -6,13 +6,21 @@
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 import pickle
 import json
+import sys
+from pathlib import Path
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from utils.bar_store import get_bars
+from utils.features import calculate_technical_indicators, add_interactions
+
 class DailyPredictor:
     def __init__(self):
         self.models = {}
@@ -53,46 +61,16 @@ class DailyPredictor:
     
     def calculate_technical_indicators(self, df):
         """기술적 지표 계산"""
-        df = df.copy()
-        df['MA_5'] = df['Close'].rolling(5).mean()
-        df['MA_20'] = df['Close'].rolling(20).mean()
-        df['MA_Ratio'] = df['MA_5'] / df['MA_20']
-        
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        df['Price_Change'] = df['Close'].pct_change()
-        df['Volume_Ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
-        df['Volatility'] = df['Close'].pct_change().rolling(10).std()
-        
-        exp1 = df['Close'].ewm(span=12).mean()
-        exp2 = df['Close'].ewm(span=26).mean()
-        df['MACD'] = exp1 - exp2
-        
-        bb_middle = df['Close'].rolling(20).mean()
-        bb_std = df['Close'].rolling(20).std()
-        df['BB_Upper'] = bb_middle + (bb_std * 2)
-        df['BB_Lower'] = bb_middle - (bb_std * 2)
-        df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-        
-        df['Momentum_5'] = df['Close'].pct_change(5)
-        
-        return df
+        return calculate_technical_indicators(df)
     
     def predict_stock(self, ticker):
         """종목 예측"""
         try:
-            # 최근 30일 데이터 수집
-            data = yf.download(ticker, period='1mo', progress=False)
-            if data.empty:
+            # 최근 30일 데이터 (로컬 일봉 저장소, 새 거래일만 다운로드)
+            data = get_bars(ticker, '1mo')
+            if data is None:
                 return None
             
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.droplevel(1)
-            
             df = self.calculate_technical_indicators(data)
             df = df.fillna(method='ffill').fillna(method='bfill').fillna(0)
             df = df.replace([np.inf, -np.inf], 0)
@@ -117,14 +95,7 @@ class DailyPredictor:
                             'MACD_x_Volume', 'Price_Momentum', 'RSI_MACD', 'BB_Volatility']
             
             # 고급 특성 계산
-            df['RSI_x_Volume'] = df['RSI'] * df['Volume_Ratio']
-            df['Trend_Strength'] = df['MA_Ratio'] * df['Momentum_5']
-            df['BB_Momentum'] = df['BB_Position'] * df['Momentum_5']
-            df['Volatility_x_RSI'] = df['Volatility'] * df['RSI']
-            df['MACD_x_Volume'] = df['MACD'] * df['Volume_Ratio']
-            df['Price_Momentum'] = df['Price_Change'] * df['Momentum_5']
-            df['RSI_MACD'] = df['RSI'] * df['MACD']
-            df['BB_Volatility'] = df['BB_Position'] * df['Volatility']
+            df = add_interactions(df)
             
             X_risk = df[risk_features].iloc[-1:].values
             X_risk_scaled = self.scalers['risk'].transform(X_risk)
@@ -0,0 +1,55 @@
+"""
+선형 모델 컴파일
+Volatility/Risk 체인 (RobustScaler → LogisticRegression)을 core/models/<키>.npz로 저장
+
+챗봇은 .npz가 있으면 sklearn 대신 행렬 곱 1번으로 평가한다.
+저장 전에 sklearn 객체와 결과를 비교해서 다르면 저장하지 않는다.
+모델 번들을 분할할 때 (챗봇 첫 로드) 같은 방식으로 함께 생성되므로, 이 스크립트는 다시 만들 때만 쓴다.
+비교만 하려면: python -m core.linear_models
+
+사용법:
+    python scripts/compile_linear_models.py
+"""
+
+import sys
+from pathlib import Path
+
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.model_store import ModelStore, MODEL_DIR
+from core.linear_models import compile_verified, is_linear_chain
+
+print("="*80)
+print("⚙️ 선형 모델 컴파일")
+print("="*80)
+
+store = ModelStore()
+MODEL_DIR.mkdir(parents=True, exist_ok=True)
+
+compiled = 0
+failed = []
+for key in store.keys():
+    artifact = store.get(key)
+    model, scaler, pca = artifact['model'], artifact['scaler'], artifact['pca']
+
+    if not is_linear_chain(model):
+        print(f"   {key:20s} 건너뜀 ({type(model).__name__})")
+        continue
+
+    # 학습 데이터 분포 근처의 임의 입력으로 sklearn과 비교
+    chain, check = compile_verified(scaler, pca, model)
+    if chain is None:
+        failed.append(key)
+        print(f"   {key:20s} ❌ 불일치 (확률 차 {check['max_prob_diff']:.2e}, 예측 불일치 {check['pred_mismatch']}개)")
+        continue
+
+    chain.save(MODEL_DIR / f'{key}.npz', version=store.version)
+    compiled += 1
+    print(f"   {key:20s} ✅ (확률 차 {check['max_prob_diff']:.2e})")
+
+print(f"\n✅ {compiled}개 모델 컴파일: {MODEL_DIR} (버전 {store.version})")
+if failed:
+    print(f"❌ 실패: {', '.join(failed)}")
+    sys.exit(1)
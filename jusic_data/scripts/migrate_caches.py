@@ -0,0 +1,80 @@
+"""
+pickle 캐시 → 열 단위 캐시 변환 (utils/frame_store.py)
+
+    cached_data/macro_data.pkl           → cached_data/macro/<지표>/
+    cached_data/pykrx_data.pkl           → cached_data/pykrx/<티커>/
+    data/pykrx_data_30stocks_cache.pkl   → data/pykrx_30stocks/<티커>/
+
+변환 후 다시 읽어 원본과 같은지 확인한다. 이미 열 단위 캐시가 있는 지표/종목은 건너뛴다 (--force면 덮어씀).
+원본 pickle은 지우지 않는다 (열 단위 캐시가 없을 때만 읽는 예비 캐시로 남음).
+
+뉴스/감성 캐시(naver_api_news_cache.pkl 등)는 기사 텍스트가 든 중첩 dict라 열 단위로 바꾸지 않는다.
+
+사용법:
+    python scripts/migrate_caches.py
+    python scripts/migrate_caches.py --force
+"""
+
+import sys
+from pathlib import Path
+
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from utils.data_utils import (
+    _load_pickle, LEGACY_MACRO_CACHE, MACRO_CACHE_DIR, LEGACY_PYKRX_CACHE, PYKRX_CACHE_DIR,
+    LEGACY_INVESTOR_DATA, INVESTOR_DATA_DIR,
+)
+from utils.frame_store import save_frame, load_frame, is_frame_dir
+
+
+def migrate(source, target_dir, frames, force):
+    """{키: DataFrame} → 키별 열 단위 폴더 (반환: (변환 수, 건너뜀 수, 불일치 키))"""
+    converted, skipped, mismatched = 0, 0, []
+    for key, df in frames.items():
+        target = target_dir / str(key)
+        if df is None or df.empty or (is_frame_dir(target) and not force):
+            skipped += 1
+            continue
+
+        save_frame(target, df)
+        if not load_frame(target, mmap=False).equals(df):
+            mismatched.append(key)
+        converted += 1
+
+    print(f"   {source.name:36s} → {target_dir.relative_to(ROOT_DIR)}/  변환 {converted}, 건너뜀 {skipped}"
+          + (f", 불일치 {mismatched}" if mismatched else ""))
+    return converted, skipped, mismatched
+
+
+def main():
+    force = '--force' in sys.argv[1:]
+
+    print("="*80)
+    print("🗂️  pickle 캐시 → 열 단위 캐시 변환")
+    print("="*80)
+
+    jobs = [
+        (LEGACY_MACRO_CACHE, MACRO_CACHE_DIR, lambda cache: cache),
+        (LEGACY_PYKRX_CACHE, PYKRX_CACHE_DIR, lambda cache: cache),
+        (LEGACY_INVESTOR_DATA, INVESTOR_DATA_DIR, lambda cache: cache.get('data', {})),
+    ]
+
+    failed = []
+    for source, target_dir, frames_of in jobs:
+        cache = _load_pickle(source) if source.exists() else None
+        if not isinstance(cache, dict):
+            print(f"   {source.name:36s} 없음 (건너뜀)")
+            continue
+        _, _, mismatched = migrate(source, target_dir, frames_of(cache), force)
+        failed += mismatched
+
+    if failed:
+        print(f"\n❌ 다시 읽은 값이 원본과 다름: {failed}")
+        sys.exit(1)
+    print("\n✅ 변환 완료 (원본 pickle은 예비 캐시로 유지)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,24 @@
 """
 멀티 타임프레임 일일 예측
 12개 모델로 today_predictions_<timeframe>.json 생성
+
+사용법:
+    python scripts/predict_daily_multitf.py 5day   # 단일 타임프레임
+    python scripts/predict_daily_multitf.py all    # 전체 타임프레임 (종목당 피처 계산 1번)
 """
 
 import json
 import sys
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # 루트 디렉토리를 sys.path에 추가
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
-from core.multi_timeframe_chatbot import MultiTimeframeChatbot
+from core.multi_timeframe_chatbot import MultiTimeframeChatbot, TIMEFRAMES
 from utils.stock_name_mapping import STOCK_NAME_MAPPING
+from utils.cache_io import atomic_write_text
 
 # 커맨드 라인 인자로 타임프레임 받기
 if len(sys.argv) > 1:
@@ -21,6 +26,11 @@ if len(sys.argv) > 1:
 else:
     TIMEFRAME = '5day'
 
+if TIMEFRAME == 'all':
+    timeframes = list(TIMEFRAMES)
+else:
+    timeframes = [TIMEFRAME]
+
 print("="*80)
 print(f"🚀 멀티 타임프레임 일일 예측 시스템 - {TIMEFRAME}")
 print("="*80)
@@ -33,17 +43,20 @@ chatbot = MultiTimeframeChatbot(silent=False)
 tickers = list(STOCK_NAME_MAPPING.keys())
 
 print(f"\n[2/3] {len(tickers)}개 종목 예측 중...")
-predictions = {}
+predictions = {tf: {} for tf in timeframes}
+
+# 다운로드는 동시 실행, 피처 계산은 종목당 1번, 모델 평가는 타임프레임별 배치로
+all_preds = chatbot.predict_stocks_all_horizons(tickers, timeframes)
 
 for i, ticker in enumerate(tickers, 1):
     name = STOCK_NAME_MAPPING[ticker]
     print(f"   {i}/{len(tickers)}: {name} ({ticker})...", end=' ')
-    
-    try:
-        pred = chatbot.predict_stock(ticker, TIMEFRAME)
-        
-        if pred:
-            predictions[ticker] = {
+
+    preds = all_preds.get(ticker)
+
+    if preds:
+        for tf, pred in preds.items():
+            predictions[tf][ticker] = {
                 'ticker': str(ticker),
                 'stockName': str(name),
                 'currentPrice': float(pred['price']),
@@ -61,88 +74,79 @@ for i, ticker in enumerate(tickers, 1):
                 },
                 'score': float(pred['score']),
                 'recommendation': str(chatbot.get_recommendation(pred['score'])['grade']),
-                'timeframe': str(TIMEFRAME),
+                'timeframe': str(tf),
                 'accuracy': float(pred['accuracy'])
             }
-            print("✅")
-        else:
-            print("❌ 실패")
-    except Exception as e:
-        print(f"❌ {e}")
+        print("✅")
+    else:
+        print("❌ 실패")
 
 print(f"\n[3/3] 결과 저장 중...")
 
 # 날짜 설정
-from datetime import timedelta
 prediction_date = datetime.now().strftime('%Y-%m-%d')  # 예측 생성 날짜
 
-# 타겟 날짜 계산 (예측 대상 날짜)
-if TIMEFRAME == '1day':
-    target_days = 1
-elif TIMEFRAME == '3day':
-    target_days = 3
-elif TIMEFRAME == '5day':
-    target_days = 5
-elif TIMEFRAME == '10day':
-    target_days = 10
-else:
-    target_days = 1
-
-target_date = (datetime.now() + timedelta(days=target_days)).strftime('%Y-%m-%d')
-
-# 결과 저장
-result = {
-    'prediction_date': prediction_date,  # 예측 생성 날짜
-    'target_date': target_date,          # 예측 대상 날짜
-    'date': prediction_date,             # 하위 호환성
-    'timestamp': datetime.now().isoformat(),
-    'timeframe': TIMEFRAME,
-    'totalStocks': len(predictions),
-    'modelType': 'multi_timeframe_12_models',
-    'predictions': predictions
-}
-
 # 예측 결과 저장 폴더
 predictions_dir = ROOT_DIR / 'predictions'
 predictions_dir.mkdir(exist_ok=True)
 
-# 날짜별 파일명 (검증용)
-filename_dated = f'predictions_{TIMEFRAME}_{prediction_date}.json'
-# 하위 호환성 파일명 (챗봇용)
-filename_legacy = f'today_predictions_{TIMEFRAME}.json'
-
-# 날짜별 파일 저장
-with open(predictions_dir / filename_dated, 'w', encoding='utf-8') as f:
-    json.dump(result, f, ensure_ascii=False, indent=2)
-
-# 하위 호환성 파일 저장
-with open(predictions_dir / filename_legacy, 'w', encoding='utf-8') as f:
-    json.dump(result, f, ensure_ascii=False, indent=2)
-
-print(f"✅ 저장 완료:")
-print(f"   - 날짜별: {predictions_dir / filename_dated}")
-print(f"   - 호환용: {predictions_dir / filename_legacy}")
+# 타겟 날짜 계산용 (예측 대상 날짜)
+TARGET_DAYS = {'1day': 1, '3day': 3, '5day': 5, '10day': 10}
+
+for tf in timeframes:
+    target_days = TARGET_DAYS.get(tf, 1)
+    target_date = (datetime.now() + timedelta(days=target_days)).strftime('%Y-%m-%d')
+
+    # 결과 저장
+    result = {
+        'prediction_date': prediction_date,  # 예측 생성 날짜
+        'target_date': target_date,          # 예측 대상 날짜
+        'date': prediction_date,             # 하위 호환성
+        'timestamp': datetime.now().isoformat(),
+        'timeframe': tf,
+        'totalStocks': len(predictions[tf]),
+        'modelType': 'multi_timeframe_12_models',
+        'predictions': predictions[tf]
+    }
+
+    # 날짜별 파일명 (검증용)
+    filename_dated = f'predictions_{tf}_{prediction_date}.json'
+    # 하위 호환성 파일명 (챗봇용)
+    filename_legacy = f'today_predictions_{tf}.json'
+
+    # 날짜별 파일 저장 (챗봇이 읽는 중에도 이전/새 파일 전체만 보이도록 교체)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    atomic_write_text(predictions_dir / filename_dated, text)
+
+    # 하위 호환성 파일 저장
+    atomic_write_text(predictions_dir / filename_legacy, text)
+
+    print(f"✅ 저장 완료 ({tf}):")
+    print(f"   - 날짜별: {predictions_dir / filename_dated}")
+    print(f"   - 호환용: {predictions_dir / filename_legacy}")
 
 # 통계
-safe_count = sum(1 for p in predictions.values() if p['risk']['prediction'] == 0)
-upward_count = sum(1 for p in predictions.values() if p['direction']['prediction'] == 1)
-low_vol_count = sum(1 for p in predictions.values() if p['volatility']['prediction'] == 0)
-
-print("\n" + "="*80)
-print("📊 예측 통계")
-print("="*80)
-print(f"총 종목: {len(predictions)}개")
-print(f"안전 종목: {safe_count}개 ({safe_count/len(predictions)*100:.1f}%)")
-print(f"상승 예상: {upward_count}개 ({upward_count/len(predictions)*100:.1f}%)")
-print(f"저변동성: {low_vol_count}개 ({low_vol_count/len(predictions)*100:.1f}%)")
-
-# Top 5
-sorted_stocks = sorted(predictions.values(), key=lambda x: x['score'], reverse=True)
-print(f"\n🏆 TOP 5 추천 종목:")
-for i, stock in enumerate(sorted_stocks[:5], 1):
-    print(f"  {i}. {stock['stockName']}: {stock['recommendation']} (점수: {stock['score']:+.3f})")
+for tf in timeframes:
+    tf_predictions = predictions[tf]
+    total = max(len(tf_predictions), 1)
+    safe_count = sum(1 for p in tf_predictions.values() if p['risk']['prediction'] == 0)
+    upward_count = sum(1 for p in tf_predictions.values() if p['direction']['prediction'] == 1)
+    low_vol_count = sum(1 for p in tf_predictions.values() if p['volatility']['prediction'] == 0)
+
+    print("\n" + "="*80)
+    print(f"📊 예측 통계 - {tf}")
+    print("="*80)
+    print(f"총 종목: {len(tf_predictions)}개")
+    print(f"안전 종목: {safe_count}개 ({safe_count/total*100:.1f}%)")
+    print(f"상승 예상: {upward_count}개 ({upward_count/total*100:.1f}%)")
+    print(f"저변동성: {low_vol_count}개 ({low_vol_count/total*100:.1f}%)")
+
+    # Top 5
+    sorted_stocks = sorted(tf_predictions.values(), key=lambda x: x['score'], reverse=True)
+    print(f"\n🏆 TOP 5 추천 종목:")
+    for i, stock in enumerate(sorted_stocks[:5], 1):
+        print(f"  {i}. {stock['stockName']}: {stock['recommendation']} (점수: {stock['score']:+.3f})")
 
 print("\n" + "="*80)
 print("✅ 완료!")
 print("="*80)
-
@@ -7,37 +7,10 @@ echo.
 
 cd /d "%~dp0\.."
 
-echo [1/4] 1일 예측 생성 중...
-py -3 scripts\predict_daily_multitf.py 1day
+echo [1/1] 1/3/5/10일 예측 생성 중...
+py -3 scripts\predict_daily_multitf.py all
 if %errorlevel% neq 0 (
-    echo ❌ 1일 예측 실패
-    pause
-    exit /b 1
-)
-echo.
-
-echo [2/4] 3일 예측 생성 중...
-py -3 scripts\predict_daily_multitf.py 3day
-if %errorlevel% neq 0 (
-    echo ❌ 3일 예측 실패
-    pause
-    exit /b 1
-)
-echo.
-
-echo [3/4] 5일 예측 생성 중...
-py -3 scripts\predict_daily_multitf.py 5day
-if %errorlevel% neq 0 (
-    echo ❌ 5일 예측 실패
-    pause
-    exit /b 1
-)
-echo.
-
-echo [4/4] 10일 예측 생성 중...
-py -3 scripts\predict_daily_multitf.py 10day
-if %errorlevel% neq 0 (
-    echo ❌ 10일 예측 실패
+    echo ❌ 예측 실패
     pause
     exit /b 1
 )
@@ -22,26 +22,26 @@ def main():
     success_count = 0
     fail_count = 0
     
-    for i, timeframe in enumerate(TIMEFRAMES, 1):
-        print(f"[{i}/{len(TIMEFRAMES)}] {timeframe} 예측 생성 중...")
-        print("-" * 80)
-        
-        try:
-            result = subprocess.run(
-                [sys.executable, str(SCRIPT_PATH), timeframe],
-                cwd=ROOT_DIR,  # 루트 디렉토리에서 실행
-                capture_output=False,
-                text=True,
-                check=True
-            )
-            success_count += 1
-            print(f"✅ {timeframe} 예측 완료!\n")
-        except subprocess.CalledProcessError as e:
-            fail_count += 1
-            print(f"❌ {timeframe} 예측 실패: {e}\n")
-        except Exception as e:
-            fail_count += 1
-            print(f"❌ {timeframe} 예측 오류: {e}\n")
+    # 전체 타임프레임을 한 프로세스에서 생성 (종목당 다운로드/피처 계산 1번)
+    print(f"[1/1] {', '.join(TIMEFRAMES)} 예측 생성 중...")
+    print("-" * 80)
+    
+    try:
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT_PATH), 'all'],
+            cwd=ROOT_DIR,  # 루트 디렉토리에서 실행
+            capture_output=False,
+            text=True,
+            check=True
+        )
+        success_count = len(TIMEFRAMES)
+        print(f"✅ 전체 타임프레임 예측 완료!\n")
+    except subprocess.CalledProcessError as e:
+        fail_count = len(TIMEFRAMES)
+        print(f"❌ 예측 실패: {e}\n")
+    except Exception as e:
+        fail_count = len(TIMEFRAMES)
+        print(f"❌ 예측 오류: {e}\n")
     
     print("="*80)
     print("📊 실행 결과")
@@ -0,0 +1,35 @@
+"""
+모델 번들 분할
+core/final_multi_timeframe_models.pkl → core/models/<작업>_<기간>.pkl + manifest.json
+
+챗봇은 분할 파일이 있으면 필요한 모델만 로드한다.
+분할 파일이 없거나 번들 내용이 바뀌면 챗봇이 처음 로드할 때 자동으로 다시 만들므로,
+이 스크립트는 미리 만들어 두거나 분할 결과(파일 크기)를 확인할 때 쓴다.
+
+사용법:
+    python scripts/split_model_bundle.py
+"""
+
+import sys
+from pathlib import Path
+
+# 루트 디렉토리를 sys.path에 추가
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.model_store import split_bundle, BUNDLE_PATH, MODEL_DIR
+
+print("="*80)
+print("📦 모델 번들 분할")
+print("="*80)
+
+manifest = split_bundle(BUNDLE_PATH, MODEL_DIR)
+
+total = 0
+for key, info in manifest['artifacts'].items():
+    total += info['bytes']
+    print(f"   {key:20s} {info['bytes']/1024:8.1f} KB")
+
+print(f"\n✅ {len(manifest['artifacts'])}개 모델 저장: {MODEL_DIR}")
+print(f"   버전: {manifest['version']}")
+print(f"   번들 {BUNDLE_PATH.stat().st_size/1024:.1f} KB → 분할 합계 {total/1024:.1f} KB")
@@ -6,7 +6,6 @@
 
 import requests
 import urllib.parse
-import pickle
 import os
 from datetime import datetime
 import time
@@ -16,6 +15,7 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 from utils.stock_name_mapping import STOCK_NAME_MAPPING
+from utils.cache_io import atomic_pickle
 
 class NaverNewsAPI:
     def __init__(self, client_id=None, client_secret=None):
@@ -199,8 +199,7 @@ class NaverNewsAPI:
             'source': 'Naver News API (Official)'
         }
         
-        with open(self.cache_file, 'wb') as f:
-            pickle.dump(cache, f)
+        atomic_pickle(self.cache_file, cache)
         
         print(f"\nCache saved: {self.cache_file}")
 
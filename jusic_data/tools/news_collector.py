@@ -18,6 +18,7 @@ ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 from utils.sentiment_keywords import calculate_sentiment_score, classify_sentiment
 from utils.stock_name_mapping import STOCK_NAME_MAPPING
+from utils.cache_io import atomic_pickle
 
 class NewsCollector:
     def __init__(self):
@@ -194,8 +195,7 @@ class NewsCollector:
             'stocks': list(sentiment_data.keys())
         }
         
-        with open(self.cache_file, 'wb') as f:
-            pickle.dump(cache, f)
+        atomic_pickle(self.cache_file, cache)
         
         print(f"\nCache saved: {self.cache_file}")
     
@@ -0,0 +1,249 @@
+"""
+로컬 일봉(OHLCV) 저장소
+
+- 종목별 일봉을 cached_data/bars/<티커>.pkl 에 보관
+- 마지막 동기화 이후 새로 생긴 거래일만 추가 다운로드 (증분 업데이트)
+- '1mo', '2y', '6y' 같은 기간 조회는 로컬 데이터에서 잘라서 반환
+- yfinance 일봉은 분할/배당 수정 가격이므로, 증분으로 다시 받은 마지막 확정 봉의 종가가 저장 값과
+  다르면 (기업 행동으로 과거 가격이 다시 조정됨) 보관 구간 전체를 다시 받아 교체한다
+
+챗봇, 일일 예측 스크립트, 학습/평가 코드가 같은 저장소를 사용하므로
+대부분의 요청은 다운로드 없이 로컬 읽기로 끝난다. 여러 프로세스가 같은 종목을 동시에 갱신하지 않도록
+다운로드는 종목별 잠금 안에서 하고, 파일은 임시 파일에 쓴 뒤 교체한다.
+"""
+
+import pickle
+from datetime import timedelta
+from pathlib import Path
+import pandas as pd
+
+from utils.cache_io import FileLock, atomic_pickle
+from utils.market_data import download_bars, DEFAULT_TIMEOUT
+from utils.market_calendar import now_kst, last_completed_session, is_session_open
+
+ROOT_DIR = Path(__file__).parent.parent
+BAR_DIR = ROOT_DIR / 'cached_data' / 'bars'
+
+# 장중에는 이 간격마다 당일 임시 봉을 다시 받음
+INTRADAY_TTL = timedelta(minutes=10)
+
+# 겹치는 확정 봉의 종가 비율이 이만큼 넘게 다르면 과거 가격이 다시 조정된 것으로 봄
+ADJUST_TOLERANCE = 1e-3
+
+# yfinance period 문자열 → 조회 구간
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '6y': pd.DateOffset(years=6),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_start(period, now=None):
+    """기간 문자열의 시작일 ('5d' 같은 거래일 수 기간은 None)"""
+    if period not in PERIOD_OFFSETS:
+        return None
+    now = now or now_kst()
+    return (pd.Timestamp(now.date()) - PERIOD_OFFSETS[period]).date()
+
+
+def _combine(old, new):
+    """기존 봉 + 새 봉 (겹치는 날짜는 새 봉 우선)"""
+    if old is None or old.empty:
+        return new.sort_index()
+    bars = pd.concat([old[old.index < new.index.min()], new])
+    bars = bars[~bars.index.duplicated(keep='last')]
+    return bars.sort_index()
+
+
+def _readjusted(old, new, session):
+    """다시 받은 session 봉의 종가가 저장된 값과 다른지 (분할/배당으로 수정 가격 기준이 바뀜)"""
+    day = pd.Timestamp(session)
+    if day not in old.index or day not in new.index:
+        return False
+    before = float(old.loc[day, 'Close'])
+    after = float(new.loc[day, 'Close'])
+    return before > 0 and abs(after / before - 1) > ADJUST_TOLERANCE
+
+
+class BarStore:
+    def __init__(self, bar_dir=BAR_DIR, fetch=download_bars):
+        """
+        Args:
+            bar_dir: 저장 폴더
+            fetch: 다운로드 함수 (download_bars와 같은 시그니처)
+        """
+        self.bar_dir = Path(bar_dir)
+        self.fetch = fetch
+
+        # 프로세스 내 캐시 {티커: (파일 mtime, entry)}
+        self._memory = {}
+
+    def _path(self, ticker):
+        return self.bar_dir / f'{ticker}.pkl'
+
+    def _load(self, ticker):
+        """저장된 entry 로드 (파일이 바뀌지 않았으면 메모리 캐시 사용)"""
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+
+        mtime = path.stat().st_mtime
+        cached = self._memory.get(ticker)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            print(f"  WARNING: bar store load failed ({ticker}): {e}")
+            return None
+
+        self._memory[ticker] = (mtime, entry)
+        return entry
+
+    def _save(self, ticker, entry):
+        path = self._path(ticker)
+        # 다른 프로세스가 읽는 중에도 이전/새 파일 전체만 보이도록 교체
+        atomic_pickle(path, entry)
+        self._memory[ticker] = (path.stat().st_mtime, entry)
+
+    def _needs_download(self, entry, period, now):
+        """다운로드 필요 여부 (보관 구간 부족 / 새로 마감된 거래일 / 장중 임시 봉 TTL 경과)"""
+        start_needed = period_start(period, now)
+        if entry is None or (start_needed is not None and entry['covered_from'] > start_needed):
+            return True
+        stale = entry['synced_session'] < last_completed_session(now)
+        intraday = is_session_open(now) and now - entry['synced_at'] > INTRADAY_TTL
+        return stale or intraday
+
+    def sync(self, ticker, period='1mo', timeout=None):
+        """
+        요청 기간을 덮도록 로컬 저장소 갱신
+
+        - 보관 구간이 요청 기간보다 짧으면 기간 전체를 다운로드
+        - 마지막 동기화 이후 마감된 거래일이 있으면 그 이후만 다운로드
+        - 장중에는 INTRADAY_TTL마다 당일 임시 봉만 다시 받음
+        - 다운로드는 종목별 프로세스 간 잠금 안에서 한다. 다른 프로세스가 받는 중이면 끝날 때까지
+          기다렸다가 그 결과를 쓰고, 타임아웃 안에 끝나지 않으면 기존 데이터를 반환한다.
+
+        Returns:
+            dict: {'bars', 'covered_from', 'synced_session', 'synced_at'} (데이터 없으면 None)
+        """
+        entry = self._load(ticker)
+        if not self._needs_download(entry, period, now_kst()):
+            return entry
+
+        lock = FileLock(self.bar_dir / f'.{ticker}.lock')
+        if not lock.acquire(timeout=timeout or DEFAULT_TIMEOUT):
+            return entry
+        try:
+            # 기다리는 동안 다른 프로세스가 받았으면 다시 받지 않음
+            entry = self._load(ticker)
+            now = now_kst()
+            if self._needs_download(entry, period, now):
+                entry = self._download(ticker, entry, period, now, timeout)
+        finally:
+            lock.release()
+        return entry
+
+    def _download(self, ticker, entry, period, now, timeout):
+        """필요한 구간 다운로드 후 저장 (실패하면 기존 entry)"""
+        session = last_completed_session(now)
+        start_needed = period_start(period, now)
+        needs_history = entry is None or (
+            start_needed is not None and entry['covered_from'] > start_needed
+        )
+
+        if needs_history:
+            data = self.fetch(ticker, period=period, timeout=timeout)
+            if data is None:
+                # 다운로드 실패 시 기존 데이터라도 사용
+                return entry
+
+            old_bars = entry['bars'] if entry else None
+            covered_from = start_needed or data.index.min().date()
+            if entry:
+                covered_from = min(covered_from, entry['covered_from'])
+
+            entry = {
+                'bars': _combine(old_bars, data),
+                'covered_from': covered_from,
+                'synced_session': session,
+                'synced_at': now,
+            }
+            self._save(ticker, entry)
+            return entry
+
+        # 마지막 확정 거래일부터 다시 받아 덮어씀 (이전 임시 봉도 교체)
+        start = entry['synced_session'].strftime('%Y-%m-%d')
+        data = self.fetch(ticker, start=start, timeout=timeout)
+        bars = entry['bars']
+        if data is not None and _readjusted(bars, data, entry['synced_session']):
+            # 저장된 과거 봉과 새 봉의 가격 기준이 달라짐 → 이어 붙이지 않고 보관 구간 전체를 다시 받음
+            print(f"  bar store: {ticker} prices re-adjusted, reloading from {entry['covered_from']}")
+            data = self.fetch(ticker, start=entry['covered_from'].strftime('%Y-%m-%d'), timeout=timeout)
+            bars = None
+        if data is not None:
+            entry = {
+                'bars': _combine(bars, data),
+                'covered_from': entry['covered_from'],
+                'synced_session': session,
+                'synced_at': now,
+            }
+            self._save(ticker, entry)
+
+        return entry
+
+    def get_bars(self, ticker, period='1mo', timeout=None, refresh=True):
+        """
+        기간별 일봉 조회 (필요한 만큼만 다운로드 후 로컬에서 반환)
+
+        Args:
+            ticker: 종목 티커
+            period: '1mo', '2y', '6y' 등 yfinance 기간 문자열 또는 '1d', '5d' (최근 N 거래일)
+            timeout: 다운로드 타임아웃 초
+            refresh: False면 저장된 데이터가 기간을 덮는 한 오래됐어도 다운로드 없이 반환
+                     (백그라운드 갱신을 따로 돌리는 상주 프로세스용)
+
+        Returns:
+            DataFrame: OHLCV (데이터 없으면 None)
+        """
+        start = period_start(period)
+        entry = None if refresh else self._load(ticker)
+        if entry is None or (start is not None and entry['covered_from'] > start):
+            entry = self.sync(ticker, period, timeout)
+        if entry is None:
+            return None
+
+        bars = entry['bars']
+        if start is not None:
+            bars = bars[bars.index >= pd.Timestamp(start)]
+        elif period.endswith('d') and period[:-1].isdigit():
+            bars = bars.iloc[-int(period[:-1]):]
+
+        if bars.empty:
+            return None
+
+        return bars.copy()
+
+
+_default_store = None
+
+
+def get_bar_store():
+    """공용 BarStore (프로세스당 1개)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = BarStore()
+    return _default_store
+
+
+def get_bars(ticker, period='1mo', timeout=None):
+    """공용 저장소에서 일봉 조회"""
+    return get_bar_store().get_bars(ticker, period, timeout)
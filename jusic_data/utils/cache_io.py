@@ -0,0 +1,243 @@
+"""
+캐시 파일 쓰기 유틸리티 (원자적 교체, 프로세스 간 잠금)
+
+- 원자적 쓰기: 같은 폴더의 임시 파일에 끝까지 쓴 뒤 os.replace로 교체한다.
+  읽는 쪽은 항상 이전 파일 전체 또는 새 파일 전체를 보며, 쓰다 끊겨도 기존 파일은 그대로 남는다.
+- 프로세스 간 잠금: O_CREAT | O_EXCL로 잠금 파일을 만든 프로세스만 데이터셋을 갱신한다.
+  다른 프로세스는 잠금이 풀릴 때까지 기다렸다가 (갱신된 캐시를 다시 확인) 또는 이전 캐시를 쓴다.
+  잠금 파일이 JUSIC_LOCK_STALE초 넘게 갱신되지 않으면 (프로세스가 죽은 경우) 다음 프로세스가 가져간다.
+  오래 걸리는 작업은 중간중간 touch()로 잠금을 갱신한다.
+
+표준 라이브러리만 사용한다 (Windows/Linux 공통).
+    JUSIC_LOCK_WAIT  : 다른 프로세스의 갱신을 기다리는 최대 초 (기본 60)
+    JUSIC_LOCK_STALE : 잠금 파일을 버려진 것으로 보는 초 (기본 600)
+"""
+
+import os
+import pickle
+import socket
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+LOCK_DIR = ROOT_DIR / 'cached_data' / 'locks'
+
+LOCK_WAIT = float(os.environ.get('JUSIC_LOCK_WAIT', '60'))
+LOCK_STALE = float(os.environ.get('JUSIC_LOCK_STALE', '600'))
+
+# 잠금 대기 중 확인 간격 (초)
+LOCK_POLL = 0.1
+
+
+@contextmanager
+def atomic_write(path, mode='wb', encoding=None):
+    """
+    임시 파일에 쓰고 끝나면 path로 교체 (예외가 나면 임시 파일만 지움)
+
+    사용법:
+        with atomic_write(path) as f:
+            pickle.dump(obj, f)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{time.monotonic_ns()}.tmp')
+    try:
+        with open(tmp, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """텍스트 파일 원자적 쓰기"""
+    with atomic_write(path, 'w', encoding=encoding) as f:
+        f.write(text)
+
+
+def atomic_pickle(path, obj):
+    """pickle 파일 원자적 쓰기"""
+    with atomic_write(path) as f:
+        pickle.dump(obj, f)
+
+
+class FileLock:
+    """프로세스 간 잠금 (잠금 파일, 같은 프로세스의 다른 스레드끼리도 배타적)"""
+
+    def __init__(self, path, stale=None):
+        """
+        Args:
+            path: 잠금 파일 경로
+            stale: 이 초 넘게 갱신되지 않은 잠금은 버려진 것으로 봄 (기본 JUSIC_LOCK_STALE)
+        """
+        self.path = Path(path)
+        self.stale = LOCK_STALE if stale is None else stale
+        self.locked = False
+
+    def _try_acquire(self):
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._break_stale()
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(f'{socket.gethostname()} {os.getpid()} {time.time():.0f}\n')
+        self.locked = True
+        return True
+
+    def _break_stale(self):
+        """
+        갱신이 멈춘 잠금 파일 제거 (다음 시도에서 가져감)
+
+        stat 후 바로 지우면 그 사이 다른 프로세스가 새로 잡은 잠금을 지울 수 있으므로,
+        먼저 고유한 이름으로 rename해 (원자적, 1개 프로세스만 성공) 잠금 경로에서 떼어 낸 뒤
+        떼어 낸 파일의 수정 시각을 다시 확인해 지운다. 그 사이 새로 잡힌 잠금이었으면 되돌려 놓는다.
+        """
+        try:
+            if time.time() - self.path.stat().st_mtime <= self.stale:
+                return
+            moved = self.path.with_name(f'{self.path.name}.stale.{os.getpid()}.{time.monotonic_ns()}')
+            os.rename(self.path, moved)
+        except OSError:
+            return
+
+        try:
+            if time.time() - moved.stat().st_mtime > self.stale:
+                print(f"  WARNING: removing stale lock {self.path.name}")
+                os.remove(moved)
+                return
+            # 새 잠금 → 원래 경로로 (이미 다른 프로세스가 잡았으면 그쪽이 유지)
+            os.link(moved, self.path)
+        except OSError:
+            pass
+        try:
+            os.remove(moved)
+        except OSError:
+            pass
+
+    def acquire(self, timeout=None):
+        """
+        잠금 획득
+
+        Args:
+            timeout: 최대 대기 초 (0이면 기다리지 않음, None이면 JUSIC_LOCK_WAIT)
+
+        Returns:
+            bool: 획득했으면 True
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        timeout = LOCK_WAIT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while not self._try_acquire():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL)
+        return True
+
+    def touch(self):
+        """잠금 갱신 (오래 걸리는 작업 중 버려진 잠금으로 보이지 않도록)"""
+        if self.locked:
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+
+    def release(self):
+        if self.locked:
+            self.locked = False
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.acquire(timeout=float('inf'))
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def cache_lock(name):
+    """데이터셋 이름별 잠금 (cached_data/locks/<이름>.lock)"""
+    return FileLock(LOCK_DIR / f'{name}.lock')
+
+
+def _test_worker(root, n):
+    """테스트용: 잠금 안에서 카운터 파일 n번 증가 (Windows spawn에서도 import되도록 모듈 수준)"""
+    for _ in range(n):
+        with FileLock(Path(root) / 'counter.lock'):
+            path = Path(root) / 'counter.txt'
+            value = int(path.read_text()) if path.exists() else 0
+            atomic_write_text(path, str(value + 1))
+
+
+def _test_breaker(root):
+    """테스트용: 버려진 잠금을 동시에 가져가려 함 (가져가면 표시 파일을 남기고 풀지 않음)"""
+    lock = FileLock(Path(root) / 'contended.lock', stale=5)
+    if lock.acquire(timeout=1):
+        (Path(root) / f'won.{os.getpid()}').touch()
+        time.sleep(1)
+
+
+if __name__ == '__main__':
+    # 테스트: 여러 프로세스가 같은 잠금으로 카운터 파일을 올려도 값이 맞는지 + 원자적 쓰기
+    import sys
+    import tempfile
+    from multiprocessing import Process
+
+    root = tempfile.mkdtemp()
+    processes = [Process(target=_test_worker, args=(root, 50)) for _ in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    # 쓰다가 예외 → 기존 파일 유지, 임시 파일 없음
+    path = Path(root) / 'data.pkl'
+    atomic_pickle(path, {'v': 1})
+    try:
+        with atomic_write(path) as f:
+            f.write(b'partial')
+            raise RuntimeError('interrupted')
+    except RuntimeError:
+        pass
+
+    # 버려진 잠금은 가져감, 잡힌 잠금은 기다리지 않으면 실패
+    held = FileLock(Path(root) / 'held.lock')
+    held.acquire()
+    stale = FileLock(Path(root) / 'stale.lock', stale=0.05)
+    stale.path.write_text('dead 0 0\n')
+    time.sleep(0.1)
+
+    # 여러 프로세스가 같은 버려진 잠금을 동시에 깨도 1개만 가져감
+    contended = Path(root) / 'contended.lock'
+    contended.write_text('dead 0 0\n')
+    os.utime(contended, (0, 0))
+    processes = [Process(target=_test_breaker, args=(root,)) for _ in range(8)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    winners = [p for p in Path(root).iterdir() if p.name.startswith('won.')]
+
+    count = int((Path(root) / 'counter.txt').read_text())
+    ok = (
+        count == 200
+        and pickle.loads(path.read_bytes()) == {'v': 1}
+        and not [p for p in Path(root).iterdir() if p.name.endswith('.tmp')]
+        and FileLock(held.path).acquire(timeout=0) is False
+        and stale.acquire(timeout=1)
+        and len(winners) == 1
+        and not [p for p in Path(root).iterdir() if '.stale.' in p.name]
+    )
+    print(f"counter {count}/200, stale lock winners {len(winners)}/1")
+    print('[OK] atomic writes and inter-process lock' if ok else '[FAIL]')
+    sys.exit(0 if ok else 1)
@@ -3,173 +3,648 @@
 
 거시경제 데이터 (yfinance):
 - KOSPI, USD/KRW, VIX, S&P 500
+- 지표별로 동시에 다운로드 (지표별 재시도/타임아웃), 지표별 캐시
 
 외국인/기관 데이터 (pykrx):
 - 외국인/기관/개인 순매수
+- 종목별 캐시, 마지막 저장일 이후만 증분 다운로드 (토큰 버킷 속도 제한, 동시 요청, 끊기면 이어 받기)
+
+pykrx 요청 속도는 환경 변수로 조정할 수 있다.
+    JUSIC_PYKRX_RATE    : 초당 요청 수 (기본 2)
+    JUSIC_PYKRX_BURST   : 연속 요청 수 (기본 2)
+    JUSIC_PYKRX_WORKERS : 동시 요청 수 (기본 4)
 """
 
+import json
 import os
 import pickle
 import time
 from datetime import datetime, timedelta
-import pandas as pd
-import yfinance as yf
-from pykrx import stock
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.cache_io import cache_lock, atomic_write_text
+from utils.market_data import TokenBucket
+
+# pandas/yfinance/pykrx는 import 비용이 커서 다운로드할 때만 로드
+# (캐시 로드와 merge_* 함수는 DataFrame 메서드만 사용)
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# 거시경제 지표 {키: yfinance 심볼} (추가하면 동시에 받아 지표별로 캐시)
+MACRO_SERIES = {
+    'kospi': '^KS11',
+    'usd_krw': 'KRW=X',
+    'vix': '^VIX',
+    'sp500': '^GSPC',
+}
+
+# 지표별 열 단위 캐시 (cached_data/macro/<키>/, utils/frame_store.py), 예전 통합 캐시는 지표별 캐시가 없을 때 읽기만 함
+MACRO_CACHE_DIR = ROOT_DIR / 'cached_data' / 'macro'
+LEGACY_MACRO_CACHE = ROOT_DIR / 'cached_data' / 'macro_data.pkl'
+
+# 지표별 거래 시장 (utils/market_calendar.py, 최신 여부 판단용)
+MACRO_MARKETS = {
+    'kospi': 'krx',
+    'usd_krw': 'fx',
+    'vix': 'us',
+    'sp500': 'us',
+}
+
+# 최근 마감 거래일 데이터가 아직 제공되지 않았을 때 다시 확인하는 간격
+MACRO_RECHECK = timedelta(hours=1)
+
+# 지표별 다운로드 시도 횟수 / 시도별 타임아웃 초 / 재시도 대기 초 (시도마다 2배)
+MACRO_TRIES = 3
+MACRO_TIMEOUT = 30
+MACRO_RETRY_BACKOFF = 1.0
+
+# 종목별 투자자 데이터 열 단위 캐시 (cached_data/pykrx/<티커>/) + 종목별 받은 구간 기록 (progress.json)
+# 예전 통합 캐시는 종목별 캐시가 없을 때 읽기만 함
+PYKRX_CACHE_DIR = ROOT_DIR / 'cached_data' / 'pykrx'
+PYKRX_PROGRESS = PYKRX_CACHE_DIR / 'progress.json'
+LEGACY_PYKRX_CACHE = ROOT_DIR / 'cached_data' / 'pykrx_data.pkl'
+
+# 챗봇/평가용 투자자 데이터 (data/pykrx_30stocks/<티커>/, 열 단위), 예전 pickle은 열 단위 데이터가 없을 때 읽기만 함
+INVESTOR_DATA_DIR = ROOT_DIR / 'data' / 'pykrx_30stocks'
+LEGACY_INVESTOR_DATA = ROOT_DIR / 'data' / 'pykrx_data_30stocks_cache.pkl'
+
+# pykrx 요청 속도 (초당 요청 수 / 연속 요청 수) / 동시 다운로드 수 / 종목별 타임아웃 초
+PYKRX_RATE = float(os.environ.get('JUSIC_PYKRX_RATE', '2'))
+PYKRX_BURST = int(os.environ.get('JUSIC_PYKRX_BURST', '2'))
+PYKRX_WORKERS = int(os.environ.get('JUSIC_PYKRX_WORKERS', '4'))
+PYKRX_TIMEOUT = 60
+
+# 투자자별 거래실적 확정 시각 (KRX 마감 15:30 + 2시간 30분 = 18:00)
+INVESTOR_DATA_DELAY = timedelta(hours=2, minutes=30)
 
-def load_or_download_macro_data(start_date='20190101', end_date='20241231', force_refresh=False):
+# 요청 속도 제한은 프로세스 전체에서 공유 (챗봇 갱신 스레드와 로더가 같은 제한을 따름)
+PYKRX_LIMITER = TokenBucket(PYKRX_RATE, PYKRX_BURST)
+
+
+def yfinance_macro_source(symbol, start, end, timeout):
     """
-    거시경제 데이터 로드 (캐시 우선)
+    거시경제 지표 일봉 다운로드 (기본 소스)
+    
+    소스는 (심볼, 시작일 'YYYY-MM-DD', 종료일 'YYYY-MM-DD' (미포함), 타임아웃 초) →
+    DataFrame (Close 열 포함, 없으면 None) 함수이면 되므로, 테스트에서는 로컬 데이터를 돌려주는
+    함수로 바꿔 끼울 수 있다.
+    """
+    from utils.market_data import download_bars
+    return download_bars(symbol, start=start, end=end, timeout=timeout)
+
+
+def _fetch_series(source, symbol, start, end, timeout, tries):
+    """지표 1개 다운로드 (실패/빈 결과면 재시도, 끝내 실패하면 None)"""
+    for attempt in range(tries):
+        try:
+            data = source(symbol, start, end, timeout)
+            if data is not None and not data.empty:
+                return data
+        except Exception as e:
+            print(f"     WARNING: {symbol} attempt {attempt + 1}/{tries} failed: {e}")
+        if attempt + 1 < tries:
+            time.sleep(MACRO_RETRY_BACKOFF * 2 ** attempt)
+    return None
+
+
+def _load_pickle(path):
+    """pickle 파일 로드 (없거나 깨졌으면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _load_json(path):
+    """JSON 파일 로드 (없거나 깨졌으면 None)"""
+    try:
+        return json.loads(Path(path).read_text(encoding='utf-8'))
+    except Exception:
+        return None
+
+
+def macro_cache_files():
+    """현재 거시경제 캐시 파일 목록 (지표별 캐시의 meta.json, 없으면 예전 통합 캐시)"""
+    from utils.frame_store import meta_path
+    files = [meta_path(MACRO_CACHE_DIR / key) for key in MACRO_SERIES]
+    files = [path for path in files if path.exists()]
+    if not files and LEGACY_MACRO_CACHE.exists():
+        files = [LEGACY_MACRO_CACHE]
+    return files
+
+
+def load_or_download_macro_data(start_date='20190101', end_date='20241231', force_refresh=False, allow_stale=False,
+                                source=None, timeout=None, tries=None):
+    """
+    거시경제 데이터 로드 (지표별 캐시 우선, 오래된 지표만 동시에 다운로드)
+    
+    캐시에서 읽은 DataFrame은 메모리 매핑이라 값이 읽기 전용이다 (제자리 수정은 ValueError).
+    값을 바꾸려면 df.copy()를 쓴다.
     
     Args:
         start_date: 시작일 (YYYYMMDD)
         end_date: 종료일 (YYYYMMDD)
         force_refresh: 강제 새로고침
+        allow_stale: 최근 마감 거래일 데이터가 없어도 캐시 사용 (갱신은 백그라운드에서 따로 수행할 때)
+        source: 지표 다운로드 함수 (기본 yfinance_macro_source)
+        timeout: 시도별 타임아웃 초 (기본 MACRO_TIMEOUT)
+        tries: 지표별 시도 횟수 (기본 MACRO_TRIES)
     
     Returns:
-        dict: {날짜: {kospi, usd_krw, vix, sp500}}
+        dict: {kospi, usd_krw, vix, sp500: DataFrame} (다운로드에 실패한 지표는 이전 캐시, 그것도 없으면 제외)
     """
-    # 루트 디렉토리 기준으로 캐시 경로 설정
-    from pathlib import Path
-    ROOT_DIR = Path(__file__).parent.parent
-    cache_file = ROOT_DIR / 'cached_data' / 'macro_data.pkl'
-    cache_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    # 캐시 확인
-    if cache_file.exists() and not force_refresh:
-        # 1일 이내면 캐시 사용
-        cache_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-        if datetime.now() - cache_time < timedelta(days=1):
-            print("[Cache] Cached macro data loaded")
-            with open(cache_file, 'rb') as f:
-                return pickle.load(f)
-    
-    # 새로 다운로드
-    print("[Download] Downloading macro data (2-3 min)...")
+    import pandas as pd
+    from utils.frame_store import load_frame, meta_path
+    from utils.market_calendar import KST, is_fresh
+    
+    source = source or yfinance_macro_source
+    timeout = timeout or MACRO_TIMEOUT
+    tries = tries or MACRO_TRIES
+    
+    # 조회 종료일 (yfinance end는 미포함)
+    before = pd.Timestamp(end_date).date()
+    
+    def check():
+        """캐시 로드 + 다시 받을 지표 (반환: (캐시 dict, 지표 키 리스트))"""
+        legacy = None
+        cached = {}
+        missing = []
+        for key in MACRO_SERIES:
+            data = load_frame(MACRO_CACHE_DIR / key)
+            path = meta_path(MACRO_CACHE_DIR / key)
+            if data is None:
+                # 예전 통합 캐시 (지표별 캐시로 옮기기 전)
+                if legacy is None:
+                    legacy = (_load_pickle(LEGACY_MACRO_CACHE) or {}) if LEGACY_MACRO_CACHE.exists() else {}
+                data = legacy.get(key)
+                path = LEGACY_MACRO_CACHE
+            
+            if data is not None:
+                cached[key] = data
+                # 마지막 날짜가 지표 시장의 최근 마감 거래일까지 있으면 캐시 사용 (휴장일에는 다시 받지 않음)
+                checked_at = datetime.fromtimestamp(path.stat().st_mtime, KST).replace(tzinfo=None)
+                market = MACRO_MARKETS.get(key, 'fx')
+                fresh = len(data) and is_fresh(data.index.max().date(), checked_at, market, before=before,
+                                               recheck=MACRO_RECHECK)
+                if not force_refresh and (allow_stale or fresh):
+                    continue
+            missing.append(key)
+        return cached, missing
+    
+    cached, missing = check()
+    if not missing:
+        print("[Cache] Cached macro data loaded")
+        return cached
+    
+    # 한 프로세스만 다운로드: 다른 프로세스가 받는 중이면 기다렸다가 그 결과를 쓰고,
+    # 오래된 캐시를 써도 되면 (allow_stale) 기다리지 않고 이전 캐시 사용
+    lock = cache_lock('macro')
+    if not lock.acquire(timeout=0 if allow_stale and cached else None):
+        if cached:
+            print("[Cache] Macro data is being refreshed by another process, using cached data")
+            return cached
+        # 캐시가 없으면 잠금 없이 받음 (저장은 원자적 교체라 파일이 깨지지 않음)
+    try:
+        if lock.locked:
+            # 기다리는 동안 다른 프로세스가 받았으면 다시 받지 않음
+            cached, missing = check()
+            if not missing:
+                print("[Cache] Cached macro data loaded (refreshed by another process)")
+                return cached
+        return _download_macro(cached, missing, start_date, end_date, source, timeout, tries)
+    finally:
+        lock.release()
+
+
+def _download_macro(cached, missing, start_date, end_date, source, timeout, tries):
+    """오래된 지표만 동시에 다운로드해 지표별 캐시에 저장 (실패한 지표는 이전 캐시)"""
+    import pandas as pd
+    from utils.frame_store import save_frame
+    from utils.market_data import fetch_concurrently
+    
+    # 새로 다운로드 (지표별 동시 실행, 지표별 재시도)
+    print(f"[Download] Downloading macro data ({', '.join(missing)})...")
     
     # 날짜 변환
     start = pd.to_datetime(start_date).strftime('%Y-%m-%d')
     end = pd.to_datetime(end_date).strftime('%Y-%m-%d')
     
+    deadline = tries * timeout + MACRO_RETRY_BACKOFF * (2 ** tries)
+    results = fetch_concurrently(
+        missing, lambda key: _fetch_series(source, MACRO_SERIES[key], start, end, timeout, tries),
+        max_workers=len(missing), timeout=deadline
+    )
+    
     macro_data = {}
+    for key in MACRO_SERIES:
+        data = results.get(key)
+        if data is not None:
+            # 지표별 캐시 저장 (실패한 지표가 있어도 받은 지표는 저장)
+            save_frame(MACRO_CACHE_DIR / key, data)
+            macro_data[key] = data
+            print(f"     OK: {key} {len(data)} days")
+        elif key in cached:
+            if key in missing:
+                print(f"     WARNING: {key} download failed, using cached data")
+            macro_data[key] = cached[key]
+        else:
+            print(f"     ERROR: {key} download failed")
     
-    try:
-        # 1. KOSPI 지수
-        print("  [1/4] KOSPI downloading...")
-        kospi = yf.download('^KS11', start=start, end=end, progress=False)
-        if not kospi.empty:
-            if isinstance(kospi.columns, pd.MultiIndex):
-                kospi.columns = kospi.columns.droplevel(1)
-            macro_data['kospi'] = kospi
-            print(f"     OK: KOSPI {len(kospi)} days")
-        
-        # 2. USD/KRW 환율
-        print("  [2/4] USD/KRW downloading...")
-        usd_krw = yf.download('KRW=X', start=start, end=end, progress=False)
-        if not usd_krw.empty:
-            if isinstance(usd_krw.columns, pd.MultiIndex):
-                usd_krw.columns = usd_krw.columns.droplevel(1)
-            macro_data['usd_krw'] = usd_krw
-            print(f"     OK: USD/KRW {len(usd_krw)} days")
-        
-        # 3. VIX (변동성 지수)
-        print("  [3/4] VIX downloading...")
-        vix = yf.download('^VIX', start=start, end=end, progress=False)
-        if not vix.empty:
-            if isinstance(vix.columns, pd.MultiIndex):
-                vix.columns = vix.columns.droplevel(1)
-            macro_data['vix'] = vix
-            print(f"     OK: VIX {len(vix)} days")
+    return macro_data
+
+
+def pykrx_investor_source(ticker, start, end):
+    """
+    투자자별 순매수 다운로드 (기본 소스)
+    
+    소스는 (티커, 시작일 'YYYYMMDD', 종료일 'YYYYMMDD' (포함)) → DataFrame (없으면 None) 함수이면 되므로,
+    테스트에서는 로컬 데이터를 돌려주는 함수로 바꿔 끼울 수 있다.
+    """
+    from pykrx import stock
+    
+    # 투자자별 거래 데이터 (날짜별), pykrx는 6자리 종목 코드만 받음
+    # 옵션: by="BUY" 또는 "SELL" 또는 "NET" (순매수)
+    return stock.get_market_trading_value_by_date(start, end, ticker.split('.')[0], detail=True)
+
+
+def _ymd(day):
+    """날짜 → 'YYYYMMDD'"""
+    import pandas as pd
+    return pd.Timestamp(day).strftime('%Y%m%d')
+
+
+def investor_target_date(end_date):
+    """받아야 할 마지막 날짜 (YYYYMMDD): end_date 이전(포함) 투자자별 거래실적이 확정된 마지막 KRX 거래일"""
+    import pandas as pd
+    from utils.market_calendar import now_kst, last_session
+    
+    # 거래실적은 장 마감 후 확정되므로 기준 시각을 그만큼 당겨 계산
+    now = now_kst() - INVESTOR_DATA_DELAY
+    before = pd.Timestamp(end_date).date() + timedelta(days=1)
+    return _ymd(last_session('krx', now, before=before))
+
+
+def update_investor_data(data, tickers, start_date, end_date, coverage=None, on_update=None,
+                         source=None, limiter=None, max_workers=None, stop=None):
+    """
+    투자자별 순매수 증분 다운로드 (종목별로 마지막 저장일 이후만 요청)
+    
+    - 기존 데이터가 없거나, 받은 구간이 start_date보다 늦게 시작하면 start_date부터 전체를 받는다.
+    - 그 외에는 마지막 저장일부터 (마지막 저장일 포함, 잠정치 교체) 받아 이어 붙인다.
+    - coverage에 기록된 받은 구간이 [start_date, 목표일]을 덮는 종목은 요청하지 않는다.
+    - 요청은 공용 토큰 버킷으로 속도를 제한하고 여러 종목을 동시에 보낸다.
+    
+    Args:
+        data: {티커: DataFrame} 기존 데이터 (바꾸지 않음)
+        tickers: 갱신할 종목 리스트
+        start_date: 필요한 첫 날짜 (YYYYMMDD)
+        end_date: 필요한 마지막 날짜 (YYYYMMDD, 마지막 마감 거래일 이후는 요청하지 않음)
+        coverage: {티커: [시작일, 종료일]} 이미 받은 구간 (None이면 건너뛰지 않고 모두 증분 요청,
+                  기록이 없는 종목은 기존 데이터가 start_date부터 마지막 저장일까지 덮는다고 봄)
+        on_update: 종목을 받을 때마다 (티커, DataFrame, [시작일, 종료일]) 호출 (진행 저장용, 작업 스레드에서 호출)
+        source: 다운로드 함수 (기본 pykrx_investor_source)
+        limiter: TokenBucket (기본 PYKRX_LIMITER)
+        max_workers: 동시 다운로드 수 (기본 PYKRX_WORKERS)
+        stop: threading.Event (설정되면 남은 종목은 요청하지 않음)
+    
+    Returns:
+        dict: {티커: DataFrame} 새로 받은 종목만 (기존 데이터에 이어 붙인 결과, tickers 순서)
+    """
+    import pandas as pd
+    from utils.market_data import fetch_concurrently
+    
+    source = source or pykrx_investor_source
+    limiter = limiter or PYKRX_LIMITER
+    max_workers = max_workers or PYKRX_WORKERS
+    start_date = _ymd(start_date)
+    target = investor_target_date(end_date)
+    
+    # 종목별 요청 시작일 / 받은 뒤 구간 시작일
+    plans = {}
+    for ticker in tickers:
+        old = data.get(ticker)
+        covered = (coverage or {}).get(ticker)
+        if covered is None and old is not None and not old.empty:
+            covered = [start_date, _ymd(old.index.max())]
         
-        # 4. S&P 500
-        print("  [4/4] S&P 500 downloading...")
-        sp500 = yf.download('^GSPC', start=start, end=end, progress=False)
-        if not sp500.empty:
-            if isinstance(sp500.columns, pd.MultiIndex):
-                sp500.columns = sp500.columns.droplevel(1)
-            macro_data['sp500'] = sp500
-            print(f"     OK: S&P 500 {len(sp500)} days")
+        if covered is None or covered[0] > start_date or old is None or old.empty:
+            fetch_start = start_date
+        elif coverage is not None and covered[1] >= target:
+            continue
+        else:
+            fetch_start = max(start_date, _ymd(old.index.max()))
         
-        # 캐시 저장
-        with open(cache_file, 'wb') as f:
-            pickle.dump(macro_data, f)
+        if fetch_start <= target:
+            plans[ticker] = (fetch_start, min(covered[0], fetch_start) if covered else fetch_start)
+    
+    if not plans:
+        return {}
+    
+    print(f"[Download] Downloading pykrx data ({len(plans)} stocks, ~{target})...")
+    
+    def fetch(ticker):
+        if stop is not None and stop.is_set():
+            return None
+        if not limiter.acquire(stop):
+            return None
         
-        print("  [Save] Cache saved")
+        fetch_start, covered_start = plans[ticker]
+        df = source(ticker, fetch_start, target)
+        old = data.get(ticker)
+        if df is None or df.empty:
+            # 새 거래일 없음 (휴장 등): 받은 구간만 기록
+            df = old
+            print(f"     OK: {ticker} no new days")
+        else:
+            if old is not None and not old.empty:
+                df = pd.concat([old[old.index < df.index.min()], df])
+            print(f"     OK: {ticker} {len(df)} days (requested {fetch_start}~{target})")
         
-    except Exception as e:
-        print(f"  ERROR: Download failed: {e}")
-        macro_data = {}
+        if df is None:
+            return None
+        if on_update is not None:
+            on_update(ticker, df, [covered_start, target])
+        return df
     
-    return macro_data
+    timeout = PYKRX_TIMEOUT + max_workers / limiter.rate
+    results = fetch_concurrently(list(plans), fetch, max_workers=max_workers, timeout=timeout)
+    return {ticker: df for ticker, df in results.items() if df is not None}
+
+
+def _load_pykrx_cache(tickers):
+    """종목별 pykrx 캐시 + 받은 구간 기록 (반환: ({티커: DataFrame}, {티커: [시작일, 종료일]}))"""
+    from utils.frame_store import load_frame
+    
+    progress = (_load_json(PYKRX_PROGRESS) or {}) if PYKRX_PROGRESS.exists() else {}
+    cached = {}
+    legacy = None
+    for ticker in tickers:
+        data = load_frame(PYKRX_CACHE_DIR / ticker)
+        if data is None:
+            # 예전 통합 캐시 (종목별 캐시로 옮기기 전)
+            if legacy is None:
+                legacy = (_load_pickle(LEGACY_PYKRX_CACHE) or {}) if LEGACY_PYKRX_CACHE.exists() else {}
+            data = legacy.get(ticker)
+            progress.pop(ticker, None)
+        if data is not None:
+            cached[ticker] = data
+    return cached, progress
 
 
-def load_or_download_pykrx_data(tickers, start_date='20190101', end_date='20241231', force_refresh=False):
+def load_or_download_pykrx_data(tickers, start_date='20190101', end_date='20241231', force_refresh=False,
+                                source=None):
     """
-    pykrx 데이터 로드 (캐시 우선)
+    pykrx 데이터 로드 (종목별 캐시 우선, 받은 구간 이후만 증분 다운로드)
+    
+    종목을 받을 때마다 종목별 캐시와 받은 구간 기록(progress.json)을 저장하므로,
+    중간에 끊겨도 다시 실행하면 남은 종목/구간부터 이어 받는다.
+    
+    캐시에서 읽은 DataFrame은 메모리 매핑이라 값이 읽기 전용이다 (제자리 수정은 ValueError).
+    값을 바꾸려면 df.copy()를 쓴다.
     
     Args:
         tickers: 종목 티커 리스트
         start_date: 시작일 (YYYYMMDD)
         end_date: 종료일 (YYYYMMDD)
-        force_refresh: 강제 새로고침
+        force_refresh: 강제 새로고침 (캐시를 무시하고 전체 구간 다시 다운로드)
+        source: 다운로드 함수 (기본 pykrx_investor_source)
     
     Returns:
         dict: {티커: DataFrame(날짜, 기관, 외국인, 개인)}
     """
-    # 루트 디렉토리 기준으로 캐시 경로 설정
-    ROOT_DIR = Path(__file__).parent.parent
-    cache_file = ROOT_DIR / 'cached_data' / 'pykrx_data.pkl'
-    cache_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    # 캐시 확인
-    if cache_file.exists() and not force_refresh:
-        # 1일 이내면 캐시 사용
-        cache_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-        if datetime.now() - cache_time < timedelta(days=1):
-            print("[Cache] Cached pykrx data loaded")
-            with open(cache_file, 'rb') as f:
-                return pickle.load(f)
-    
-    # 새로 다운로드
-    print(f"[Download] Downloading pykrx data ({len(tickers)} stocks, 5-10 min)...")
-    
-    pykrx_data = {}
+    import threading
+    from utils.frame_store import save_frame
     
-    for i, ticker in enumerate(tickers, 1):
-        try:
-            print(f"  [{i}/{len(tickers)}] {ticker} downloading...")
-            
-            # 투자자별 거래 데이터 (날짜별)
-            # 옵션: by="BUY" 또는 "SELL" 또는 "NET" (순매수)
-            df = stock.get_market_trading_value_by_date(
-                start_date, end_date, ticker, detail=True
-            )
-            
-            if df is not None and not df.empty:
-                # 컬럼명 변경 (기관, 외국인, 개인 -> 비율 계산용)
-                pykrx_data[ticker] = df
-                print(f"     OK: {len(df)} days")
-            else:
-                print(f"     WARNING: No data")
+    # 한 프로세스만 다운로드: 다른 프로세스가 받는 중이면 기다린 뒤 그 결과에 이어서 받고,
+    # 끝내 잠금을 못 얻으면 받아 둔 캐시만 사용
+    process_lock = cache_lock('pykrx')
+    locked = process_lock.acquire()
+    try:
+        cached, progress = _load_pykrx_cache(tickers) if not force_refresh else ({}, {})
+        if locked:
+            lock = threading.Lock()
             
-            # API 제한 방지 (1초 대기)
-            time.sleep(1)
+            def save(ticker, df, covered):
+                # 종목마다 바로 저장 (끊겨도 받은 종목은 남음)
+                save_frame(PYKRX_CACHE_DIR / ticker, df)
+                with lock:
+                    progress[ticker] = covered
+                    atomic_write_text(PYKRX_PROGRESS, json.dumps(progress, indent=2, sort_keys=True))
+                    process_lock.touch()
             
-        except Exception as e:
-            print(f"     ERROR: {e}")
-            continue
+            updated = update_investor_data(cached, tickers, start_date, end_date, coverage=progress,
+                                           on_update=save, source=source)
+        else:
+            print("  WARNING: pykrx data is being refreshed by another process, using cached data")
+            updated = {}
+    finally:
+        process_lock.release()
     
-    # 캐시 저장
-    with open(cache_file, 'wb') as f:
-        pickle.dump(pykrx_data, f)
+    pykrx_data = {}
+    for ticker in tickers:
+        data = updated.get(ticker, cached.get(ticker))
+        if data is not None:
+            pykrx_data[ticker] = data
+    
+    if updated:
+        print(f"  [Save] Cache saved ({len(updated)} updated, {len(pykrx_data)} stocks)")
+    else:
+        print("[Cache] Cached pykrx data loaded")
     
-    print(f"  [Save] Cache saved ({len(pykrx_data)} stocks)")
+    missing = [ticker for ticker in tickers if ticker not in pykrx_data]
+    if missing:
+        print(f"  WARNING: No pykrx data for {len(missing)} stocks ({', '.join(missing[:5])})")
     
+    # 순매수 비율 패널은 로드할 때 1번 계산
+    investor_ratio_table(pykrx_data)
     return pykrx_data
 
 
+def investor_data_files():
+    """현재 챗봇용 투자자 데이터 파일 목록 (종목별 meta.json, 없으면 예전 pickle)"""
+    from utils.frame_store import frame_files
+    files = frame_files(INVESTOR_DATA_DIR)
+    if not files and LEGACY_INVESTOR_DATA.exists():
+        files = [LEGACY_INVESTOR_DATA]
+    return files
+
+
+def load_investor_data():
+    """
+    챗봇/평가용 투자자 데이터 로드 (열 단위 데이터 우선, 메모리 매핑)
+    
+    캐시에서 읽은 DataFrame은 메모리 매핑이라 값이 읽기 전용이다 (제자리 수정은 ValueError).
+    값을 바꾸려면 df.copy()를 쓴다.
+    
+    Returns:
+        dict: {티커: DataFrame} (데이터가 없으면 None)
+    """
+    from utils.frame_store import load_frames
+    
+    data = load_frames(INVESTOR_DATA_DIR)
+    if data:
+        return data
+    
+    # 예전 pickle ({'data': {티커: DataFrame}})
+    cache = _load_pickle(LEGACY_INVESTOR_DATA) if LEGACY_INVESTOR_DATA.exists() else None
+    return cache.get('data') if isinstance(cache, dict) else None
+
+
+def save_investor_data(data, tickers=None):
+    """
+    챗봇/평가용 투자자 데이터 저장
+    
+    Args:
+        data: {티커: DataFrame}
+        tickers: 바뀐 종목 (이 종목만 교체, 열 단위 데이터가 아직 없으면 전체 저장)
+    """
+    from utils.frame_store import save_frames, frame_keys
+    
+    if tickers is not None and frame_keys(INVESTOR_DATA_DIR):
+        data = {ticker: data[ticker] for ticker in tickers if ticker in data}
+    save_frames(INVESTOR_DATA_DIR, data)
+
+
+def last_date(frames):
+    """
+    여러 DataFrame 중 가장 최근 날짜
+    
+    Args:
+        frames: {이름: DataFrame(index=날짜)}
+    
+    Returns:
+        str: 'YYYY-MM-DD' (데이터 없으면 None)
+    """
+    dates = [df.index.max() for df in frames.values() if df is not None and len(df)]
+    return max(dates).date().isoformat() if dates else None
+
+
+class MacroFeatures:
+    """
+    거시경제 피처 표 (평일 × 피처, 거시경제 데이터당 1번 계산)
+    
+    지표별 종가 변화율(pct_change)은 각 지표 자체 날짜 기준으로 한 번만 계산하고,
+    평일 달력에 맞춰 (해당 날짜 관측이 없으면 앞쪽 관측 값으로 채워) 배열로 보관한다.
+    종목에 붙일 때는 종목 날짜마다 그 날짜 이전 마지막 관측 값을 가져온다 (as-of).
+    긴 이력에 join + ffill한 것과 같고, 최근 1개월 일봉만 붙여도 구간 첫 행이나
+    거시경제 캐시가 끝난 뒤의 날짜가 비지 않는다.
+    """
+    
+    def __init__(self, macro_data):
+        """
+        Args:
+            macro_data: load_or_download_macro_data() 결과
+        """
+        import numpy as np
+        import pandas as pd
+        from utils.market_calendar import trading_days
+        
+        series = {}
+        if 'kospi' in macro_data:
+            series['KOSPI_Change'] = macro_data['kospi']['Close'].pct_change()
+        if 'usd_krw' in macro_data:
+            series['USD_KRW_Change'] = macro_data['usd_krw']['Close'].pct_change()
+        if 'vix' in macro_data:
+            series['VIX'] = macro_data['vix']['Close']
+            series['VIX_Change'] = macro_data['vix']['Close'].pct_change()
+        if 'sp500' in macro_data:
+            series['SP500_Change'] = macro_data['sp500']['Close'].pct_change()
+        
+        self.columns = list(series)
+        
+        dates = [s.index for s in series.values() if len(s)]
+        if dates:
+            start = min(index.min() for index in dates).date()
+            end = max(index.max() for index in dates).date()
+            # 평일 달력 (지표마다 휴장일이 달라 휴장일은 빼지 않음)
+            calendar = pd.DatetimeIndex(trading_days(start, end, 'fx'))
+        else:
+            calendar = pd.DatetimeIndex([])
+        
+        self.dates = calendar.values.astype('datetime64[D]')
+        values = pd.DataFrame(np.nan, index=calendar, columns=self.columns)
+        for name, s in series.items():
+            s = s[~s.index.duplicated(keep='last')]
+            values[name] = s.reindex(calendar).to_numpy(dtype=float)
+        # 앞쪽 관측 값 채움 (휴장일 / 지표마다 다른 휴일)
+        self.values = values.ffill().to_numpy(dtype=float)
+    
+    def lookup(self, index):
+        """
+        날짜 목록 → 피처 배열 (날짜마다 그 날짜 이전 마지막 관측 값)
+        
+        Args:
+            index: 종목 날짜 (DatetimeIndex)
+        
+        Returns:
+            ndarray: (날짜 수 × 피처 수) (표 시작 전 날짜는 NaN)
+        """
+        import numpy as np
+        
+        dates = np.asarray(index.values).astype('datetime64[D]')
+        pos = np.searchsorted(self.dates, dates, side='right') - 1
+        values = self.values[np.maximum(pos, 0)] if len(self.dates) else np.full((len(dates), len(self.columns)), np.nan)
+        values[pos < 0] = np.nan
+        return values
+    
+    def attach(self, df):
+        """종목 DataFrame에 거시경제 피처 열 추가 (새 DataFrame)"""
+        import pandas as pd
+        
+        features = pd.DataFrame(self.lookup(df.index), index=df.index, columns=self.columns)
+        return pd.concat([df.drop(columns=[c for c in self.columns if c in df.columns]), features], axis=1)
+
+
+def _gather_ffill(table_dates, table_values, index):
+    """
+    날짜별 표에서 종목 날짜 행 가져오기 (표에 없는 날짜는 NaN, 종목 날짜 순으로 앞쪽 값 채움)
+    
+    Args:
+        table_dates: 표 날짜 (datetime64[D], 오름차순)
+        table_values: (표 날짜 수 × 열 수) 배열
+        index: 종목 날짜 (DatetimeIndex, 오름차순)
+    
+    Returns:
+        ndarray: (종목 날짜 수 × 열 수) float64
+    """
+    import numpy as np
+    
+    dates = np.asarray(index.values).astype('datetime64[D]')
+    values = np.full((len(dates), table_values.shape[1]), np.nan)
+    if len(table_dates):
+        pos = np.minimum(np.searchsorted(table_dates, dates), len(table_dates) - 1)
+        hit = table_dates[pos] == dates
+        values[hit] = table_values[pos[hit]]
+    
+    # 앞쪽 값 채우기 (열마다 마지막 관측 행 위치)
+    rows = np.where(~np.isnan(values), np.arange(len(dates))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(values, rows, axis=0)
+
+
+def _derived_table(cache, source, build):
+    """원본 데이터 객체별 파생 표 (같은 객체면 다시 계산하지 않음, 갱신 중 교체 전/후를 위해 최근 2개 보관)"""
+    for key, table in cache:
+        if key is source:
+            return table
+    
+    table = build(source)
+    cache[:] = cache[-1:] + [(source, table)]
+    return table
+
+
+_macro_features = []
+_investor_ratios = []
+
+
+def macro_feature_table(macro_data):
+    """거시경제 데이터의 피처 표 (같은 데이터 객체면 다시 계산하지 않음)"""
+    return _derived_table(_macro_features, macro_data, MacroFeatures)
+
+
 def merge_macro_features(stock_df, macro_data):
     """
     주가 데이터에 거시경제 피처 추가
@@ -181,46 +656,92 @@ def merge_macro_features(stock_df, macro_data):
     Returns:
         DataFrame: 거시경제 피처가 추가된 데이터
     """
-    df = stock_df.copy()
+    df = stock_df
     
     try:
-        # KOSPI 변화율
-        if 'kospi' in macro_data:
-            kospi = macro_data['kospi'][['Close']].copy()
-            kospi.columns = ['KOSPI']
-            kospi['KOSPI_Change'] = kospi['KOSPI'].pct_change()
-            df = df.join(kospi[['KOSPI_Change']], how='left')
-        
-        # USD/KRW 변화율
-        if 'usd_krw' in macro_data:
-            usd_krw = macro_data['usd_krw'][['Close']].copy()
-            usd_krw.columns = ['USD_KRW']
-            usd_krw['USD_KRW_Change'] = usd_krw['USD_KRW'].pct_change()
-            df = df.join(usd_krw[['USD_KRW_Change']], how='left')
-        
-        # VIX
-        if 'vix' in macro_data:
-            vix = macro_data['vix'][['Close']].copy()
-            vix.columns = ['VIX']
-            vix['VIX_Change'] = vix['VIX'].pct_change()
-            df = df.join(vix[['VIX', 'VIX_Change']], how='left')
-        
-        # S&P 500 변화율
-        if 'sp500' in macro_data:
-            sp500 = macro_data['sp500'][['Close']].copy()
-            sp500.columns = ['SP500']
-            sp500['SP500_Change'] = sp500['SP500'].pct_change()
-            df = df.join(sp500[['SP500_Change']], how='left')
+        # KOSPI / USD/KRW / S&P 500 변화율, VIX (미리 계산한 표에서 날짜별로 가져옴)
+        df = macro_feature_table(macro_data).attach(df)
         
         # Forward fill (주말/공휴일 채우기)
         df = df.ffill()
         
     except Exception as e:
         print(f"  WARNING: Failed to add macro features: {e}")
+        df = stock_df.copy()
     
     return df
 
 
+# 투자자별 순매수 비율 (merge_pykrx_features가 추가하는 열)
+INVESTOR_COLUMNS = ['Institution_Ratio', 'Foreign_Ratio', 'Individual_Ratio']
+
+
+class InvestorRatios:
+    """
+    투자자별 순매수 비율 패널 (날짜 × 종목 × 3, float32, pykrx 데이터당 1번 계산)
+    
+    pykrx는 12개 컬럼 반환:
+    [금융투자, 보험, 투신, 사모펀드, 은행, 기타금융, 연기금, 기타법인, 개인, 외국인, 기타외국인, 전체]
+    컬럼 위치로 접근 (한글 인코딩 문제 회피)
+    """
+    
+    def __init__(self, pykrx_data):
+        """
+        Args:
+            pykrx_data: {티커: 투자자별 순매수 DataFrame}
+        """
+        import numpy as np
+        
+        ratios = {}
+        # 컬럼 수가 예상과 다른 종목 {티커: 컬럼 수}
+        self.invalid = {}
+        for ticker, investor_df in pykrx_data.items():
+            if investor_df is None:
+                continue
+            if investor_df.shape[1] < 12:
+                self.invalid[ticker] = investor_df.shape[1]
+                continue
+            
+            values = investor_df.to_numpy(dtype=float)
+            # 기관 = 처음 8개 컬럼 합 (금융투자~기타법인), 개인 = 9번째, 외국인 = 10, 11번째 합
+            institution_net = values[:, 0:8].sum(axis=1)
+            individual_net = values[:, 8]
+            foreign_net = values[:, 9:11].sum(axis=1)
+            
+            # 총 순매수 절대값 (정규화용)
+            total_net = np.abs(institution_net) + np.abs(foreign_net) + np.abs(individual_net) + 1
+            
+            dates = investor_df.index.values.astype('datetime64[D]')
+            ratios[ticker] = (dates, np.stack([
+                institution_net / total_net, foreign_net / total_net, individual_net / total_net
+            ], axis=1))
+        
+        self.dates = np.unique(np.concatenate([d for d, _ in ratios.values()])) if ratios else np.array([], 'datetime64[D]')
+        self.tickers = {ticker: j for j, ticker in enumerate(ratios)}
+        self.values = np.full((len(self.dates), len(ratios), len(INVESTOR_COLUMNS)), np.nan, dtype=np.float32)
+        for ticker, (dates, values) in ratios.items():
+            self.values[np.searchsorted(self.dates, dates), self.tickers[ticker]] = values
+    
+    def __contains__(self, ticker):
+        return ticker in self.tickers
+    
+    def lookup(self, ticker, index):
+        """종목 날짜 → 비율 배열 ((날짜 수 × 3), 날짜 순으로 앞쪽 값 채움)"""
+        return _gather_ffill(self.dates, self.values[:, self.tickers[ticker]], index)
+    
+    def attach(self, df, ticker):
+        """종목 DataFrame에 비율 열 추가 (새 DataFrame)"""
+        import pandas as pd
+        
+        ratios = pd.DataFrame(self.lookup(ticker, df.index), index=df.index, columns=INVESTOR_COLUMNS)
+        return pd.concat([df.drop(columns=[c for c in INVESTOR_COLUMNS if c in df.columns]), ratios], axis=1)
+
+
+def investor_ratio_table(pykrx_data):
+    """pykrx 데이터의 비율 패널 (같은 데이터 객체면 다시 계산하지 않음)"""
+    return _derived_table(_investor_ratios, pykrx_data, InvestorRatios)
+
+
 def merge_pykrx_features(stock_df, pykrx_data, ticker):
     """
     주가 데이터에 pykrx 피처 추가
@@ -233,54 +754,26 @@ def merge_pykrx_features(stock_df, pykrx_data, ticker):
     Returns:
         DataFrame: pykrx 피처가 추가된 데이터
     """
-    df = stock_df.copy()
+    df = stock_df
     
     try:
         if ticker in pykrx_data:
-            investor_df = pykrx_data[ticker].copy()
-            
-            # pykrx는 12개 컬럼 반환:
-            # [금융투자, 보험, 투신, 사모펀드, 은행, 기타금융, 연기금, 기타법인, 개인, 외국인, 기타외국인, 전체]
-            # 컬럼 위치로 접근 (한글 인코딩 문제 회피)
-            cols = list(investor_df.columns)
+            # 순매수 비율 (미리 계산한 패널에서 날짜별로 가져옴)
+            ratios = investor_ratio_table(pykrx_data)
             
-            if len(cols) >= 12:
-                # 기관 = 처음 8개 컬럼 합 (금융투자~기타법인)
-                institution_net = investor_df.iloc[:, 0:8].sum(axis=1)
-                
-                # 개인 = 9번째 컬럼
-                individual_net = investor_df.iloc[:, 8]
-                
-                # 외국인 = 10, 11번째 컬럼 합
-                foreign_net = investor_df.iloc[:, 9:11].sum(axis=1)
-                
-                # 총 순매수 절대값 (정규화용)
-                total_net = (
-                    institution_net.abs() + 
-                    foreign_net.abs() + 
-                    individual_net.abs() + 1
-                )
-                
-                # 순매수 비율 계산
-                investor_df['Institution_Ratio'] = institution_net / total_net
-                investor_df['Foreign_Ratio'] = foreign_net / total_net
-                investor_df['Individual_Ratio'] = individual_net / total_net
-                
-                # Merge (날짜 기준)
-                df = df.join(
-                    investor_df[['Institution_Ratio', 'Foreign_Ratio', 'Individual_Ratio']], 
-                    how='left'
-                )
+            if ticker in ratios:
+                df = ratios.attach(df, ticker)
                 
                 # Forward fill (주말/공휴일)
                 df = df.ffill()
-            else:
-                print(f"  WARNING: pykrx unexpected columns for {ticker}: {len(cols)} columns")
+            elif ticker in ratios.invalid:
+                print(f"  WARNING: pykrx unexpected columns for {ticker}: {ratios.invalid[ticker]} columns")
     
     except Exception as e:
         print(f"  WARNING: Failed to add pykrx features ({ticker}): {e}")
+        df = stock_df
     
-    return df
+    return df.copy() if df is stock_df else df
 
 
 if __name__ == '__main__':
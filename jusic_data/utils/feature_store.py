@@ -0,0 +1,293 @@
+"""
+종목별 피처 저장소 (열 단위, 피처 정의 버전별)
+
+- 종목별 날짜 × 피처 행을 cached_data/features/<버전>/<티커>.npz 에 열(배열) 단위로 보관
+- 버전 = 피처 정의 함수(utils/features.py) 소스 해시. 정의가 바뀌면 새 폴더에 다시 쌓인다.
+- 새 일봉이 들어오면 마지막 저장일부터의 봉만 이어 붙인다 (장중 임시 봉도 교체). 지표는 이어 붙일 위치 앞
+  WARMUP_ROWS 행부터만 다시 계산해 붙이므로 계산량은 이력 길이와 무관하다 (npz는 덧붙일 수 없어 파일은 통째로 교체).
+  이 구간이면 EWM(MACD)의 빠진 이력 가중치가 float64 정밀도 아래라, 같은 날짜의 값은 조회 구간과 무관하게
+  전체 이력 계산과 반올림 오차 수준으로 같다.
+- 겹치는 과거 봉의 종가가 저장된 값과 다르면 (분할/배당으로 수정 가격 재조정, utils/bar_store.py와 같은 기준)
+  받은 일봉 전체로 다시 만든다.
+- 날짜 구간 / 열 일부만 읽기 가능 (npz는 열마다 따로 저장되어 필요한 열만 읽음)
+
+저장하는 값은 일봉에서 나오는 피처(종가, 거래량, 기술 지표, 상호작용)의 결측 채우기 전 값이다.
+거시경제/pykrx 피처와 결측 채우기는 학습/평가/챗봇마다 방식이 달라 읽는 쪽에서 붙인다.
+
+테스트 (모듈 수준에서 utils 패키지를 import하므로 jusic_data 폴더에서 -m으로 실행):
+    python -m utils.feature_store
+"""
+
+import hashlib
+import inspect
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils import features
+from utils.bar_store import ADJUST_TOLERANCE
+from utils.cache_io import atomic_write, atomic_write_text
+
+ROOT_DIR = Path(__file__).parent.parent
+FEATURE_DIR = ROOT_DIR / 'cached_data' / 'features'
+
+# 저장 형식 버전 (파일 구조가 바뀌면 올림)
+FORMAT_VERSION = 1
+
+# 저장 열 (날짜 배열 'Date'는 따로)
+FEATURE_COLUMNS = ['Close', 'Volume'] + features.TECHNICAL_COLUMNS + features.INTERACTION_COLUMNS
+
+# 이어 붙일 때 다시 계산하는 앞쪽 행 수
+# = 가장 긴 rolling 창(20) + 가장 긴 EWM(span 26)의 가중치가 float64 정밀도(eps) 아래로 줄어드는 길이
+LONGEST_WINDOW = 20
+LONGEST_SPAN = 26
+WARMUP_ROWS = LONGEST_WINDOW + math.ceil(math.log(np.finfo(float).eps) / math.log(1 - 2 / (LONGEST_SPAN + 1)))
+
+# 버전 해시에 포함하는 피처 정의
+DEFINITIONS = [
+    features._shift, features._rolling, features.rolling_mean, features.rolling_std,
+    features.ewm_mean, features._own_rows,
+    features.technical_indicators_panel, features.interaction_features_panel,
+]
+
+
+def feature_version():
+    """피처 정의 해시 (정의 함수 소스 + 저장 열 + 형식 버전, 12자리)"""
+    digest = hashlib.sha1()
+    digest.update(f'{FORMAT_VERSION}|{",".join(FEATURE_COLUMNS)}'.encode('utf-8'))
+    for func in DEFINITIONS:
+        digest.update(inspect.getsource(func).encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def compute_feature_columns(close, volume):
+    """종가/거래량 이력 → 저장 열 배열 dict (결측 채우기 전)"""
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    panel = features.technical_indicators_panel(close[:, None], volume[:, None])
+    panel.update(features.interaction_features_panel(panel))
+
+    columns = {'Close': close, 'Volume': volume}
+    columns.update({name: panel[name][:, 0] for name in FEATURE_COLUMNS[2:]})
+    return columns
+
+
+class FeatureStore:
+    def __init__(self, root=FEATURE_DIR, version=None):
+        """
+        Args:
+            root: 저장 폴더 (버전별 하위 폴더 생성)
+            version: 피처 정의 버전 (기본 feature_version())
+        """
+        self.version = version or feature_version()
+        self.dir = Path(root) / self.version
+
+    def _path(self, ticker):
+        return self.dir / f'{ticker}.npz'
+
+    def _load(self, ticker, columns=None):
+        """저장된 배열 dict ({'Date', 열...}, 없거나 읽기 실패면 None)"""
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as z:
+                return {name: z[name] for name in ['Date'] + list(columns or FEATURE_COLUMNS)}
+        except Exception as e:
+            print(f"  WARNING: feature store load failed ({ticker}): {e}")
+            return None
+
+    def _save(self, ticker, arrays):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        manifest = self.dir / 'manifest.json'
+        if not manifest.exists():
+            atomic_write_text(manifest, json.dumps({
+                'version': self.version,
+                'format': FORMAT_VERSION,
+                'columns': FEATURE_COLUMNS,
+                'definitions': [func.__name__ for func in DEFINITIONS],
+            }, ensure_ascii=False, indent=2))
+        # 다른 프로세스가 읽는 중에도 이전/새 파일 전체만 보이도록 교체
+        with atomic_write(self._path(ticker)) as f:
+            np.savez(f, **arrays)
+
+    def last_date(self, ticker):
+        """마지막 저장 날짜 (없으면 None)"""
+        stored = self._load(ticker, columns=[])
+        if stored is None or not len(stored['Date']):
+            return None
+        return pd.Timestamp(stored['Date'][-1])
+
+    def append(self, ticker, bars):
+        """
+        일봉으로 저장소 갱신
+
+        - 저장된 이력이 없거나, 일봉이 저장 구간보다 앞에서 시작하거나, 마지막 저장일과 이어지지 않거나,
+          겹치는 과거 봉의 종가가 달라졌으면 (수정 가격 재조정) 일봉 전체로 다시 만든다.
+        - 그 외에는 마지막 저장일 이후(마지막 저장일 포함) 봉만 이력에 붙이고, 지표는 붙일 위치 앞
+          WARMUP_ROWS 행부터만 다시 계산한다.
+
+        Args:
+            ticker: 종목 티커
+            bars: OHLCV DataFrame (index=날짜)
+
+        Returns:
+            int: 새로 쓰거나 바꾼 행 수
+        """
+        if bars is None or bars.empty:
+            return 0
+
+        bars = bars.sort_index()
+        dates = bars.index.values.astype('datetime64[D]')
+        stored = self._load(ticker)
+
+        if stored is None or not len(stored['Date']) or dates[0] < stored['Date'][0] or dates[0] > stored['Date'][-1] \
+                or _readjusted(stored, dates, bars['Close'].to_numpy(dtype=float)):
+            keep = 0
+            new = bars
+        else:
+            new = bars[dates >= stored['Date'][-1]]
+            if new.empty:
+                return 0
+            keep = int(np.searchsorted(stored['Date'], new.index[0].to_datetime64().astype('datetime64[D]')))
+            last = len(stored['Date']) - 1
+            if len(new) == 1 and keep == last and \
+                    new['Close'].iloc[0] == stored['Close'][last] and new['Volume'].iloc[0] == stored['Volume'][last]:
+                return 0
+
+        close = new['Close'].to_numpy(dtype=float)
+        volume = new['Volume'].to_numpy(dtype=float)
+        # 붙일 위치 앞 WARMUP_ROWS 행만 함께 계산해 (rolling 창/EWM 준비) 새 행 값만 사용
+        start = max(0, keep - WARMUP_ROWS)
+        arrays = compute_feature_columns(
+            np.concatenate([stored['Close'][start:keep], close]) if keep else close,
+            np.concatenate([stored['Volume'][start:keep], volume]) if keep else volume,
+        )
+        if keep:
+            arrays = {name: np.concatenate([stored[name][:keep], values[keep - start:]])
+                      for name, values in arrays.items()}
+        new_dates = new.index.values.astype('datetime64[D]')
+        arrays['Date'] = np.concatenate([stored['Date'][:keep], new_dates]) if keep else new_dates
+        self._save(ticker, arrays)
+        return len(new)
+
+    def read(self, ticker, start=None, end=None, columns=None):
+        """
+        저장된 피처 읽기 (다시 계산하지 않음)
+
+        Args:
+            ticker: 종목 티커
+            start, end: 날짜 구간 (양 끝 포함, None이면 처음/끝까지)
+            columns: 읽을 열 (기본 FEATURE_COLUMNS 전체)
+
+        Returns:
+            DataFrame: index=Date (없으면 None)
+        """
+        stored = self._load(ticker, columns)
+        if stored is None:
+            return None
+
+        dates = stored.pop('Date')
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start).date(), 'D')))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end).date(), 'D'), side='right'))
+
+        index = pd.DatetimeIndex(dates[lo:hi].astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame({name: values[lo:hi] for name, values in stored.items()}, index=index)
+
+    def features_many(self, frames, columns=None):
+        """
+        여러 종목 일봉 → 저장소 갱신 후 일봉 구간의 피처
+
+        Args:
+            frames: {티커: OHLCV DataFrame}
+            columns: 읽을 열
+
+        Returns:
+            dict: {티커: 피처 DataFrame} (frames 순서, 빈 일봉 제외)
+        """
+        results = {}
+        for ticker, bars in frames.items():
+            if bars is None or bars.empty:
+                continue
+            self.append(ticker, bars)
+            df = self.read(ticker, bars.index.min(), bars.index.max(), columns)
+            if df is not None:
+                results[ticker] = df
+        return results
+
+
+def _readjusted(stored, dates, close):
+    """
+    저장된 이력과 겹치는 봉(마지막 저장일 제외)의 종가가 ADJUST_TOLERANCE 넘게 달라졌는지
+    (분할/배당으로 수정 가격 기준이 바뀜, 마지막 저장일은 장중 임시 봉일 수 있어 제외)
+    """
+    _, old_pos, new_pos = np.intersect1d(stored['Date'][:-1], dates, return_indices=True)
+    before = stored['Close'][old_pos]
+    after = close[new_pos]
+    valid = before > 0
+    with np.errstate(invalid='ignore'):
+        return bool(np.any(np.abs(after[valid] / before[valid] - 1) > ADJUST_TOLERANCE))
+
+
+_default_store = None
+
+
+def get_feature_store():
+    """공용 FeatureStore (프로세스당 1개)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = FeatureStore()
+    return _default_store
+
+
+if __name__ == '__main__':
+    # 테스트: 나눠서 추가한 저장소 vs 전체 이력 한 번 계산 (+ 수정 가격 재조정 후 다시 만들기)
+    import sys
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end='2024-12-27', periods=600, name='Date')
+    bars = pd.DataFrame({
+        'Close': 50000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index)))),
+        'Volume': rng.integers(0, 5_000_000, len(index)).astype(float),
+    }, index=index)
+
+    store = FeatureStore(tempfile.mkdtemp(), version='test')
+    store.append('T0', bars.iloc[:400])
+    # 마지막 봉을 장중 임시 값으로 저장했다가 확정 값으로 교체
+    provisional = bars.iloc[380:450].copy()
+    provisional.iloc[-1, 0] *= 1.05
+    store.append('T0', provisional)
+    for end in range(450, 601, 30):
+        store.append('T0', bars.iloc[end - 35:end])
+    unchanged = store.append('T0', bars.iloc[-10:])
+
+    expected = pd.DataFrame(compute_feature_columns(bars['Close'], bars['Volume']), index=index)
+    actual = store.read('T0')
+    part = store.read('T0', '2024-06-03', '2024-06-28', ['MACD', 'RSI'])
+
+    # 2:1 분할 → 과거 종가가 절반으로 재조정된 일봉이 오면 이어 붙이지 않고 받은 일봉 전체로 다시 만듦
+    store.append('T1', bars.iloc[:400])
+    adjusted = bars.assign(Close=bars['Close'] / 2, Volume=bars['Volume'] * 2)
+    store.append('T1', adjusted.iloc[350:420])
+    window = adjusted.iloc[350:420]
+    rebuilt = pd.DataFrame(compute_feature_columns(window['Close'], window['Volume']), index=window.index)
+    split = store.read('T1')
+
+    ok = (
+        unchanged == 0
+        and WARMUP_ROWS < 600 - 35
+        and actual.index.equals(index)
+        and np.allclose(actual.values, expected.values, rtol=1e-10, atol=1e-10, equal_nan=True)
+        and split.index.equals(window.index)
+        and np.allclose(split.values, rebuilt.values, equal_nan=True)
+        and part.index.equals(index[(index >= '2024-06-03') & (index <= '2024-06-28')])
+        and list(part.columns) == ['MACD', 'RSI']
+        and np.allclose(part.values, expected.loc[part.index, ['MACD', 'RSI']].values, equal_nan=True)
+    )
+    print(f"version {feature_version()}")
+    print('[OK] incremental feature store matches full computation' if ok else '[FAIL]')
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,396 @@
+"""
+기술 지표 / 상호작용 피처 (학습, 평가, 챗봇 공통)
+
+종목별 DataFrame을 하나씩 계산하지 않고, 여러 종목의 종가/거래량을
+(날짜 × 종목) NumPy 패널로 쌓아 모든 지표를 한 번에 계산한다.
+
+- 패널은 종목별 일봉을 마지막 날짜 기준으로 아래쪽 정렬 (짧은 종목은 위쪽을 NaN으로 채움).
+  KRX 종목은 거래일이 같으므로 날짜 정렬과 같고, 종목별 계산과 결과가 같다.
+- 정의는 기존 pandas 구현과 같다: rolling(n) (창이 다 차야 값), ewm(span, adjust=True),
+  RSI는 delta가 NaN인 첫 봉을 0으로 취급 (delta.where(delta > 0, 0)).
+- 추론에는 마지막 행만 쓰이므로, 지표별 최소 구간(MA/BB/거래량 20봉, RSI 15봉, 변동성 11봉)만으로
+  마지막 행을 바로 계산하는 경로(last_row_indicators)도 제공한다. MACD의 EWM은 이력 전체 가중합이라
+  받은 구간 전체로 계산한다 (1개월 일봉이면 20여 개 값).
+- python utils/features.py 로 기존 종목별 구현과 결과를 비교한다.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 기술 지표 (calculate_technical_indicators가 추가하는 열, 순서 유지)
+TECHNICAL_COLUMNS = [
+    'MA_5', 'MA_20', 'MA_Ratio', 'RSI', 'Price_Change', 'Volume_Ratio', 'Volatility',
+    'MACD', 'BB_Upper', 'BB_Lower', 'BB_Position', 'Momentum_5',
+]
+
+# 상호작용 피처 8개 (Risk 모델)
+INTERACTION_COLUMNS = [
+    'RSI_x_Volume', 'Trend_Strength', 'BB_Momentum', 'Volatility_x_RSI',
+    'MACD_x_Volume', 'Price_Momentum', 'RSI_MACD', 'BB_Volatility',
+]
+
+# 마지막 행 계산에 필요한 최소 봉 수 (MA_20 / BB / Volume_Ratio)
+LOOKBACK = 20
+
+# 마지막 행 경로에서 남기는 행 수 (거시경제/pykrx 결측을 앞쪽 값으로 채우는 데 사용)
+TAIL_ROWS = 5
+
+
+def _shift(x, n):
+    """axis 0 방향 n칸 뒤로 밀기 (앞쪽은 NaN)"""
+    out = np.full_like(x, np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+def _rolling(x, n, func):
+    """rolling(n) 집계 (창 안에 NaN이 있거나 창이 덜 차면 NaN)"""
+    out = np.full_like(x, np.nan)
+    if len(x) >= n:
+        out[n - 1:] = func(sliding_window_view(x, n, axis=0), axis=-1)
+    return out
+
+
+def rolling_mean(x, n):
+    return _rolling(x, n, np.mean)
+
+
+def rolling_std(x, n):
+    """표본 표준편차 (ddof=1)"""
+    return _rolling(x, n, lambda w, axis: np.std(w, axis=axis, ddof=1))
+
+
+def ewm_mean(x, span):
+    """
+    ewm(span).mean() (adjust=True, ignore_na=False)
+
+    NaN 관측은 가중치 0으로 건너뛰되 이전 관측의 가중치는 계속 감소시키고,
+    첫 관측 전은 NaN, NaN 위치는 직전 값과 같다 (pandas와 동일).
+    """
+    decay = 1 - 2 / (span + 1)
+    observed = ~np.isnan(x)
+    values = np.where(observed, x, 0.0)
+
+    out = np.empty_like(x)
+    num = np.zeros(x.shape[1:])
+    den = np.zeros(x.shape[1:])
+    for t in range(len(x)):
+        num = num * decay + values[t]
+        den = den * decay + observed[t]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[t] = num / den
+    return out
+
+
+def _own_rows(x):
+    """종목별 첫 유효 값 이후 행 (패널 위쪽 채움 구간 제외)"""
+    return np.maximum.accumulate(~np.isnan(x), axis=0)
+
+
+def technical_indicators_panel(close, volume):
+    """
+    (날짜 × 종목) 종가/거래량 패널 → 기술 지표 패널
+
+    Args:
+        close: 종가 배열 (T × N)
+        volume: 거래량 배열 (T × N)
+
+    Returns:
+        dict: {지표 이름: (T × N) 배열} (TECHNICAL_COLUMNS 순서)
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prev_close = _shift(close, 1)
+        price_change = close / prev_close - 1
+
+        ma_5 = rolling_mean(close, 5)
+        ma_20 = rolling_mean(close, 20)
+        ma_ratio = ma_5 / ma_20
+
+        # RSI: 첫 봉(delta NaN)은 0, 채움 구간은 NaN
+        delta = close - prev_close
+        own = _own_rows(close)
+        gain = np.where(own, np.where(delta > 0, delta, 0.0), np.nan)
+        loss = np.where(own, np.where(delta < 0, -delta, 0.0), np.nan)
+        rs = rolling_mean(gain, 14) / rolling_mean(loss, 14)
+        rsi = 100 - (100 / (1 + rs))
+
+        volume_ratio = volume / rolling_mean(volume, 20)
+        volatility = rolling_std(price_change, 10)
+
+        macd = ewm_mean(close, 12) - ewm_mean(close, 26)
+
+        bb_std = rolling_std(close, 20)
+        bb_upper = ma_20 + (bb_std * 2)
+        bb_lower = ma_20 - (bb_std * 2)
+        bb_position = (close - bb_lower) / (bb_upper - bb_lower)
+
+        momentum_5 = close / _shift(close, 5) - 1
+
+    return {
+        'MA_5': ma_5,
+        'MA_20': ma_20,
+        'MA_Ratio': ma_ratio,
+        'RSI': rsi,
+        'Price_Change': price_change,
+        'Volume_Ratio': volume_ratio,
+        'Volatility': volatility,
+        'MACD': macd,
+        'BB_Upper': bb_upper,
+        'BB_Lower': bb_lower,
+        'BB_Position': bb_position,
+        'Momentum_5': momentum_5,
+    }
+
+
+def interaction_features_panel(f):
+    """
+    기술 지표 → 상호작용 피처 8개
+
+    Args:
+        f: {지표 이름: 배열} (패널, Series 모두 가능)
+
+    Returns:
+        dict: {피처 이름: 배열} (INTERACTION_COLUMNS 순서)
+    """
+    return {
+        'RSI_x_Volume': f['RSI'] * f['Volume_Ratio'],
+        'Trend_Strength': f['MA_Ratio'] * f['Momentum_5'],
+        'BB_Momentum': f['BB_Position'] * f['Momentum_5'],
+        'Volatility_x_RSI': f['Volatility'] * f['RSI'],
+        'MACD_x_Volume': f['MACD'] * f['Volume_Ratio'],
+        'Price_Momentum': f['Price_Change'] * f['Momentum_5'],
+        'RSI_MACD': f['RSI'] * f['MACD'],
+        'BB_Volatility': f['BB_Position'] * f['Volatility'],
+    }
+
+
+def stack_panel(frames, column):
+    """
+    종목별 DataFrame의 한 열 → (날짜 × 종목) 패널 (마지막 날짜 기준 아래쪽 정렬)
+
+    Returns:
+        ndarray: (가장 긴 종목 길이 × 종목 수), 짧은 종목 위쪽은 NaN
+    """
+    length = max((len(df) for df in frames), default=0)
+    panel = np.full((length, len(frames)), np.nan)
+    for j, df in enumerate(frames):
+        if len(df):
+            panel[length - len(df):, j] = df[column].to_numpy(dtype=float)
+    return panel
+
+
+def calculate_technical_indicators_many(frames):
+    """
+    여러 종목 기술 지표를 패널로 한 번에 계산
+
+    Args:
+        frames: {티커: OHLCV DataFrame}
+
+    Returns:
+        dict: {티커: 원본 열 + TECHNICAL_COLUMNS DataFrame} (frames 순서)
+    """
+    tickers = list(frames.keys())
+    dfs = [frames[t] for t in tickers]
+    panel = technical_indicators_panel(stack_panel(dfs, 'Close'), stack_panel(dfs, 'Volume'))
+    length = max((len(df) for df in dfs), default=0)
+
+    results = {}
+    for j, (ticker, df) in enumerate(zip(tickers, dfs)):
+        start = length - len(df)
+        indicators = pd.DataFrame(
+            {name: values[start:, j] for name, values in panel.items()}, index=df.index
+        )
+        # 기존 열 중 이름이 겹치는 지표는 새 값으로 교체 (열 순서 유지)
+        base = df.drop(columns=[c for c in TECHNICAL_COLUMNS if c in df.columns])
+        results[ticker] = pd.concat([base, indicators], axis=1)
+    return results
+
+
+def _tail_mean(x, n):
+    """마지막 n개 평균 (n개 미만이거나 NaN이 있으면 NaN, rolling(n)의 마지막 값)"""
+    return np.mean(x[-n:]) if len(x) >= n else np.nan
+
+
+def _tail_std(x, n):
+    """마지막 n개 표본 표준편차 (ddof=1)"""
+    return np.std(x[-n:], ddof=1) if len(x) >= n else np.nan
+
+
+def ewm_last(x, span):
+    """ewm(span).mean()의 마지막 값 (ewm_mean과 같은 점화식, 1차원)"""
+    decay = 1 - 2 / (span + 1)
+    num = den = 0.0
+    for value in x:
+        num *= decay
+        den *= decay
+        if value == value:
+            num += value
+            den += 1
+    return num / den if den else np.nan
+
+
+def last_row_indicators(close, volume):
+    """
+    종목 1개 기술 지표의 마지막 행만 계산 (technical_indicators_panel의 마지막 행과 같음)
+
+    Args:
+        close: 종가 1차원 배열 (날짜 순)
+        volume: 거래량 1차원 배열
+
+    Returns:
+        dict: {지표 이름: 값} (TECHNICAL_COLUMNS 순서, 구간이 덜 찬 지표는 NaN)
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    n = len(close)
+    if n == 0:
+        return {name: np.nan for name in TECHNICAL_COLUMNS}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        last = close[-1]
+        price_change = last / close[-2] - 1 if n >= 2 else np.nan
+
+        ma_5 = _tail_mean(close, 5)
+        ma_20 = _tail_mean(close, LOOKBACK)
+
+        # RSI: 마지막 14개 delta (첫 봉의 NaN delta는 0)
+        delta = np.diff(close[-15:])
+        if n <= 14:
+            delta = np.concatenate([[0.0], delta])
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        rs = np.float64(_tail_mean(gain, 14)) / _tail_mean(loss, 14)
+        rsi = 100 - (100 / (1 + rs))
+
+        window = close[-11:]
+        volatility = _tail_std(window[1:] / window[:-1] - 1, 10)
+
+        macd = ewm_last(close, 12) - ewm_last(close, 26)
+
+        bb_std = _tail_std(close, LOOKBACK)
+        bb_upper = ma_20 + (bb_std * 2)
+        bb_lower = ma_20 - (bb_std * 2)
+
+        values = {
+            'MA_5': ma_5,
+            'MA_20': ma_20,
+            'MA_Ratio': np.float64(ma_5) / ma_20,
+            'RSI': rsi,
+            'Price_Change': price_change,
+            'Volume_Ratio': volume[-1] / _tail_mean(volume, LOOKBACK),
+            'Volatility': volatility,
+            'MACD': macd,
+            'BB_Upper': bb_upper,
+            'BB_Lower': bb_lower,
+            'BB_Position': (last - bb_lower) / (bb_upper - bb_lower),
+            'Momentum_5': last / close[-6] - 1 if n >= 6 else np.nan,
+        }
+    return {name: float(values[name]) for name in TECHNICAL_COLUMNS}
+
+
+def calculate_technical_indicators(df):
+    """기술적 지표 계산 (1개 종목, 원본 열 + TECHNICAL_COLUMNS)"""
+    return calculate_technical_indicators_many({None: df})[None]
+
+
+def add_interactions(df):
+    """상호작용 피처 8개 추가 (복사본 반환)"""
+    df = df.copy()
+    for name, values in interaction_features_panel(df).items():
+        df[name] = values
+    return df
+
+
+def _reference_indicators(df):
+    """기존 종목별 pandas 구현 (비교용)"""
+    df = df.copy()
+    df['MA_5'] = df['Close'].rolling(5).mean()
+    df['MA_20'] = df['Close'].rolling(20).mean()
+    df['MA_Ratio'] = df['MA_5'] / df['MA_20']
+
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rs = gain / loss
+    df['RSI'] = 100 - (100 / (1 + rs))
+
+    df['Price_Change'] = df['Close'].pct_change()
+    df['Volume_Ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
+    df['Volatility'] = df['Close'].pct_change().rolling(10).std()
+
+    exp1 = df['Close'].ewm(span=12).mean()
+    exp2 = df['Close'].ewm(span=26).mean()
+    df['MACD'] = exp1 - exp2
+
+    bb_middle = df['Close'].rolling(20).mean()
+    bb_std = df['Close'].rolling(20).std()
+    df['BB_Upper'] = bb_middle + (bb_std * 2)
+    df['BB_Lower'] = bb_middle - (bb_std * 2)
+    df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
+
+    df['Momentum_5'] = df['Close'].pct_change(5)
+
+    df['RSI_x_Volume'] = df['RSI'] * df['Volume_Ratio']
+    df['Trend_Strength'] = df['MA_Ratio'] * df['Momentum_5']
+    df['BB_Momentum'] = df['BB_Position'] * df['Momentum_5']
+    df['Volatility_x_RSI'] = df['Volatility'] * df['RSI']
+    df['MACD_x_Volume'] = df['MACD'] * df['Volume_Ratio']
+    df['Price_Momentum'] = df['Price_Change'] * df['Momentum_5']
+    df['RSI_MACD'] = df['RSI'] * df['MACD']
+    df['BB_Volatility'] = df['BB_Position'] * df['Volatility']
+    return df
+
+
+if __name__ == '__main__':
+    # 테스트: 길이가 다른 종목 패널 계산 vs 기존 종목별 계산
+    import sys
+
+    rng = np.random.default_rng(0)
+    frames = {}
+    for i, n in enumerate([1500, 1500, 400, 30, 12]):
+        index = pd.bdate_range(end='2024-12-27', periods=n)
+        frames[f'T{i}'] = pd.DataFrame({
+            'Open': 0.0,
+            'Close': 50000 * np.exp(np.cumsum(rng.normal(0, 0.02, n))),
+            'Volume': rng.integers(0, 5_000_000, n).astype(float),
+        }, index=index)
+    # 거래정지 구간 (거래량 0, 종가 동일)
+    frames['T1'].iloc[700:730, frames['T1'].columns.get_loc('Close')] = 42000.0
+    frames['T1'].iloc[700:730, frames['T1'].columns.get_loc('Volume')] = 0.0
+
+    panel = calculate_technical_indicators_many(frames)
+    ok = True
+    for ticker, df in frames.items():
+        expected = _reference_indicators(df)
+        actual = add_interactions(panel[ticker])
+        if list(actual.columns) != list(expected.columns):
+            print(f"[FAIL] {ticker} columns {list(actual.columns)}")
+            ok = False
+            continue
+        for col in TECHNICAL_COLUMNS + INTERACTION_COLUMNS:
+            a, e = actual[col].to_numpy(), expected[col].to_numpy()
+            # 분모가 0에 가까운 값(정지 구간 볼린저 위치 등)은 양쪽 모두 비유한값이면 같은 것으로 봄
+            same = np.isclose(a, e, rtol=1e-8, atol=1e-8, equal_nan=True) | (~np.isfinite(a) & ~np.isfinite(e))
+            if not same.all():
+                i = np.where(~same)[0][0]
+                print(f"[FAIL] {ticker} {col} row {i}: {a[i]} != {e[i]}")
+                ok = False
+
+    # 마지막 행 경로 vs 패널 마지막 행 (종목 끝을 잘라 여러 길이로 비교)
+    for ticker, df in frames.items():
+        for cut in range(min(len(df), 40)):
+            part = df.iloc[:len(df) - cut]
+            expected = calculate_technical_indicators(part)[TECHNICAL_COLUMNS].iloc[-1].to_numpy()
+            actual = np.array(list(last_row_indicators(part['Close'], part['Volume']).values()))
+            same = np.isclose(actual, expected, rtol=1e-10, atol=1e-10, equal_nan=True) | (~np.isfinite(actual) & ~np.isfinite(expected))
+            if not same.all():
+                col = TECHNICAL_COLUMNS[np.where(~same)[0][0]]
+                print(f"[FAIL] {ticker} tail len {len(part)} {col}")
+                ok = False
+
+    print('[OK] panel / last-row features match per-ticker implementation' if ok else '[FAIL]')
+    sys.exit(0 if ok else 1)
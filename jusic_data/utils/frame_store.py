@@ -0,0 +1,254 @@
+"""
+열 단위 DataFrame 저장소 (.npy + JSON 색인, 메모리 매핑)
+
+- DataFrame 1개 = 폴더 1개
+    index.<세대>.npy   : 행 색인 (날짜)
+    b<번호>.<세대>.npy : dtype별 블록 1개 ((열 수 × 행 수), 열마다 연속된 구간)
+    meta.json          : 열 이름/순서, 블록별 열과 파일, 색인 이름, 행 수, 형식 버전
+- 읽을 때 블록을 np.load(mmap_mode='r')로 매핑하므로 쓰는 열의 구간만 디스크에서 읽고, 여러 프로세스가
+  같은 파일 페이지를 공유한다. 블록 전체를 읽으면 복사 없이 DataFrame이 되며 이 경우 값은 읽기 전용이다.
+- 열 이름은 meta.json에만 보관 (pykrx 한글 열 이름이 파일 이름에 들어가지 않도록)
+- 저장할 때마다 새 세대 파일을 쓴 뒤 meta.json을 원자적으로 교체한다. 읽는 쪽은 meta.json이 가리키는
+  세대만 읽으므로 저장 도중에도 이전 세대 전체 또는 새 세대 전체를 본다 (섞이지 않음).
+  직전 세대는 남겨 두고 (이미 meta.json을 읽은 프로세스용) 그보다 오래된 세대는 지운다.
+
+여러 DataFrame({키: DataFrame})은 상위 폴더 아래 키별 폴더로 저장한다 (save_frames / load_frames).
+"""
+
+import json
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_io import FileLock, atomic_write, atomic_write_text
+
+# 저장 형식 버전 (파일 구조가 바뀌면 올림)
+FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+
+
+def _write_npy(path, values):
+    """배열 저장 (임시 파일에 쓴 뒤 교체)"""
+    # dtype 메타데이터(pandas가 붙이는 경우가 있음)는 .npy에 저장되지 않으므로 뗀다
+    values = np.asarray(values)
+    values = values.view(np.dtype(values.dtype.str))
+    with atomic_write(path) as f:
+        np.save(f, values, allow_pickle=False)
+
+
+def _read_meta(path):
+    return json.loads((Path(path) / META_FILE).read_text(encoding='utf-8'))
+
+
+def _meta_files(meta):
+    """meta.json이 가리키는 세대 파일 이름 (예전 형식은 세대 없는 이름)"""
+    return meta.get('files') or {
+        'index': 'index.npy',
+        'blocks': [f'b{k}.npy' for k in range(len(meta['blocks']))],
+    }
+
+
+def is_frame_dir(path):
+    """저장이 끝난 DataFrame 폴더인지 (meta.json 존재)"""
+    return (Path(path) / META_FILE).exists()
+
+
+def meta_path(path):
+    """DataFrame 폴더의 meta.json 경로 (수정 시각 = 마지막 저장 시각)"""
+    return Path(path) / META_FILE
+
+
+def save_frame(path, df):
+    """
+    DataFrame을 열 단위로 저장
+
+    Args:
+        path: 저장 폴더
+        df: 숫자/날짜 열만 있는 DataFrame (object 열은 지원하지 않음)
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    # 같은 폴더를 동시에 저장하면 서로의 세대 파일을 지울 수 있으므로 폴더별 잠금
+    with FileLock(path / '.lock'):
+        try:
+            previous = _meta_files(_read_meta(path))
+        except (OSError, ValueError, KeyError):
+            previous = None
+
+        # dtype별로 열을 모아 (열 × 행) 블록 1개로 저장
+        groups = {}
+        for name in df.columns:
+            groups.setdefault(np.dtype(df[name].dtype.str).str, []).append(name)
+
+        generation = uuid.uuid4().hex[:12]
+        files = {
+            'index': f'index.{generation}.npy',
+            'blocks': [f'b{k}.{generation}.npy' for k in range(len(groups))],
+        }
+        _write_npy(path / files['index'], np.asarray(df.index.values))
+        for filename, names in zip(files['blocks'], groups.values()):
+            _write_npy(path / filename, np.stack([df[name].to_numpy() for name in names]))
+
+        meta = {
+            'format': FORMAT_VERSION,
+            'index_name': df.index.name,
+            'columns': [str(name) for name in df.columns],
+            'blocks': [[str(name) for name in names] for names in groups.values()],
+            'files': files,
+            'rows': len(df),
+        }
+        atomic_write_text(path / META_FILE, json.dumps(meta, ensure_ascii=False, indent=2))
+
+        # 현재/직전 세대만 남김 (지우지 못한 파일은 다음 저장 때 다시 시도)
+        keep = {files['index'], *files['blocks']}
+        if previous:
+            keep |= {previous['index'], *previous['blocks']}
+        for file in path.glob('*.npy'):
+            if file.name not in keep:
+                try:
+                    file.unlink()
+                except OSError:
+                    pass
+
+
+def load_frame(path, columns=None, mmap=True):
+    """
+    열 단위 저장 DataFrame 읽기
+
+    Args:
+        path: 저장 폴더
+        columns: 읽을 열 (기본 전체, 없는 열은 무시)
+        mmap: 메모리 매핑 (False면 메모리로 읽음)
+
+    Returns:
+        DataFrame (저장된 폴더가 아니거나 읽기 실패면 None)
+    """
+    path = Path(path)
+    # 읽는 도중 다른 프로세스가 두 번 저장해 세대 파일이 지워졌으면 meta.json부터 다시 읽음
+    for attempt in range(3):
+        try:
+            return _load_generation(path, _read_meta(path), columns, mmap)
+        except FileNotFoundError:
+            if not (path / META_FILE).exists():
+                return None
+        except Exception as e:
+            print(f"  WARNING: frame load failed ({path.name}): {e}")
+            return None
+    return None
+
+
+def _load_generation(path, meta, columns, mmap):
+    """meta.json이 가리키는 세대 읽기"""
+    if meta.get('format') != FORMAT_VERSION:
+        return None
+
+    files = _meta_files(meta)
+    wanted = meta['columns'] if columns is None else [name for name in columns if name in meta['columns']]
+    mode = 'r' if mmap else None
+    index = pd.Index(np.load(path / files['index']), name=meta['index_name'])
+
+    # 블록별로 필요한 열만 (블록 전체면 매핑한 배열 그대로)
+    parts = []
+    for filename, names in zip(files['blocks'], meta['blocks']):
+        rows = [i for i, name in enumerate(names) if name in wanted]
+        if not rows:
+            continue
+        block = np.load(path / filename, mmap_mode=mode)
+        if len(rows) < len(names):
+            block = block[rows]
+        parts.append(([names[i] for i in rows], block))
+
+    if len(parts) == 1 and parts[0][0] == wanted:
+        return pd.DataFrame(parts[0][1].T, index=index, columns=wanted, copy=False)
+
+    data = {name: block[i] for names, block in parts for i, name in enumerate(names)}
+    return pd.DataFrame(data, index=index, columns=wanted, copy=False)
+
+
+def save_frames(root, frames):
+    """
+    {키: DataFrame} 저장 (키별 폴더, 주어진 키만 교체)
+
+    Args:
+        root: 상위 폴더
+        frames: {키: DataFrame} (None/빈 DataFrame은 건너뜀)
+    """
+    for key, df in frames.items():
+        if df is not None and not df.empty:
+            save_frame(Path(root) / str(key), df)
+
+
+def frame_keys(root):
+    """저장된 키 목록 (정렬)"""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and is_frame_dir(p))
+
+
+def load_frames(root, keys=None, columns=None, mmap=True):
+    """
+    {키: DataFrame} 읽기
+
+    Args:
+        root: 상위 폴더
+        keys: 읽을 키 (기본 저장된 전체)
+        columns: 읽을 열
+        mmap: 메모리 매핑
+
+    Returns:
+        dict: {키: DataFrame} (없는 키 제외)
+    """
+    frames = {}
+    for key in (frame_keys(root) if keys is None else keys):
+        df = load_frame(Path(root) / str(key), columns=columns, mmap=mmap)
+        if df is not None:
+            frames[key] = df
+    return frames
+
+
+def frame_files(root):
+    """저장된 키별 meta.json 목록 (캐시 갱신 시각 확인용)"""
+    return [meta_path(Path(root) / key) for key in frame_keys(root)]
+
+
+if __name__ == '__main__':
+    # 테스트: 저장 → 메모리 매핑 읽기 → 원본과 같은지 + 세대 정리
+    import sys
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end='2024-12-27', periods=300, name='날짜')
+    df = pd.DataFrame({
+        '금융투자': rng.integers(-10**9, 10**9, len(index)),
+        '외국인': rng.integers(-10**9, 10**9, len(index)),
+        'Close': rng.normal(100, 5, len(index)),
+    }, index=index)
+
+    root = Path(tempfile.mkdtemp())
+    save_frames(root, {'005930': df, '000660': df.iloc[:100]})
+    frames = load_frames(root)
+    part = load_frame(root / '005930', columns=['Close'])
+    memory = load_frame(root / '005930', mmap=False)
+
+    # 다시 저장하면 현재/직전 세대 파일만 남음
+    for _ in range(3):
+        save_frame(root / '000660', df.iloc[:100])
+    generations = {file.name.split('.')[1] for file in (root / '000660').glob('*.npy')}
+
+    ok = (
+        list(frames) == ['000660', '005930']
+        and frames['005930'].equals(df)
+        and frames['000660'].equals(df.iloc[:100])
+        and list(part.columns) == ['Close'] and part['Close'].equals(df['Close'])
+        and memory.equals(df)
+        and load_frame(root / 'missing') is None
+        and len(generations) == 2 and load_frame(root / '000660').equals(df.iloc[:100])
+    )
+    print('[OK] columnar frames round-trip' if ok else '[FAIL]')
+    sys.exit(0 if ok else 1)
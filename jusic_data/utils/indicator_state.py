@@ -0,0 +1,431 @@
+"""
+증분 기술 지표 엔진
+
+calculate_technical_indicators()와 같은 지표(MA_5/MA_20, RSI 14, 거래량 비율, 변동성,
+MACD, 볼린저 밴드, 모멘텀)를 종목별 상태(이동 합계, EWM 분자/분모, 고정 길이 버퍼)로 유지해
+새 일봉 1개마다 O(1)로 갱신한다. 장중 임시 봉은 같은 날짜로 다시 넣으면 직전 상태로 되돌린 뒤
+다시 계산한다. 상태는 cached_data/indicator_state.json에 체크포인트로 저장해
+재시작 후에도 과거 일봉을 다시 처리하지 않는다.
+
+pandas rolling/ewm(adjust=True)과 같은 정의를 따르며, 결과는 부동소수점 오차 수준
+(상대 오차 1e-9 이내)에서 일치한다 (python utils/indicator_state.py 로 확인).
+
+챗봇 추론(마지막 행 피처)은 latest(ticker, close=..., volume=...)로 상태 값을 쓴다.
+상태의 최근 창(종가/거래량 20개)이 추론에 쓰는 일봉 끝과 같을 때만 값을 주고 (아니면 None → 일봉으로 계산),
+MACD는 이력 전체 EWM이라 상태 값 대신 추론 일봉 구간으로 계산한다 (calculate_technical_indicators와 같은 구간).
+저장된 창이 새로 받은 일봉과 다르면 (분할/배당 수정 가격 재조정 등) sync가 상태를 버리고 다시 재생한다.
+"""
+
+import json
+import math
+import threading
+from collections import deque
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+STATE_PATH = ROOT_DIR / 'cached_data' / 'indicator_state.json'
+
+# 체크포인트 형식 버전 (지표 정의가 바뀌면 올려서 이전 상태 폐기)
+STATE_VERSION = 1
+
+# 이동 합계를 버퍼로 다시 계산하는 주기 (누적 오차 방지)
+RESYNC_EVERY = 256
+
+NAN = float('nan')
+
+
+def _div(a, b):
+    """pandas/numpy와 같은 나눗셈 (0으로 나누면 inf / nan)"""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class RollingWindow:
+    """고정 길이 창의 합/제곱합 (rolling(n).mean()/std(), 창에 NaN이 있으면 NaN)"""
+
+    def __init__(self, size, values=(), shift=None):
+        self.size = size
+        self.values = deque(values, maxlen=size)
+        # 큰 값(주가)의 제곱합 상쇄 오차를 줄이기 위한 기준값
+        self.shift = shift
+        self._resync()
+
+    def _resync(self):
+        finite = [v for v in self.values if not math.isnan(v)]
+        if self.shift is None and finite:
+            self.shift = finite[0]
+        shift = self.shift or 0.0
+        self.total = sum(v - shift for v in finite)
+        self.total_sq = sum((v - shift) ** 2 for v in finite)
+        self.nans = len(self.values) - len(finite)
+        self.updates = 0
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            if math.isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old - self.shift
+                self.total_sq -= (old - self.shift) ** 2
+        self.values.append(value)
+
+        if math.isnan(value):
+            self.nans += 1
+        else:
+            if self.shift is None:
+                self.shift = value
+            self.total += value - self.shift
+            self.total_sq += (value - self.shift) ** 2
+
+        self.updates += 1
+        if self.updates >= RESYNC_EVERY:
+            self._resync()
+
+    @property
+    def ready(self):
+        return len(self.values) == self.size and self.nans == 0
+
+    def mean(self):
+        if not self.ready:
+            return NAN
+        return self.shift + self.total / self.size
+
+    def std(self):
+        """표본 표준편차 (ddof=1)"""
+        if not self.ready:
+            return NAN
+        var = (self.total_sq - self.total ** 2 / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def to_dict(self):
+        return {'size': self.size, 'values': list(self.values), 'shift': self.shift}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['size'], d['values'], d['shift'])
+
+
+class EWMean:
+    """ewm(span).mean() (adjust=True) 분자/분모 상태"""
+
+    def __init__(self, span, num=0.0, den=0.0):
+        self.span = span
+        self.decay = 1 - 2 / (span + 1)
+        self.num = num
+        self.den = den
+
+    def push(self, value):
+        self.num = self.num * self.decay + value
+        self.den = self.den * self.decay + 1
+        return self.num / self.den
+
+    def to_dict(self):
+        return {'span': self.span, 'num': self.num, 'den': self.den}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['span'], d['num'], d['den'])
+
+
+class IndicatorState:
+    """1개 종목의 지표 상태"""
+
+    def __init__(self):
+        self.last_date = None
+        self.closes = deque(maxlen=6)          # Price_Change / Momentum_5
+        self.ma_5 = RollingWindow(5)
+        self.ma_20 = RollingWindow(20)         # MA_20, 볼린저 밴드
+        self.gain = RollingWindow(14, shift=0.0)
+        self.loss = RollingWindow(14, shift=0.0)
+        self.volume = RollingWindow(20)
+        self.returns = RollingWindow(10, shift=0.0)
+        self.ema_12 = EWMean(12)
+        self.ema_26 = EWMean(26)
+        self.values = {}
+        # 마지막 일봉 반영 전 상태 (같은 날짜 봉이 다시 오면 되돌림)
+        self._prev = None
+
+    def update(self, date, close, volume):
+        """
+        일봉 1개 반영 (date가 마지막 날짜와 같으면 그 봉을 교체)
+
+        Returns:
+            dict: 이 봉 기준 지표 값
+        """
+        if self.last_date is not None and date == self.last_date and self._prev is not None:
+            self._restore(self._prev)
+        elif self.last_date is not None and date < self.last_date:
+            raise ValueError(f"bar {date} is older than state {self.last_date}")
+
+        self._prev = self.to_dict(include_prev=False)
+
+        prev_close = self.closes[-1] if self.closes else NAN
+        delta = close - prev_close
+
+        self.closes.append(close)
+        self.ma_5.push(close)
+        self.ma_20.push(close)
+        # delta.where(delta > 0, 0): 첫 봉(NaN)도 0
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+        self.volume.push(volume)
+
+        price_change = _div(close, prev_close) - 1 if not math.isnan(prev_close) else NAN
+        self.returns.push(price_change)
+
+        ma_5 = self.ma_5.mean()
+        ma_20 = self.ma_20.mean()
+        bb_std = self.ma_20.std()
+        bb_upper = ma_20 + bb_std * 2
+        bb_lower = ma_20 - bb_std * 2
+        close_5 = self.closes[0] if len(self.closes) == 6 else NAN
+
+        self.values = {
+            'MA_5': ma_5,
+            'MA_20': ma_20,
+            'MA_Ratio': _div(ma_5, ma_20),
+            'RSI': 100 - _div(100, 1 + _div(self.gain.mean(), self.loss.mean())),
+            'Price_Change': price_change,
+            'Volume_Ratio': _div(volume, self.volume.mean()),
+            'Volatility': self.returns.std(),
+            'MACD': self.ema_12.push(close) - self.ema_26.push(close),
+            'BB_Upper': bb_upper,
+            'BB_Lower': bb_lower,
+            'BB_Position': _div(close - bb_lower, bb_upper - bb_lower),
+            'Momentum_5': _div(close, close_5) - 1,
+        }
+        self.last_date = date
+        return self.values
+
+    def to_dict(self, include_prev=True):
+        d = {
+            'last_date': self.last_date,
+            'closes': list(self.closes),
+            'ma_5': self.ma_5.to_dict(),
+            'ma_20': self.ma_20.to_dict(),
+            'gain': self.gain.to_dict(),
+            'loss': self.loss.to_dict(),
+            'volume': self.volume.to_dict(),
+            'returns': self.returns.to_dict(),
+            'ema_12': self.ema_12.to_dict(),
+            'ema_26': self.ema_26.to_dict(),
+            'values': dict(self.values),
+        }
+        if include_prev:
+            d['prev'] = self._prev
+        return d
+
+    def window_matches(self, close, volume, include_last=True):
+        """
+        상태의 최근 창(종가/거래량 최대 20개)이 주어진 배열 끝과 같은지
+
+        Args:
+            close, volume: 날짜 순 배열 (마지막이 상태의 마지막 봉)
+            include_last: False면 마지막 봉은 비교하지 않음 (임시 봉 교체 전 확인용)
+        """
+        closes = list(self.ma_20.values)
+        volumes = list(self.volume.values)
+        if not include_last:
+            closes, volumes = closes[:-1], volumes[:-1]
+        n = len(closes)
+        if len(close) < n or len(volume) < len(volumes):
+            return False
+        return closes == [float(v) for v in close[len(close) - n:]] and \
+            volumes == [float(v) for v in volume[len(volume) - len(volumes):]]
+
+    def _restore(self, d):
+        self.last_date = d['last_date']
+        self.closes = deque(d['closes'], maxlen=6)
+        for name in ('ma_5', 'ma_20', 'gain', 'loss', 'volume', 'returns'):
+            setattr(self, name, RollingWindow.from_dict(d[name]))
+        self.ema_12 = EWMean.from_dict(d['ema_12'])
+        self.ema_26 = EWMean.from_dict(d['ema_26'])
+        self.values = dict(d['values'])
+
+    @classmethod
+    def from_dict(cls, d):
+        state = cls()
+        state._restore(d)
+        state._prev = d.get('prev')
+        return state
+
+
+class IndicatorEngine:
+    def __init__(self, path=STATE_PATH):
+        """
+        Args:
+            path: 체크포인트 JSON 경로
+        """
+        self.path = Path(path)
+        self.states = {}
+        # 백그라운드 갱신(sync)과 추론(latest)이 다른 스레드에서 호출됨
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        """체크포인트에서 복원 (없거나 버전이 다르면 빈 상태)"""
+        engine = cls(path)
+        try:
+            with open(engine.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION:
+                engine.states = {t: IndicatorState.from_dict(d) for t, d in data['states'].items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  WARNING: indicator state ignored: {e}")
+        return engine
+
+    def save(self):
+        """체크포인트 저장 (임시 파일에 쓴 뒤 교체)"""
+        from utils.cache_io import atomic_write
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                'version': STATE_VERSION,
+                'states': {t: state.to_dict() for t, state in self.states.items()},
+            }
+        with atomic_write(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def update(self, ticker, date, close, volume):
+        """일봉 1개 반영 (O(1))"""
+        with self._lock:
+            state = self.states.setdefault(ticker, IndicatorState())
+            return state.update(date, float(close), float(volume))
+
+    def sync(self, ticker, bars):
+        """
+        일봉 DataFrame에서 상태 이후의 봉만 반영 (처음이면 전체 재생)
+
+        마지막 상태 날짜의 봉도 다시 넣어 장중 임시 봉을 확정 봉으로 교체한다.
+        마지막 상태 날짜 이전의 저장된 창이 일봉과 다르면 (수정 가격 재조정 등) 상태를 버리고 전체 재생한다.
+
+        Returns:
+            int: 반영한 봉 수
+        """
+        state = self.states.get(ticker)
+        last_date = state.last_date if state else None
+        if state is not None:
+            dates = [ts.date().isoformat() for ts in bars.index]
+            end = sum(1 for date in dates if date < last_date)
+            if not state.window_matches(bars['Close'].values[:end], bars['Volume'].values[:end], include_last=False):
+                with self._lock:
+                    self.states.pop(ticker, None)
+                last_date = None
+
+        applied = 0
+        for ts, close, volume in zip(bars.index, bars['Close'].values, bars['Volume'].values):
+            date = ts.date().isoformat()
+            if last_date is not None and date < last_date:
+                continue
+            self.update(ticker, date, close, volume)
+            applied += 1
+        return applied
+
+    def latest(self, ticker, as_of=None, close=None, volume=None):
+        """
+        마지막 봉 기준 지표 값
+
+        Args:
+            as_of: 이 날짜('YYYY-MM-DD')까지 반영된 상태만 사용 (다르면 None)
+            close, volume: 추론에 쓰는 일봉 배열. 주면 상태의 최근 창이 이 배열 끝과 같을 때만 값을 주고
+                           (다르면 None), MACD는 이 구간으로 계산 (calculate_technical_indicators(일봉) 마지막 행과 같음)
+        """
+        with self._lock:
+            state = self.states.get(ticker)
+            if state is None or (as_of is not None and state.last_date != as_of):
+                return None
+            if close is not None and not state.window_matches(close, volume):
+                return None
+            values = dict(state.values)
+
+        if close is not None:
+            values['MACD'] = _ewm_last(close, 12) - _ewm_last(close, 26)
+        return values
+
+
+def _ewm_last(values, span):
+    """ewm(span).mean()의 마지막 값 (utils/features.ewm_last와 같은 점화식)"""
+    decay = 1 - 2 / (span + 1)
+    num = den = 0.0
+    for value in values:
+        num *= decay
+        den *= decay
+        if value == value:
+            num += value
+            den += 1
+    return num / den if den else NAN
+
+
+if __name__ == '__main__':
+    # 테스트: pandas 전체 계산과 비교 (전체 재생 / 1봉씩 증분 / 임시 봉 교체 / 체크포인트 복원)
+    import sys
+    import tempfile
+    import numpy as np
+    import pandas as pd
+
+    sys.path.insert(0, str(ROOT_DIR))
+    from utils.features import calculate_technical_indicators
+
+    rng = np.random.default_rng(0)
+    n = 600
+    index = pd.bdate_range('2022-01-03', periods=n)
+    bars = pd.DataFrame({
+        'Close': 70000 * np.exp(np.cumsum(rng.normal(0, 0.02, n))),
+        'Volume': rng.integers(1_000_000, 20_000_000, n).astype(float),
+    }, index=index)
+    expected = calculate_technical_indicators(bars)
+
+    def check(values, row, label):
+        for name, value in values.items():
+            want = expected[name].iloc[row]
+            same = (np.isnan(want) and np.isnan(value)) or np.isclose(value, want, rtol=1e-9, atol=1e-9)
+            if not same:
+                print(f"[FAIL] {label} {index[row].date()} {name}: {value} != {want}")
+                return False
+        return True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'state.json'
+        engine = IndicatorEngine(path)
+        ok = True
+        for i in range(n):
+            if i == 300:
+                # 체크포인트 저장 후 복원해서 계속
+                engine.save()
+                engine = IndicatorEngine.load(path)
+            if i % 7 == 0:
+                # 장중 임시 봉 → 같은 날짜 확정 봉으로 교체
+                engine.update('TEST', index[i].date().isoformat(), bars['Close'].iloc[i] * 1.05, 1.0)
+            ok &= check(engine.update('TEST', index[i].date().isoformat(),
+                                      bars['Close'].iloc[i], bars['Volume'].iloc[i]), i, 'incremental')
+
+        replay = IndicatorEngine(path)
+        replay.sync('TEST', bars)
+        ok &= check(replay.latest('TEST'), n - 1, 'replay')
+
+        # 추론 경로: 1개월 일봉만 받아 calculate_technical_indicators로 계산한 마지막 행과 같아야 함
+        window = bars.iloc[-22:]
+        expected = calculate_technical_indicators(window)
+        served = replay.latest('TEST', index[-1].date().isoformat(),
+                               window['Close'].values, window['Volume'].values)
+        ok &= served is not None and check(served, len(window) - 1, 'serving')
+        # 창이 다르거나 날짜가 다르면 None (일봉으로 계산하도록)
+        ok &= replay.latest('TEST', index[-1].date().isoformat(),
+                            window['Close'].values * 1.01, window['Volume'].values) is None
+        ok &= replay.latest('TEST', index[-2].date().isoformat()) is None
+
+        # 수정 가격 재조정 (과거 일봉 전체 0.5배) → 상태를 버리고 다시 재생
+        adjusted = bars.assign(Close=bars['Close'] * 0.5)
+        replay.sync('TEST', adjusted)
+        expected = calculate_technical_indicators(adjusted)
+        ok &= check(replay.latest('TEST'), n - 1, 'readjusted')
+
+    print('[OK] indicator state matches calculate_technical_indicators' if ok else '[FAIL]')
+    sys.exit(0 if ok else 1)
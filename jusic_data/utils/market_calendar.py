@@ -0,0 +1,160 @@
+"""
+KRX / 미국 거래 시간 유틸리티
+
+일봉 저장소, 예측 캐시, 거시경제/투자자 캐시 등에서 공통으로 쓰는 거래일/장 시간 계산.
+import 비용이 없도록 표준 라이브러리만 사용한다.
+
+휴장일은 2024~2026년만 들어 있다. 목록이 없는 해는 주말만 휴장으로 본다 (해가 바뀌면 추가).
+
+시장 (market 인자):
+    'krx' : KRX 정규장 (15:30 KST 마감)
+    'us'  : 미국 주식/지수 (NYSE 휴장일, 다음날 06:00 KST 마감으로 계산)
+    'fx'  : 환율 (평일 모두 거래, 다음날 06:00 KST 마감으로 계산)
+"""
+
+from datetime import date, datetime, timedelta, timezone, time as dtime
+
+# 한국 시간 (KRX 기준)
+KST = timezone(timedelta(hours=9))
+
+# KRX 정규장 시간 (일봉은 마감 후 확정)
+KRX_OPEN = dtime(9, 0)
+KRX_CLOSE = dtime(15, 30)
+
+# 미국장 마감 (16:00 ET = 서머타임 05:00 / 표준시 06:00 KST, 늦은 쪽 기준, 다음날)
+US_CLOSE_KST = dtime(6, 0)
+
+# KRX 휴장일 (공휴일, 대체공휴일, 임시공휴일, 선거일, 근로자의 날, 연말 휴장일)
+KRX_HOLIDAYS = frozenset([
+    # 2024
+    date(2024, 1, 1), date(2024, 2, 9), date(2024, 2, 12), date(2024, 3, 1), date(2024, 4, 10),
+    date(2024, 5, 1), date(2024, 5, 6), date(2024, 5, 15), date(2024, 6, 6), date(2024, 8, 15),
+    date(2024, 9, 16), date(2024, 9, 17), date(2024, 9, 18), date(2024, 10, 1), date(2024, 10, 3),
+    date(2024, 10, 9), date(2024, 12, 25), date(2024, 12, 31),
+    # 2025
+    date(2025, 1, 1), date(2025, 1, 27), date(2025, 1, 28), date(2025, 1, 29), date(2025, 1, 30),
+    date(2025, 3, 3), date(2025, 5, 1), date(2025, 5, 5), date(2025, 5, 6), date(2025, 6, 3),
+    date(2025, 6, 6), date(2025, 8, 15), date(2025, 10, 3), date(2025, 10, 6), date(2025, 10, 7),
+    date(2025, 10, 8), date(2025, 10, 9), date(2025, 12, 25), date(2025, 12, 31),
+    # 2026
+    date(2026, 1, 1), date(2026, 2, 16), date(2026, 2, 17), date(2026, 2, 18), date(2026, 3, 2),
+    date(2026, 5, 1), date(2026, 5, 5), date(2026, 5, 25), date(2026, 6, 3), date(2026, 8, 17),
+    date(2026, 9, 24), date(2026, 9, 25), date(2026, 10, 5), date(2026, 10, 9), date(2026, 12, 25),
+    date(2026, 12, 31),
+])
+
+# NYSE 휴장일
+US_HOLIDAYS = frozenset([
+    # 2024
+    date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+    date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25),
+    # 2025
+    date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+    date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1), date(2025, 11, 27),
+    date(2025, 12, 25),
+    # 2026
+    date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3), date(2026, 5, 25),
+    date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7), date(2026, 11, 26), date(2026, 12, 25),
+])
+
+# 시장별 (휴장일, 마감 시각 KST, 거래일 다음날 마감 여부)
+MARKETS = {
+    'krx': (KRX_HOLIDAYS, KRX_CLOSE, False),
+    'us': (US_HOLIDAYS, US_CLOSE_KST, True),
+    'fx': (frozenset(), US_CLOSE_KST, True),
+}
+
+
+def now_kst():
+    """현재 한국 시간 (tz 없는 datetime)"""
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def is_trading_day(day, market='krx'):
+    """거래일 여부 (주말, 휴장일 제외)"""
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.weekday() < 5 and day not in MARKETS[market][0]
+
+
+def trading_days(start, end, market='krx'):
+    """start ~ end (양 끝 포함) 거래일 목록 (date)"""
+    days = []
+    day = start
+    while day <= end:
+        if is_trading_day(day, market):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def session_close(day, market='krx'):
+    """거래일 day 장 마감 시각 (KST)"""
+    _, close, next_day = MARKETS[market]
+    return datetime.combine(day + timedelta(days=1) if next_day else day, close)
+
+
+def last_session(market='krx', now=None, before=None):
+    """
+    가장 최근에 마감된 거래일
+
+    Args:
+        market: 'krx' / 'us' / 'fx'
+        now: 기준 시각 (KST, 기본 현재)
+        before: 이 날짜 이전 거래일만 (미포함, 조회 종료일이 미포함인 다운로드용)
+
+    Returns:
+        date
+    """
+    now = now or now_kst()
+    day = now.date()
+    if before is not None:
+        day = min(day, before - timedelta(days=1))
+    while not is_trading_day(day, market) or session_close(day, market) > now:
+        day -= timedelta(days=1)
+    return day
+
+
+def last_completed_session(now=None):
+    """가장 최근에 마감된 KRX 거래일 (주말/휴장일 제외)"""
+    return last_session('krx', now)
+
+
+def is_session_open(now=None):
+    """KRX 정규장 진행 중 여부"""
+    now = now or now_kst()
+    return is_trading_day(now) and KRX_OPEN <= now.time() < KRX_CLOSE
+
+
+def current_bar_date(now=None):
+    """지금 조회하면 받게 되는 마지막 일봉 날짜 (장중에는 당일 임시 봉)"""
+    now = now or now_kst()
+    if is_session_open(now):
+        return now.date()
+    return last_completed_session(now)
+
+
+def is_fresh(last_date, checked_at, market='krx', now=None, before=None, recheck=timedelta(hours=1)):
+    """
+    캐시 최신 여부 (파일 나이가 아니라 마지막 날짜와 최근 마감 거래일 비교)
+
+    - 마지막 날짜가 최근 마감 거래일 이상이면 최신 (주말/휴장일에는 다시 받지 않음)
+    - 최근 마감 이후에 이미 확인했는데 데이터가 아직 없었으면 recheck 동안은 최신으로 봄
+      (제공자 반영 지연 중 매번 다시 받지 않도록)
+
+    Args:
+        last_date: 캐시 마지막 날짜 (date)
+        checked_at: 마지막 다운로드 시각 (KST)
+        market: 'krx' / 'us' / 'fx'
+        now: 기준 시각 (KST, 기본 현재)
+        before: 조회 종료일 (미포함, 이후 거래일은 기다리지 않음)
+        recheck: 데이터 반영 지연 시 다시 확인 간격
+
+    Returns:
+        bool
+    """
+    now = now or now_kst()
+    expected = last_session(market, now, before)
+    if last_date >= expected:
+        return True
+    return checked_at is not None and checked_at >= session_close(expected, market) and now - checked_at < recheck
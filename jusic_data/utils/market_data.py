@@ -0,0 +1,159 @@
+"""
+주가 데이터 다운로드 유틸리티
+
+- 단일 종목 일봉 다운로드 (yfinance)
+- 여러 종목 동시 다운로드 (스레드 풀, 동시 실행 수 제한, 종목별 타임아웃/오류 격리)
+- 요청 속도 제한 (토큰 버킷, 스레드 간 공유)
+
+동시 실행 수/타임아웃은 환경 변수로 조정할 수 있다.
+    JUSIC_FETCH_WORKERS : 동시 다운로드 수 (기본 8)
+    JUSIC_FETCH_TIMEOUT : 종목별 타임아웃 초 (기본 20)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# 데이터 제공자 요청 제한에 맞춰 조정
+DEFAULT_MAX_WORKERS = int(os.environ.get('JUSIC_FETCH_WORKERS', '8'))
+DEFAULT_TIMEOUT = float(os.environ.get('JUSIC_FETCH_TIMEOUT', '20'))
+
+
+def download_bars(ticker, period='1mo', start=None, end=None, timeout=None):
+    """
+    단일 종목 일봉 다운로드
+
+    Args:
+        ticker: 종목 티커 (예: '005930.KS')
+        period: 조회 기간 (start가 없을 때 사용)
+        start: 시작일 (YYYY-MM-DD, 선택)
+        end: 종료일 (YYYY-MM-DD, 선택, 미포함)
+        timeout: 네트워크 타임아웃 초
+
+    Returns:
+        DataFrame: OHLCV (데이터 없으면 None)
+    """
+    # import 비용이 커서 다운로드할 때만 로드
+    import pandas as pd
+    import yfinance as yf
+
+    timeout = timeout or DEFAULT_TIMEOUT
+
+    # 스레드 풀 안에서 호출되므로 yfinance 내부 스레드는 사용하지 않음
+    if start is not None:
+        data = yf.download(ticker, start=start, end=end, progress=False, threads=False, timeout=timeout)
+    else:
+        data = yf.download(ticker, period=period, progress=False, threads=False, timeout=timeout)
+
+    if data is None or data.empty:
+        return None
+
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.droplevel(1)
+
+    return data
+
+
+class TokenBucket:
+    """
+    토큰 버킷 요청 속도 제한 (스레드 안전)
+
+    초당 rate개씩 토큰이 차고 최대 capacity개까지 쌓인다. 요청마다 acquire()로 토큰 1개를 쓰므로
+    동시 요청이 몰려도 평균 속도는 rate 이하, 한 번에 몰리는 요청은 capacity개 이하로 유지된다.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        Args:
+            rate: 초당 요청 수
+            capacity: 최대 연속 요청 수 (버스트)
+        """
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """
+        토큰 1개 사용 (없으면 찰 때까지 대기)
+
+        Args:
+            stop: threading.Event (설정되면 기다리지 않고 False 반환)
+
+        Returns:
+            bool: 토큰을 얻었으면 True
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_seconds = (1 - self._tokens) / self.rate
+
+            if stop is not None:
+                if stop.wait(wait_seconds):
+                    return False
+            else:
+                time.sleep(wait_seconds)
+
+
+def fetch_concurrently(tickers, fetch, max_workers=None, timeout=None):
+    """
+    여러 종목 동시 다운로드
+
+    Args:
+        tickers: 종목 티커 리스트
+        fetch: 종목 1개를 받아 데이터를 반환하는 함수 (예: download_bars)
+        max_workers: 동시 실행 수 (기본 JUSIC_FETCH_WORKERS)
+        timeout: 종목별 타임아웃 초 (다운로드 시작 시점 기준)
+
+    Returns:
+        dict: {티커: 데이터} (실패/타임아웃 종목은 None, tickers 순서 유지)
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    timeout = timeout or DEFAULT_TIMEOUT
+
+    results = {ticker: None for ticker in tickers}
+    if not tickers:
+        return results
+
+    started = {}
+
+    def run(ticker):
+        started[ticker] = time.monotonic()
+        return fetch(ticker)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tickers)))
+    futures = {executor.submit(run, ticker): ticker for ticker in tickers}
+    pending = set(futures)
+
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    # 한 종목 실패가 다른 종목에 영향을 주지 않도록 격리
+                    print(f"  WARNING: {ticker} download failed: {e}")
+
+            # 시작 후 timeout을 넘긴 종목은 포기 (결과는 None)
+            now = time.monotonic()
+            expired = {
+                future for future in pending
+                if futures[future] in started and now - started[futures[future]] > timeout
+            }
+            for future in expired:
+                print(f"  WARNING: {futures[future]} download timed out ({timeout:.0f}s)")
+            pending -= expired
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
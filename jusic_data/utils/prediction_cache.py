@@ -0,0 +1,197 @@
+"""
+예측 결과 캐시 (프로세스 간 공유, SQLite)
+
+같은 일봉으로 계산한 예측은 새 일봉이 나올 때까지 바뀌지 않으므로
+(티커, 타임프레임, 마지막 일봉 날짜, 모델 번들 버전)별로 cached_data/predictions.sqlite에 저장한다.
+chatbot_cli 1회 실행, 상주 모드, 일일 예측 스크립트가 같은 캐시를 공유한다.
+
+- 조회 키의 일봉 날짜는 지금 받을 수 있는 마지막 일봉 날짜 (다운로드 없이 계산)
+- 마감된 일봉 기준 예측: JUSIC_PREDICTION_TTL 초 동안 유효 (기본 24시간, 0이면 캐시 사용 안 함)
+- 장중 임시 봉 기준 예측: INTRADAY_TTL 동안 유효
+- 모델 번들 버전이 바뀌면 이전 버전 예측은 모두 삭제
+- 2단계 스크리닝에서 탈락한 종목은 부분 예측('partial', direction 없이 volatility/risk + direction 입력 피처)으로
+  같은 키에 저장한다. 기본 조회는 부분 예측을 빼고, partial=True로만 조회한다 (전체 예측을 저장하면 교체됨)
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+
+from utils.market_calendar import now_kst, current_bar_date, is_session_open
+
+ROOT_DIR = Path(__file__).parent.parent
+CACHE_PATH = ROOT_DIR / 'cached_data' / 'predictions.sqlite'
+
+DEFAULT_TTL = float(os.environ.get('JUSIC_PREDICTION_TTL', str(24 * 3600)))
+
+# 장중 임시 봉 기준 예측 유효 시간 (일봉 저장소 INTRADAY_TTL과 동일)
+INTRADAY_TTL = 10 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    ticker     TEXT NOT NULL,
+    timeframe  TEXT NOT NULL,
+    bar_date   TEXT NOT NULL,
+    version    TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    final      INTEGER NOT NULL,
+    payload    TEXT NOT NULL,
+    PRIMARY KEY (ticker, timeframe, bar_date, version)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _to_builtin(value):
+    """numpy 스칼라 등을 JSON 저장 가능한 값으로 변환"""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _date_key(value):
+    """일봉 날짜 (Timestamp/datetime/date) → 'YYYY-MM-DD'"""
+    if not isinstance(value, date) or hasattr(value, 'hour'):
+        value = value.date()
+    return value.isoformat()
+
+
+class PredictionCache:
+    def __init__(self, version, path=CACHE_PATH, ttl=None):
+        """
+        Args:
+            version: 모델 번들 버전 (ModelStore.version)
+            path: SQLite 파일 경로
+            ttl: 마감 일봉 기준 예측 유효 시간 초 (기본 JUSIC_PREDICTION_TTL, 0 이하면 사용 안 함)
+        """
+        self.version = version
+        self.path = Path(path)
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+
+        if self.enabled:
+            try:
+                self._init_db()
+            except sqlite3.Error as e:
+                print(f"  WARNING: prediction cache disabled: {e}")
+                self.ttl = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _connect(self):
+        # 여러 프로세스가 동시에 쓰므로 잠금 대기 시간을 둠
+        return sqlite3.connect(str(self.path), timeout=10)
+
+    def _init_db(self):
+        """테이블 생성 + 번들 버전이 바뀌었으면 이전 예측 삭제"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                conn.execute("DELETE FROM predictions WHERE version != ?", (self.version,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,)
+                )
+
+    def invalidate(self):
+        """캐시된 예측 전체 삭제"""
+        if not self.enabled:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM predictions")
+
+    def get_many(self, tickers, timeframe, partial=False):
+        """
+        유효한 캐시 예측 조회
+
+        Args:
+            partial: True면 스크리닝 부분 예측만, False면 전체 예측만
+
+        Returns:
+            dict: {티커: 예측 결과} (캐시에 없는 종목 제외)
+        """
+        tickers = list(tickers)
+        if not self.enabled or not tickers:
+            return {}
+
+        bar_date = current_bar_date().isoformat()
+        now = time.time()
+
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    f"SELECT ticker, created_at, final, payload FROM predictions "
+                    f"WHERE timeframe = ? AND bar_date = ? AND version = ? "
+                    f"AND ticker IN ({','.join('?' * len(tickers))})",
+                    [timeframe, bar_date, self.version, *tickers]
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"  WARNING: prediction cache read failed: {e}")
+            return {}
+
+        results = {}
+        for ticker, created_at, final, payload in rows:
+            ttl = self.ttl if final else INTRADAY_TTL
+            if now - created_at < ttl:
+                pred = json.loads(payload)
+                if bool(pred.get('partial')) == partial:
+                    results[ticker] = pred
+        return results
+
+    def get(self, ticker, timeframe):
+        """유효한 캐시 예측 1건 (없으면 None)"""
+        return self.get_many([ticker], timeframe).get(ticker)
+
+    def put_many(self, preds, bar_dates):
+        """
+        예측 결과 저장
+
+        Args:
+            preds: 예측 결과 리스트 (각 dict에 'ticker', 'timeframe' 포함)
+            bar_dates: {티커: 예측에 사용한 마지막 일봉 날짜}
+        """
+        if not self.enabled:
+            return
+
+        now = now_kst()
+        created_at = time.time()
+        rows = []
+        for pred in preds:
+            if pred is None or pred['ticker'] not in bar_dates:
+                continue
+            bar_date = _date_key(bar_dates[pred['ticker']])
+            # 장중에 받은 당일 봉은 임시 봉 (INTRADAY_TTL 후 다시 계산)
+            final = not (is_session_open(now) and bar_date == now.date().isoformat())
+            rows.append((
+                pred['ticker'], pred['timeframe'], bar_date, self.version,
+                created_at, int(final), json.dumps(_to_builtin(pred), ensure_ascii=False)
+            ))
+
+        if not rows:
+            return
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO predictions "
+                    "(ticker, timeframe, bar_date, version, created_at, final, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                # 지난 일봉 기준 예측 정리
+                conn.execute(
+                    "DELETE FROM predictions WHERE created_at < ?", (created_at - max(self.ttl, INTRADAY_TTL),)
+                )
+        except sqlite3.Error as e:
+            print(f"  WARNING: prediction cache write failed: {e}")
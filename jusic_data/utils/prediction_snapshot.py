@@ -0,0 +1,111 @@
+"""
+일일 예측 스냅샷 읽기
+
+scripts/predict_daily_multitf.py가 만든 predictions/today_predictions_<타임프레임>.json을
+챗봇 예측 결과 형식(predict_stock()과 같은 dict)으로 변환한다.
+prediction_date 이후 지난 KRX 거래일 수(한국 시간 기준 오늘까지, 주말/휴장일 제외)가
+허용 거래일 수보다 많은 스냅샷은 사용하지 않는다 (금요일 스냅샷은 월요일에 1거래일).
+
+허용 거래일 수는 환경 변수로 조정할 수 있다.
+    JUSIC_SNAPSHOT_MAX_AGE : 스냅샷 최대 허용 거래일 수 (기본 1, 음수면 스냅샷 사용 안 함)
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from utils.market_calendar import now_kst, trading_days
+
+ROOT_DIR = Path(__file__).parent.parent
+PREDICTIONS_DIR = ROOT_DIR / 'predictions'
+
+DEFAULT_MAX_AGE = int(os.environ.get('JUSIC_SNAPSHOT_MAX_AGE', '1'))
+
+
+def to_prediction(entry, timeframe):
+    """스냅샷 종목 항목 → 챗봇 예측 결과 dict"""
+    return {
+        'ticker': entry['ticker'],
+        'name': entry['stockName'],
+        'timeframe': entry.get('timeframe', timeframe),
+        'direction': {'pred': entry['direction']['prediction'], 'prob': entry['direction']['probability']},
+        'volatility': {'pred': entry['volatility']['prediction'], 'prob': entry['volatility']['probability']},
+        'risk': {'pred': entry['risk']['prediction'], 'prob': entry['risk']['probability']},
+        'score': entry['score'],
+        'price': entry['currentPrice'],
+        'accuracy': entry['accuracy'],
+    }
+
+
+class SnapshotReader:
+    def __init__(self, predictions_dir=PREDICTIONS_DIR, max_age=None):
+        """
+        Args:
+            predictions_dir: 예측 결과 폴더
+            max_age: 최대 허용 거래일 수 (기본 JUSIC_SNAPSHOT_MAX_AGE, 음수면 사용 안 함)
+        """
+        self.predictions_dir = Path(predictions_dir)
+        self.max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+
+        # {타임프레임: (파일 mtime, prediction_date, {티커: 예측 결과})}
+        self._memory = {}
+
+    @property
+    def enabled(self):
+        return self.max_age >= 0
+
+    def _path(self, timeframe):
+        return self.predictions_dir / f'today_predictions_{timeframe}.json'
+
+    def _load(self, timeframe):
+        """스냅샷 로드 (파일이 바뀌지 않았으면 메모리 캐시 사용)"""
+        path = self._path(timeframe)
+        if not path.exists():
+            return None
+
+        mtime = path.stat().st_mtime
+        cached = self._memory.get(timeframe)
+        if cached and cached[0] == mtime:
+            return cached
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            prediction_date = datetime.strptime(
+                snapshot.get('prediction_date') or snapshot['date'], '%Y-%m-%d'
+            ).date()
+            predictions = {
+                ticker: to_prediction(entry, timeframe)
+                for ticker, entry in snapshot.get('predictions', {}).items()
+            }
+        except Exception as e:
+            print(f"  WARNING: prediction snapshot load failed ({timeframe}): {e}")
+            return None
+
+        self._memory[timeframe] = (mtime, prediction_date, predictions)
+        return self._memory[timeframe]
+
+    def age_sessions(self, timeframe, now=None):
+        """스냅샷 이후 지난 KRX 거래일 수 (prediction_date 다음 날 ~ 오늘, 스냅샷 없으면 None)"""
+        loaded = self._load(timeframe)
+        if loaded is None:
+            return None
+        today = (now or now_kst()).date()
+        return len(trading_days(loaded[1] + timedelta(days=1), today))
+
+    def get(self, timeframe):
+        """
+        허용 거래일 수 안의 스냅샷 예측 결과
+
+        Returns:
+            dict: {티커: 예측 결과} (스냅샷이 없거나 오래됐으면 빈 dict)
+        """
+        if not self.enabled:
+            return {}
+
+        age = self.age_sessions(timeframe)
+        if age is None or age > self.max_age:
+            return {}
+
+        return self._memory[timeframe][2]
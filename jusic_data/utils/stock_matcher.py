@@ -0,0 +1,152 @@
+"""
+종목명 매칭 (Aho-Corasick)
+
+종목명, 별칭, 6자리 코드, 티커(005930.KS / 000000.KQ)를 하나의 오토마톤으로 만들어
+메시지를 한 번만 훑어서 모든 종목 언급을 찾는다. 패턴 수(전체 상장 종목 수천 개)와
+무관하게 메시지 길이에 비례하는 시간으로 동작한다.
+
+겹치는 후보는 가장 왼쪽, 그중 가장 긴 것을 고른다 (예: '삼성SDI'는 별칭 '삼성'이 아닌 삼성SDI).
+영문은 대소문자를 구분하지 않고, 6자리 코드는 앞뒤가 숫자가 아닐 때만 인정한다.
+"""
+
+from collections import deque
+
+
+def _fold(text):
+    """대소문자 통일 (글자 수가 바뀌는 문자는 그대로 두어 위치를 유지)"""
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class StockMatcher:
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns: {패턴 문자열: 티커}
+        """
+        # 트라이 (노드별 다음 글자 → 노드), 실패 링크, 출력 [(패턴 길이, 티커, 코드 여부)]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for pattern, ticker in patterns.items():
+            if pattern:
+                self._add(_fold(pattern), ticker)
+        self._build()
+
+    def _add(self, pattern, ticker):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), ticker, pattern.isdigit()))
+
+    def _build(self):
+        """BFS로 실패 링크 구성 (출력은 실패 링크 쪽 출력까지 합침)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def find_all(self, text):
+        """
+        메시지 안의 모든 종목 언급 (겹치지 않게, 왼쪽부터 가장 긴 것 우선)
+
+        Returns:
+            list: [(시작 위치, 끝 위치, 티커)] 위치 순
+        """
+        folded = _fold(text)
+        candidates = []
+        node = 0
+        for i, ch in enumerate(folded):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for length, ticker, is_code in self._out[node]:
+                start, end = i - length + 1, i + 1
+                if is_code and (
+                    (start > 0 and folded[start - 1].isdigit())
+                    or (end < len(folded) and folded[end].isdigit())
+                ):
+                    continue
+                candidates.append((start, -length, ticker))
+
+        mentions = []
+        last_end = 0
+        for start, neg_length, ticker in sorted(candidates):
+            if start >= last_end:
+                mentions.append((start, start - neg_length, ticker))
+                last_end = start - neg_length
+        return mentions
+
+    def find_first(self, text):
+        """가장 앞에 나오는 종목 티커 (없으면 None)"""
+        mentions = self.find_all(text)
+        return mentions[0][2] if mentions else None
+
+
+def build_stock_matcher(name_mapping, aliases=None):
+    """
+    종목 매핑으로 매처 생성
+
+    Args:
+        name_mapping: {티커: 종목명} (예: {'005930.KS': '삼성전자', '247540.KQ': '에코프로비엠'})
+        aliases: {별칭: 티커}
+
+    Returns:
+        StockMatcher: 종목명 / 별칭 / 6자리 코드 / 티커로 검색
+    """
+    patterns = {}
+
+    # 별칭 < 코드 < 종목명 < 티커 순으로 덮어씀 (같은 문자열이면 뒤쪽 우선)
+    for alias, ticker in (aliases or {}).items():
+        patterns[alias] = ticker
+    for ticker in name_mapping:
+        patterns[ticker.split('.')[0]] = ticker
+    for ticker, name in name_mapping.items():
+        patterns[name] = ticker
+    for ticker in name_mapping:
+        patterns[ticker] = ticker
+
+    return StockMatcher(patterns)
+
+
+if __name__ == '__main__':
+    # 테스트
+    import sys
+    from stock_name_mapping import STOCK_NAME_MAPPING
+
+    aliases = {'삼성': '005930.KS', '하이닉스': '000660.KS'}
+    mapping = dict(STOCK_NAME_MAPPING, **{'247540.KQ': '에코프로비엠'})
+    matcher = build_stock_matcher(mapping, aliases)
+
+    cases = [
+        ('삼성SDI 내일 어때?', ['006400.KS']),
+        ('삼성전자 vs 삼성SDI', ['005930.KS', '006400.KS']),
+        ('삼성 주가', ['005930.KS']),
+        ('LG전자랑 LG 비교', ['066570.KS', '003550.KS']),
+        ('sk텔레콤 naver', ['017670.KS', '035420.KS']),
+        ('005930 분석', ['005930.KS']),
+        ('1005930 분석', []),
+        ('247540.KQ 전망', ['247540.KQ']),
+        ('에코프로비엠', ['247540.KQ']),
+    ]
+    failed = 0
+    for text, expected in cases:
+        found = [ticker for _, _, ticker in matcher.find_all(text)]
+        status = 'OK' if found == expected else 'FAIL'
+        failed += status == 'FAIL'
+        print(f"[{status}] {text} → {found}")
+    sys.exit(1 if failed else 0)